@@ -1,13 +1,41 @@
 '''
-Este script carrega o modelo de classificação de profissões treinado, 
-analisa a importância das características e visualiza os resultados para 
+Este script carrega o modelo de classificação de profissões treinado,
+analisa a importância das características e visualiza os resultados para
 ajudar na interpretação do desempenho do modelo.
+
+Além da importância por impureza (``feature_importances_``), que favorece
+características com muitos valores distintos, o script calcula a importância
+por permutação no conjunto de teste (mesma divisão usada em
+``develop_ml_model.py``).  As características são distribuídas entre processos
+e o resultado fica em cache, indexado pela impressão digital do modelo e dos
+dados; execuções repetidas apenas regeneram o gráfico e os relatórios
+CSV/JSON a partir do cache.
 '''
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
-import joblib
+import hashlib
+import json
 import logging
+import tempfile
+import time
+import warnings
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import train_test_split
+
+try:  # pragma: no cover - dependências opcionais
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+except ImportError:  # pragma: no cover - dependências opcionais
+    plt = None
+    sns = None
+
+from prepared_dataset import METADATA_COLUMNS, read_prepared_csv
 
 # Configuração do logging
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
@@ -15,48 +43,262 @@ logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(
 # Caminhos dos arquivos
 MODEL_FILE = 'random_forest_model.pkl'
 PREPARED_DATA_FILE = 'prepared_ml_data.csv'
+CHART_FILE = 'feature_importance.png'
+REPORT_CSV_FILE = 'feature_importance_report.csv'
+REPORT_JSON_FILE = 'feature_importance_report.json'
+CACHE_DIR = Path('.analysis_cache')
+
+# Parâmetros da importância por permutação
+PERMUTATION_REPEATS = 5
+RANDOM_STATE = 42
+TEST_SIZE = 0.2
+# Versão do formato do cache; incremente ao mudar o cálculo.
+CACHE_VERSION = 1
+
+
+def _file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def analysis_fingerprint(model_file, data_file, repeats=PERMUTATION_REPEATS):
+    '''
+    Impressão digital do modelo, dos dados e dos parâmetros da análise.
+    Qualquer mudança em um deles invalida o cache.
+    '''
+    payload = {
+        'version': CACHE_VERSION,
+        'model': _file_digest(model_file),
+        'data': _file_digest(data_file),
+        'repeats': repeats,
+        'random_state': RANDOM_STATE,
+        'test_size': TEST_SIZE,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def held_out_split(df_prepared, feature_names):
+    '''
+    Reproduz a divisão treino/teste de ``develop_ml_model.py`` e devolve apenas
+    o conjunto de teste, que o modelo não viu durante o treinamento.
+    '''
+    y = df_prepared['occupation_encoded']
+    class_counts = y.value_counts()
+    df_filtered = df_prepared[~y.isin(class_counts[class_counts < 2].index)]
+    X_filtered = df_filtered.reindex(columns=list(feature_names), fill_value=0)
+    y_filtered = df_filtered['occupation_encoded']
+    _, X_test, _, y_test = train_test_split(
+        X_filtered, y_filtered, test_size=TEST_SIZE, random_state=RANDOM_STATE, stratify=y_filtered
+    )
+    return X_test, y_test
+
+
+def _permute_features(model_file, X_path, y_path, columns, repeats, baseline):
+    '''
+    Calcula a queda de acurácia ao embaralhar cada coluna de ``columns``
+    (executado em um processo separado).  A matriz de teste é aberta com
+    ``mmap_mode='r'``; cada processo embaralha colunas em uma cópia própria.
+    '''
+    # O modelo foi treinado com DataFrame; aqui a matriz é um ndarray.
+    warnings.filterwarnings('ignore', message='X does not have valid feature names')
+    model = joblib.load(model_file)
+    if hasattr(model, 'n_jobs'):
+        model.set_params(n_jobs=1)
+    X_shared = np.load(X_path, mmap_mode='r')
+    y = np.load(y_path, mmap_mode='r')
+    X = np.array(X_shared)
+
+    results = []
+    for column in columns:
+        # Semente por coluna: o resultado não depende de como as colunas foram divididas.
+        rng = np.random.default_rng([RANDOM_STATE, column])
+        original = X[:, column].copy()
+        drops = []
+        for _ in range(repeats):
+            X[:, column] = rng.permutation(original)
+            drops.append(baseline - accuracy_score(y, model.predict(X)))
+        X[:, column] = original
+        results.append((column, float(np.mean(drops)), float(np.std(drops))))
+    return results
+
+
+def permutation_importance_parallel(model_file, X_test, y_test, repeats=PERMUTATION_REPEATS, jobs=-1):
+    '''
+    Importância por permutação com as características divididas em blocos
+    entre processos (``joblib``/loky).  Devolve o DataFrame com média e desvio
+    da queda de acurácia por característica.
+    '''
+    model = joblib.load(model_file)
+    baseline = float(accuracy_score(y_test, model.predict(X_test)))
+    n_features = X_test.shape[1]
+    n_workers = joblib.effective_n_jobs(jobs)
+    # Alguns blocos por processo para equilibrar colunas mais lentas.
+    chunks = [chunk.tolist() for chunk in np.array_split(np.arange(n_features), max(1, n_workers * 4)) if len(chunk)]
+
+    logging.info(
+        "Importância por permutação: %s características x %s repetições em %s processos (acurácia base %.4f).",
+        n_features,
+        repeats,
+        n_workers,
+        baseline,
+    )
+    with tempfile.TemporaryDirectory(prefix='astro_permutation_') as tmp_dir:
+        X_path = Path(tmp_dir) / 'X.npy'
+        y_path = Path(tmp_dir) / 'y.npy'
+        np.save(X_path, np.ascontiguousarray(X_test, dtype=np.float32))
+        np.save(y_path, np.asarray(y_test))
 
-def analyze_model():
+        start = time.perf_counter()
+        chunk_results = joblib.Parallel(n_jobs=jobs, backend='loky')(
+            joblib.delayed(_permute_features)(str(model_file), str(X_path), str(y_path), chunk, repeats, baseline)
+            for chunk in chunks
+        )
+        logging.info("Importância por permutação calculada em %.2fs.", time.perf_counter() - start)
+
+    rows = [row for chunk in chunk_results for row in chunk]
+    rows.sort()
+    return pd.DataFrame(
+        {
+            'feature': [X_test.columns[column] for column, _, _ in rows],
+            'permutation_importance': [mean for _, mean, _ in rows],
+            'permutation_std': [std for _, _, std in rows],
+        }
+    ), baseline
+
+
+def load_cached_analysis(fingerprint):
+    cache_file = CACHE_DIR / f'{fingerprint}.json'
+    if not cache_file.exists():
+        return None
+    try:
+        return json.loads(cache_file.read_text(encoding='utf-8'))
+    except json.JSONDecodeError as exc:
+        logging.warning("Cache de análise inválido em %s: %s", cache_file, exc)
+        return None
+
+
+def save_cached_analysis(fingerprint, analysis):
+    CACHE_DIR.mkdir(exist_ok=True)
+    cache_file = CACHE_DIR / f'{fingerprint}.json'
+    cache_file.write_text(json.dumps(analysis, ensure_ascii=False) + '\n', encoding='utf-8')
+    logging.info("Resultado da análise armazenado em cache: %s", cache_file)
+
+
+def compute_analysis(repeats=PERMUTATION_REPEATS, jobs=-1):
+    '''
+    Calcula as importâncias por impureza e por permutação do modelo salvo.
+    '''
+    model = joblib.load(MODEL_FILE)
+    logging.info(f"Modelo carregado de {MODEL_FILE}")
+
+    # Carregar os dados preparados para obter os nomes das características
+    df_prepared = read_prepared_csv(PREPARED_DATA_FILE, report=True)
+    feature_names = getattr(model, 'feature_names_in_', None)
+    if feature_names is None:
+        feature_names = df_prepared.drop(columns=METADATA_COLUMNS).columns
+
+    X_test, y_test = held_out_split(df_prepared, feature_names)
+    importance_df, baseline = permutation_importance_parallel(MODEL_FILE, X_test, y_test, repeats=repeats, jobs=jobs)
+
+    # Obter a importância das características (por impureza, quando o modelo expõe)
+    impurity = getattr(model, 'feature_importances_', None)
+    importance_df['importance'] = np.nan if impurity is None else impurity
+
+    return {
+        'model_file': MODEL_FILE,
+        'data_file': PREPARED_DATA_FILE,
+        'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'repeats': repeats,
+        'test_rows': int(len(y_test)),
+        'baseline_accuracy': baseline,
+        'features': importance_df[['feature', 'importance', 'permutation_importance', 'permutation_std']].to_dict(
+            orient='records'
+        ),
+    }
+
+
+def write_reports(analysis, top=20):
+    '''
+    Gera o CSV, o JSON e o gráfico a partir do resultado (calculado ou em cache).
     '''
-    Carrega o modelo treinado e os dados preparados para analisar a importância 
+    importance_df = pd.DataFrame(analysis['features']).sort_values(
+        by='permutation_importance', ascending=False
+    )
+    importance_df.to_csv(REPORT_CSV_FILE, index=False)
+    Path(REPORT_JSON_FILE).write_text(json.dumps(analysis, indent=2, ensure_ascii=False) + '\n', encoding='utf-8')
+    logging.info(f"Relatórios de importância salvos em {REPORT_CSV_FILE} e {REPORT_JSON_FILE}")
+
+    logging.info(f"Top {top} características por permutação:")
+    logging.info(importance_df.head(top))
+
+    if plt is None or sns is None:
+        logging.warning("matplotlib/seaborn não instalados; gráfico %s não gerado.", CHART_FILE)
+        return
+
+    # Visualizar a importância das características
+    fig, axes = plt.subplots(1, 2, figsize=(18, 8))
+    top_impurity = importance_df.sort_values(by='importance', ascending=False).head(top)
+    sns.barplot(x='importance', y='feature', data=top_impurity, palette='viridis', ax=axes[0])
+    axes[0].set_title(f'Top {top} por Impureza')
+    axes[0].set_xlabel('Importância')
+    axes[0].set_ylabel('Característica')
+
+    top_permutation = importance_df.head(top)
+    sns.barplot(x='permutation_importance', y='feature', data=top_permutation, palette='viridis', ax=axes[1])
+    axes[1].errorbar(
+        top_permutation['permutation_importance'],
+        range(len(top_permutation)),
+        xerr=top_permutation['permutation_std'],
+        fmt='none',
+        ecolor='black',
+    )
+    axes[1].set_title(f'Top {top} por Permutação (teste)')
+    axes[1].set_xlabel('Queda de acurácia')
+    axes[1].set_ylabel('')
+    fig.tight_layout()
+    fig.savefig(CHART_FILE)
+    plt.close(fig)
+    logging.info(f"Gráfico de importância das características salvo em {CHART_FILE}")
+
+
+def analyze_model(repeats=PERMUTATION_REPEATS, jobs=-1, use_cache=True, top=20):
+    '''
+    Carrega o modelo treinado e os dados preparados para analisar a importância
     das características e visualizar os resultados.
     '''
     try:
-        # Carregar o modelo treinado
-        model = joblib.load(MODEL_FILE)
-        logging.info(f"Modelo carregado de {MODEL_FILE}")
-
-        # Carregar os dados preparados para obter os nomes das características
-        df_prepared = pd.read_csv(PREPARED_DATA_FILE)
-        feature_names = df_prepared.drop(columns=['name', 'occupation', 'occupation_encoded']).columns
-
-        # Obter a importância das características
-        feature_importances = model.feature_importances_
-
-        # Criar um DataFrame para facilitar a análise
-        importance_df = pd.DataFrame({
-            'feature': feature_names,
-            'importance': feature_importances
-        }).sort_values(by='importance', ascending=False)
-
-        logging.info("Top 20 características mais importantes:")
-        logging.info(importance_df.head(20))
-
-        # Visualizar a importância das características
-        plt.figure(figsize=(12, 8))
-        sns.barplot(x='importance', y='feature', data=importance_df.head(20), palette='viridis')
-        plt.title('Top 20 Características Mais Importantes')
-        plt.xlabel('Importância')
-        plt.ylabel('Característica')
-        plt.tight_layout()
-        plt.savefig('feature_importance.png')
-        logging.info("Gráfico de importância das características salvo em feature_importance.png")
+        fingerprint = analysis_fingerprint(MODEL_FILE, PREPARED_DATA_FILE, repeats)
+        analysis = load_cached_analysis(fingerprint) if use_cache else None
+        if analysis is not None:
+            logging.info("Usando análise em cache (%s...).", fingerprint[:12])
+        else:
+            analysis = compute_analysis(repeats=repeats, jobs=jobs)
+            save_cached_analysis(fingerprint, analysis)
+
+        write_reports(analysis, top=top)
 
     except FileNotFoundError:
         logging.error(f"Erro: O arquivo {MODEL_FILE} ou {PREPARED_DATA_FILE} não foi encontrado.")
     except Exception as e:
         logging.error(f"Ocorreu um erro durante a análise do modelo: {e}")
 
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Analisa a importância das características do modelo treinado.")
+    parser.add_argument('--repeats', type=int, default=PERMUTATION_REPEATS, help="Repetições da permutação por característica.")
+    parser.add_argument('--jobs', type=int, default=-1, help="Processos usados na permutação (-1 usa todos os núcleos).")
+    parser.add_argument('--no-cache', action='store_true', help="Recalcula mesmo que exista resultado em cache.")
+    parser.add_argument('--top', type=int, default=20, help="Quantidade de características no gráfico e no log.")
+    args = parser.parse_args()
+
+    analyze_model(repeats=args.repeats, jobs=args.jobs, use_cache=not args.no_cache, top=args.top)
+
+
 if __name__ == '__main__':
-    analyze_model()
+    main()
 
@@ -13,6 +13,10 @@ import numpy as np
 from immanuel import charts
 import swisseph as swe
 
+import feature_registry
+from gazetteer import load_gazetteer
+from prepared_dataset import METADATA_COLUMNS, read_prepared_csv
+
 astro_bp = Blueprint('astro', __name__)
 
 # Configurar o caminho das efemérides do Swiss Ephemeris
@@ -23,15 +27,54 @@ print(f"Caminho das efemérides configurado: {EPHE_PATH}")
 MODEL_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'random_forest_model.pkl')
 OCCUPATION_MAPPING_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'occupation_label_mapping.json')
 PREPARED_DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'prepared_ml_data.csv')
+PLACES_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'pantheon_places.csv')
+CLEANED_DATA_PATH = os.path.join(os.path.dirname(__file__), '..', '..', 'pantheon_cleaned_data.csv')
+AUTOCOMPLETE_MAX_LIMIT = 50
 
 # Carregar modelo e mapeamento
 model = joblib.load(MODEL_PATH)
 with open(OCCUPATION_MAPPING_PATH, 'r') as f:
     occupation_labels = json.load(f)
 
-# Carregar dados preparados para obter nomes das features
-df_prepared = pd.read_csv(PREPARED_DATA_PATH)
-feature_names = df_prepared.drop(columns=['name', 'occupation', 'occupation_encoded']).columns.tolist()
+# Carregar dados preparados (tipos compactos) uma única vez por worker; o mesmo
+# DataFrame fornece os nomes das features e a base de perfis similares.
+df_prepared = read_prepared_csv(PREPARED_DATA_PATH, report=True)
+feature_names = df_prepared.drop(columns=METADATA_COLUMNS).columns.tolist()
+
+# Índice offline de nomes de lugares (locais do Pantheon + gazetteer embutido),
+# usado quando a requisição traz o nome do local em vez das coordenadas.
+gazetteer = load_gazetteer([PLACES_PATH, CLEANED_DATA_PATH])
+
+def _coordinate(value):
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return float(value)
+
+def resolve_location(data):
+    """
+    Coordenadas do nascimento: latitude/longitude informadas ou, se estiverem
+    em branco, o campo ``place`` geocodificado pelo índice offline.
+    Levanta ValueError quando não há como determinar o local.
+    """
+    latitude = _coordinate(data.get('latitude'))
+    longitude = _coordinate(data.get('longitude'))
+    if latitude is not None and longitude is not None:
+        location = {'source': 'coordinates', 'latitude': latitude, 'longitude': longitude}
+    else:
+        place = str(data.get('place') or '').strip()
+        if not place:
+            raise ValueError('Informe latitude e longitude ou o local de nascimento (campo place).')
+        match = gazetteer.geocode(place)
+        if match is None:
+            raise ValueError(
+                f'Local de nascimento não encontrado ou ambíguo: {place}. '
+                'Consulte /places/autocomplete e informe a cidade.'
+            )
+        latitude, longitude = match.latitude, match.longitude
+        location = {'source': 'gazetteer', 'query': place, **match.to_dict()}
+    if not (-90.0 <= latitude <= 90.0 and -180.0 <= longitude <= 180.0):
+        raise ValueError(f'Coordenadas fora do intervalo válido: {latitude}, {longitude}')
+    return latitude, longitude, location
 
 def get_astrological_features(birth_date, birth_time, latitude, longitude):
     """
@@ -50,7 +93,7 @@ def get_astrological_features(birth_date, birth_time, latitude, longitude):
         natal = charts.Natal(native)
         
         features = {}
-        celestial_objects = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+        celestial_objects = feature_registry.BODIES
 
         natal_chart = {}
         
@@ -132,50 +175,31 @@ def get_astrological_features(birth_date, birth_time, latitude, longitude):
 def prepare_features_for_model(features):
     """
     Transforma as características astrológicas no formato esperado pelo modelo.
-    Cria as mesmas colunas one-hot que existem no conjunto de treino.
+    Cria as mesmas colunas one-hot que existem no conjunto de treino, seguindo
+    as codificações declaradas em feature_registry.py. Só as famílias calculadas
+    por get_astrological_features (signo, casa, elemento e modalidade dos
+    planetas, Ascendente e MC) são codificadas; as demais ficam em zero, pois
+    os valores padrão do registro marcam mapas que falharam no treino.
     """
     # Inicializar DataFrame com zeros para todas as features esperadas
     result_df = pd.DataFrame(0, index=[0], columns=feature_names)
     
-    # Preencher as casas (features numéricas)
-    planets = ["sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn", "uranus", "neptune", "pluto"]
-    for planet in planets:
-        house_col = f"{planet}_house"
-        if house_col in result_df.columns:
-            result_df[house_col] = features.get(house_col, 0)
-    
-    # Preencher ascendente e MC
-    result_df['ascendant_house'] = features.get('ascendant_house', 0)
-    result_df['mc_house'] = features.get('mc_house', 0)
-    
-    # Preencher as features categóricas (one-hot encoded)
-    for planet in planets:
-        # Sign
-        sign = features.get(f"{planet}_sign", "Unknown")
-        sign_col = f"{planet}_sign_{sign}"
-        if sign_col in result_df.columns:
-            result_df[sign_col] = 1
-        
-        # Element
-        element = features.get(f"{planet}_element", "Unknown")
-        element_col = f"{planet}_element_{element}"
-        if element_col in result_df.columns:
-            result_df[element_col] = 1
-        
-        # Modality
-        modality = features.get(f"{planet}_modality", "Unknown")
-        modality_col = f"{planet}_modality_{modality}"
-        if modality_col in result_df.columns:
-            result_df[modality_col] = 1
-    
-    # Preencher ascendant_sign e mc_sign (apenas Unknown está presente no treino)
-    ascendant_sign = features.get('ascendant_sign', 'Unknown')
-    if f'ascendant_sign_{ascendant_sign}' in result_df.columns:
-        result_df[f'ascendant_sign_{ascendant_sign}'] = 1
-    
-    mc_sign = features.get('mc_sign', 'Unknown')
-    if f'mc_sign_{mc_sign}' in result_df.columns:
-        result_df[f'mc_sign_{mc_sign}'] = 1
+    for spec in feature_registry.FEATURES:
+        if spec.name not in features:
+            continue
+        value = features[spec.name]
+        if spec.encoding == feature_registry.ONE_HOT:
+            # Features categóricas (one-hot encoded)
+            column = f"{spec.name}_{value if value is not None else spec.fill_value}"
+            if column in result_df.columns:
+                result_df[column] = 1
+        else:
+            # Features numéricas (casas, graus, contagens)
+            if spec.encoding == feature_registry.ASPECT_COUNT and isinstance(value, list):
+                value = len(value)
+            column = spec.prepared_name
+            if column in result_df.columns:
+                result_df[column] = value if value is not None else spec.fill_value
     
     return result_df
 
@@ -197,7 +221,7 @@ def analyze():
         data = request.json
         
         # Validar dados de entrada
-        required_fields = ['birth_date', 'birth_time', 'latitude', 'longitude']
+        required_fields = ['birth_date', 'birth_time']
         for field in required_fields:
             if field not in data:
                 return jsonify({'error': f'Campo obrigatório ausente: {field}'}), 400
@@ -205,8 +229,11 @@ def analyze():
         name = data.get('name', 'Usuário')
         birth_date = data['birth_date']
         birth_time = data['birth_time']
-        latitude = float(data["latitude"]) if data["latitude"] else 0.0
-        longitude = float(data["longitude"]) if data["longitude"] else 0.0
+        # Coordenadas em branco não viram mais 0.0 (Golfo da Guiné): usa-se o campo place.
+        try:
+            latitude, longitude, location = resolve_location(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
         
         # Gerar características astrológicas
         features, natal_chart = get_astrological_features(birth_date, birth_time, latitude, longitude)
@@ -249,6 +276,7 @@ def analyze():
         similar_profiles = find_similar_profiles(X)
         
         return jsonify({
+            'location': location,
             'natal_chart': natal_chart,
             'predictions': predictions,
             'interpretation': interpretation,
@@ -259,6 +287,21 @@ def analyze():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@astro_bp.route('/places/autocomplete', methods=['GET'])
+def autocomplete_places():
+    """
+    Sugestões de locais de nascimento para o texto digitado: nomes com uma
+    palavra começando pelo texto e, se forem poucos, nomes aproximados.
+    Parâmetros: ``q`` (texto) e ``limit`` (padrão 10, máximo 50).
+    """
+    query = request.args.get('q', '').strip()
+    limit = max(1, min(request.args.get('limit', 10, type=int), AUTOCOMPLETE_MAX_LIMIT))
+    results = gazetteer.search(query, limit) if query else []
+    return jsonify({
+        'query': query,
+        'results': [match.to_dict() for match in results]
+    })
+
 def generate_interpretation(natal_chart, predictions, features):
     """
     Gera uma interpretação textual baseada nas características astrológicas.
@@ -289,11 +332,25 @@ def generate_interpretation(natal_chart, predictions, features):
         'key_factors': key_factors
     }
 
+def _model_feature_importances():
+    """
+    Importâncias globais do modelo carregado. Modelos sem ``feature_importances_``
+    (ex.: regressão logística L1 do develop_ml_model.py --model) usam a média do
+    valor absoluto dos coeficientes; kNN não oferece importâncias.
+    """
+    estimator = model.steps[-1][1] if hasattr(model, 'steps') else model
+    importances = getattr(estimator, 'feature_importances_', None)
+    if importances is None and hasattr(estimator, 'coef_'):
+        importances = np.abs(estimator.coef_).mean(axis=0)
+    return importances
+
 def get_top_features(X, features):
     """
     Retorna as características mais influentes para a predição.
     """
-    feature_importances = model.feature_importances_
+    feature_importances = _model_feature_importances()
+    if feature_importances is None:
+        return {'most_influential': []}
     
     # Obter os índices das top 10 features mais importantes
     top_indices = np.argsort(feature_importances)[::-1][:10]
@@ -316,9 +373,9 @@ def find_similar_profiles(X):
     """
     Encontra perfis similares no conjunto de dados treinado.
     """
-    # Carregar dados preparados
-    df_train = pd.read_csv(PREPARED_DATA_PATH)
-    X_train = df_train.drop(columns=['name', 'occupation', 'occupation_encoded'])
+    # Reutilizar os dados preparados carregados na inicialização do módulo
+    df_train = df_prepared
+    X_train = df_train[feature_names]
     
     # Calcular distância euclidiana
     from scipy.spatial.distance import cdist
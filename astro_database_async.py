@@ -0,0 +1,236 @@
+"""Asyncio mode for :class:`astro_database_client.AstroDatabaseClient`.
+
+Reading a large paginated endpoint with the blocking client costs one round
+trip per page.  :class:`AsyncAstroDatabaseClient` keeps up to ``concurrency``
+page requests in flight and still yields the pages in order:
+
+- offset pagination: after the first page the following offsets are requested
+  concurrently.  When the payload carries ``total``/``count`` exactly the
+  missing pages are requested; otherwise the window advances until a short
+  page arrives (at most ``concurrency - 1`` empty pages are requested past the
+  end);
+- next-link and cursor pagination are inherently sequential, so those
+  endpoints are walked one page at a time (without blocking the event loop).
+
+``fields=`` and the filter keyword arguments are pushed down exactly as in the
+blocking client (see :func:`astro_database_client.build_query`).
+
+The HTTP layer is the same ``requests`` session of the blocking client, with a
+connection pool sized to ``concurrency`` and the calls dispatched to a bounded
+thread pool, so no extra HTTP dependency is required.  ``ASTRO_DB_CONCURRENCY``
+sets the default concurrency (8).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from requests.adapters import HTTPAdapter
+
+from astro_database_client import (
+    _CURSOR_KEYS,
+    _NEXT_LINK_KEYS,
+    AstroDatabaseClient,
+    AstroDatabaseError,
+    Fields,
+    _endpoint_path,
+    _EndpointConfig,
+    build_query,
+)
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY = 8
+
+
+class AsyncAstroDatabaseClient:
+    """Concurrent, order-preserving page fetcher on top of the blocking client."""
+
+    def __init__(
+        self,
+        client: Optional[AstroDatabaseClient] = None,
+        *,
+        concurrency: Optional[int] = None,
+        **client_kwargs: Any,
+    ) -> None:
+        concurrency_val = concurrency if concurrency is not None else os.getenv(
+            "ASTRO_DB_CONCURRENCY", DEFAULT_CONCURRENCY
+        )
+        try:
+            self._concurrency = int(concurrency_val)
+        except ValueError as exc:  # pragma: no cover - configuração incorreta pouco comum
+            raise AstroDatabaseError(
+                f"Valor inválido para ASTRO_DB_CONCURRENCY: {concurrency_val!r}. Informe um inteiro."
+            ) from exc
+        if self._concurrency <= 0:
+            raise AstroDatabaseError("ASTRO_DB_CONCURRENCY deve ser maior que zero.")
+
+        self._client = client or AstroDatabaseClient(**client_kwargs)
+        # Um pool de conexões por host do tamanho da concorrência: as conexões são reutilizadas.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self._concurrency)
+        self._client._session.mount("http://", adapter)
+        self._client._session.mount("https://", adapter)
+        self._executor = ThreadPoolExecutor(max_workers=self._concurrency, thread_name_prefix="astro-db")
+
+    async def __aenter__(self) -> "AsyncAstroDatabaseClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    # ------------------------------------------------------------------
+    # API helpers
+    # ------------------------------------------------------------------
+    async def fetch_people(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                           fields: Fields = None, **filters: Any) -> List[Dict[str, Any]]:
+        return await self._collect(_endpoint_path("people"), limit, page_size, build_query(fields, filters))
+
+    async def fetch_cleaned_people(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                                   fields: Fields = None, **filters: Any) -> List[Dict[str, Any]]:
+        return await self._collect(_endpoint_path("cleaned"), limit, page_size, build_query(fields, filters))
+
+    async def fetch_reduced_people(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                                   fields: Fields = None, **filters: Any) -> List[Dict[str, Any]]:
+        return await self._collect(_endpoint_path("reduced"), limit, page_size, build_query(fields, filters))
+
+    async def fetch_astrological_features(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                                          fields: Fields = None, **filters: Any) -> List[Dict[str, Any]]:
+        return await self._collect(_endpoint_path("features"), limit, page_size, build_query(fields, filters))
+
+    async def fetch_prepared_ml_dataset(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                                        fields: Fields = None, **filters: Any) -> List[Dict[str, Any]]:
+        return await self._collect(_endpoint_path("prepared"), limit, page_size, build_query(fields, filters))
+
+    # ------------------------------------------------------------------
+    # Paginated iteration
+    # ------------------------------------------------------------------
+    async def iter_pages(
+        self,
+        path: str,
+        *,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield the pages of ``path`` in order, fetching up to ``concurrency`` at once."""
+
+        client = self._client
+        page_size = page_size or client._page_size
+        url = _EndpointConfig(base_url=client._base_url, path=path).build_url()
+        first_size = page_size if limit is None else min(page_size, limit)
+
+        payload = await self._get(url, client._build_params(limit=first_size, filters=filters))
+        records = client._records_from(payload, url)
+
+        declares_links = isinstance(payload, dict) and any(
+            key in payload for key in _NEXT_LINK_KEYS + _CURSOR_KEYS + ("links",)
+        )
+        # Página curta: o servidor pode limitar o tamanho das páginas, e os
+        # deslocamentos agendados em paralelo deixariam buracos.  O cliente
+        # síncrono avança pelo número de registros recebidos.
+        if declares_links or 0 < len(records) < first_size:
+            async for page in self._iter_sequential(path, limit, page_size, filters, payload):
+                yield page
+            return
+
+        if limit is not None:
+            records = records[:limit]
+        if records:
+            yield records
+        received = len(records)
+        total = client._declared_total(payload)
+        # Vazia, limite atingido, total alcançado ou servidor que ignora a paginação: uma página só.
+        if (
+            not records
+            or len(records) > page_size
+            or (limit is not None and received >= limit)
+            or (total is not None and received >= total)
+        ):
+            logger.info("Banco astrológico retornou %s registros de %s em 1 página", received, path)
+            return
+
+        bounds = [value for value in (total, limit) if value is not None]
+        end = min(bounds) if bounds else None
+
+        pages = 1
+        next_offset = received
+        pending: deque = deque()
+
+        def schedule() -> None:
+            nonlocal next_offset
+            while len(pending) < self._concurrency and (end is None or next_offset < end):
+                size = page_size if end is None else min(page_size, end - next_offset)
+                params = client._build_params(limit=size, filters=filters)
+                params["offset"] = next_offset
+                pending.append((size, asyncio.ensure_future(self._get(url, params))))
+                next_offset += size
+
+        try:
+            schedule()
+            while pending:
+                size, task = pending.popleft()
+                page = client._records_from(await task, url)
+                if limit is not None:
+                    page = page[: limit - received]
+                if page:
+                    pages += 1
+                    received += len(page)
+                    yield page
+                if len(page) < size:
+                    break
+                schedule()
+        finally:
+            for _, task in pending:
+                task.cancel()
+
+        logger.info("Banco astrológico retornou %s registros de %s em %s páginas", received, path, pages)
+
+    async def _iter_sequential(self, path: str, limit: Optional[int], page_size: int,
+                               filters: Optional[Dict[str, Any]], first_payload: Any):
+        pages = self._client._iter_pages(
+            path, limit=limit, page_size=page_size, filters=filters, first_payload=first_payload
+        )
+        loop = asyncio.get_running_loop()
+        sentinel = object()
+        while True:
+            page = await loop.run_in_executor(self._executor, next, pages, sentinel)
+            if page is sentinel:
+                return
+            yield page
+
+    async def _collect(self, path: str, limit: Optional[int], page_size: Optional[int],
+                       filters: Dict[str, Any]) -> List[Dict[str, Any]]:
+        records: List[Dict[str, Any]] = []
+        async for page in self.iter_pages(path, limit=limit, page_size=page_size, filters=filters):
+            records.extend(page)
+        return records
+
+    async def _get(self, url: str, params: Optional[Dict[str, Any]]) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._client._get_json, url, params)
+
+
+def fetch_all(coroutine_factory, *args: Any, **kwargs: Any) -> Any:
+    """Run an :class:`AsyncAstroDatabaseClient` call from synchronous code.
+
+    ``coroutine_factory`` receives the async client, e.g.
+    ``fetch_all(lambda db: db.fetch_people(page_size=500))``.
+    """
+
+    async def _run() -> Any:
+        async with AsyncAstroDatabaseClient(*args, **kwargs) as db:
+            return await coroutine_factory(db)
+
+    return asyncio.run(_run())
+
+
+__all__ = ["AsyncAstroDatabaseClient", "DEFAULT_CONCURRENCY", "fetch_all"]
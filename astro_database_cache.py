@@ -0,0 +1,194 @@
+"""Persistent on-disk cache for responses of the astrological database.
+
+Every pipeline stage may query the remote database on each run.  With the
+cache enabled, :class:`astro_database_client.AstroDatabaseClient` stores the
+raw body of every successful ``GET`` keyed by URL, query parameters and API
+key, and on the next run:
+
+- returns the stored body without a request while it is younger than the TTL;
+- after the TTL, revalidates it with ``If-None-Match`` (``ETag``) and/or
+  ``If-Modified-Since`` (``Last-Modified``); a ``304 Not Modified`` answer
+  reuses the stored body and restarts the TTL;
+- otherwise refetches and replaces the entry.
+
+The cache directory is bounded by ``max_bytes``: least recently used entries
+are evicted first.  It is configured with the environment variables below
+(the cache stays disabled while ``ASTRO_DB_CACHE_DIR`` is unset):
+
+``ASTRO_DB_CACHE_DIR``
+    Directory of the cache (e.g. ``.astro_db_cache``).
+``ASTRO_DB_CACHE_TTL`` (optional)
+    Seconds an entry is served without revalidation. Defaults to 300.
+``ASTRO_DB_CACHE_MAX_MB`` (optional)
+    Size limit of the directory in MiB. Defaults to 512.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TTL = 300.0
+DEFAULT_MAX_MB = 512
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    body: bytes
+    etag: Optional[str]
+    last_modified: Optional[str]
+    stored_at: float
+    headers: Dict[str, str] = field(default_factory=dict)
+
+    def is_fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Directory of ``<key>.body`` files with a ``<key>.meta`` JSON sidecar."""
+
+    def __init__(self, directory: Path | str, *, ttl: float = DEFAULT_TTL,
+                 max_bytes: int = DEFAULT_MAX_MB * 2**20) -> None:
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.ttl = float(ttl)
+        self.max_bytes = int(max_bytes)
+        self.stats = {"hit": 0, "revalidated": 0, "stale": 0, "miss": 0, "stored": 0, "evicted": 0}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> Optional["ResponseCache"]:
+        directory = os.getenv("ASTRO_DB_CACHE_DIR")
+        if not directory:
+            return None
+        try:
+            ttl = float(os.getenv("ASTRO_DB_CACHE_TTL", DEFAULT_TTL))
+            max_mb = float(os.getenv("ASTRO_DB_CACHE_MAX_MB", DEFAULT_MAX_MB))
+        except ValueError as exc:  # pragma: no cover - configuração incorreta pouco comum
+            raise ValueError(f"Configuração inválida do cache do banco astrológico: {exc}") from exc
+        return cls(directory, ttl=ttl, max_bytes=int(max_mb * 2**20))
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict[str, Any]], credential: Optional[str] = None) -> str:
+        payload = {
+            "url": url,
+            "params": sorted((str(k), str(v)) for k, v in (params or {}).items()),
+            # Entradas de credenciais diferentes nunca se misturam (o token em si não é gravado).
+            "credential": hashlib.sha256(credential.encode("utf-8")).hexdigest() if credential else None,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str):
+        return self.directory / f"{key}.body", self.directory / f"{key}.meta"
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        body_path, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            body = body_path.read_bytes()
+        except (OSError, ValueError):
+            return None
+        if len(body) != meta.get("size"):
+            return None
+        # O mtime do .body marca o último uso (ordem de despejo LRU).
+        os.utime(body_path)
+        return CacheEntry(
+            key,
+            body,
+            meta.get("etag"),
+            meta.get("last_modified"),
+            float(meta["stored_at"]),
+            meta.get("headers", {}),
+        )
+
+    def put(self, key: str, body: bytes, *, url: str, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, headers: Optional[Dict[str, str]] = None) -> None:
+        if len(body) > self.max_bytes:
+            logger.info("Resposta de %s (%s bytes) excede o limite do cache; não armazenada.", url, len(body))
+            return
+        meta = {
+            "url": url,
+            "etag": etag,
+            "last_modified": last_modified,
+            "headers": headers or {},
+            "stored_at": time.time(),
+            "size": len(body),
+        }
+        body_path, meta_path = self._paths(key)
+        self._atomic_write(body_path, body)
+        self._atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+        self.stats["stored"] += 1
+        self._enforce_size_limit()
+
+    def touch(self, key: str) -> None:
+        """Restart the TTL of ``key`` after a successful revalidation."""
+
+        _, meta_path = self._paths(key)
+        try:
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        meta["stored_at"] = time.time()
+        self._atomic_write(meta_path, json.dumps(meta).encode("utf-8"))
+
+    def record(self, outcome: str, url: str) -> None:
+        self.stats[outcome] += 1
+        logger.info("Cache do banco astrológico: %s %s", outcome.upper(), url)
+
+    def _atomic_write(self, path: Path, data: bytes) -> None:
+        handle, tmp_name = tempfile.mkstemp(dir=self.directory, prefix=".tmp-")
+        try:
+            with os.fdopen(handle, "wb") as tmp_file:
+                tmp_file.write(data)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+    def _enforce_size_limit(self) -> None:
+        with self._lock:
+            bodies = []
+            for body_path in self.directory.glob("*.body"):
+                try:
+                    stat = body_path.stat()
+                except OSError:
+                    continue
+                bodies.append((stat.st_mtime, stat.st_size, body_path))
+            total = sum(size for _, size, _ in bodies)
+            for _, size, body_path in sorted(bodies):
+                if total <= self.max_bytes:
+                    break
+                body_path.unlink(missing_ok=True)
+                body_path.with_suffix(".meta").unlink(missing_ok=True)
+                total -= size
+                self.stats["evicted"] += 1
+                logger.info("Cache do banco astrológico: entrada %s removida (limite de tamanho).", body_path.stem)
+
+    def clear(self) -> None:
+        for path in self.directory.glob("*.body"):
+            path.unlink(missing_ok=True)
+        for path in self.directory.glob("*.meta"):
+            path.unlink(missing_ok=True)
+
+
+__all__ = ["CacheEntry", "DEFAULT_MAX_MB", "DEFAULT_TTL", "ResponseCache"]
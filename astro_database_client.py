@@ -10,6 +10,22 @@ client expects the following environment variables:
     Token that will be sent as a ``Bearer`` header when provided.
 ``ASTRO_DB_TIMEOUT`` (optional)
     Request timeout (in seconds). Defaults to 30 seconds.
+``ASTRO_DB_PAGE_SIZE`` (optional)
+    Records requested per page by the ``iter_*`` helpers. Defaults to 1000.
+``ASTRO_DB_CACHE_DIR`` (optional)
+    Enables the on-disk response cache with ETag/Last-Modified revalidation
+    (see :mod:`astro_database_cache` for ``ASTRO_DB_CACHE_TTL`` and
+    ``ASTRO_DB_CACHE_MAX_MB``).
+
+Computed rows can be sent back with ``upload_astrological_features`` and
+``upload_prepared_ml_dataset``: batched ``POST``/``PUT`` requests with
+idempotency keys and a bounded number of batches in flight, summarised in an
+:class:`astro_database_upload.UploadReport` (see :mod:`astro_database_upload`).
+
+Transient failures are retried with exponential backoff and a circuit breaker
+fails fast while the service is down (see :mod:`astro_database_resilience`
+for ``ASTRO_DB_MAX_RETRIES`` and the related settings).  ``client.metrics``
+keeps per-endpoint latency percentiles and error counts.
 
 Specific endpoints can also be overridden with the variables below when the API
 structure diverges from the defaults used in this project:
@@ -21,26 +37,166 @@ structure diverges from the defaults used in this project:
 - ``ASTRO_DB_PREPARED_ENDPOINT`` (default: ``/ml/prepared``)
 
 Each ``fetch_*`` helper returns a list of dictionaries ready to be converted
-into a ``pandas.DataFrame`` by the caller.
+into a ``pandas.DataFrame`` by the caller.  The matching ``iter_*`` helpers walk
+the endpoint page by page instead and yield records (or ``DataFrame`` chunks
+with ``as_frames=True``), so a full table can be consumed in constant memory.
+Three pagination styles are recognised from the response payload:
+
+- next link: ``next``, ``next_url`` or ``links.next`` holding the URL of the
+  following page (absolute or relative to the current one);
+- cursor: ``next_cursor``/``cursor`` sent back as the ``cursor`` parameter;
+- offset: any other response; ``offset`` advances by the page length until a
+  page shorter than the requested size arrives.
+
+Every helper also accepts ``fields=`` and filter keyword arguments, which are
+pushed down to the server as query parameters instead of being applied after
+the download:
+
+- ``fields=["name", "occupation"]`` becomes ``fields=name,occupation``;
+- ``occupation="ACTOR"`` is an equality filter and ``birth_year__gte=1900``
+  uses one of :data:`FILTER_OPERATORS` (sent unchanged as ``birth_year__gte``);
+- values are encoded by type: booleans as ``true``/``false``, dates and
+  datetimes in ISO 8601, lists/tuples/sets as comma-separated values (the
+  ``__in`` operator, or a plain key).
 """
 
 from __future__ import annotations
 
+import json
 import logging
 import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from urllib.parse import urljoin, urlsplit
 
 import requests
 
+from astro_database_cache import CacheEntry, ResponseCache
+from astro_database_resilience import (
+    CircuitOpenError,
+    ClientMetrics,
+    RetryPolicy,
+    breaker_for,
+    parse_retry_after,
+)
+from astro_database_upload import (
+    DEFAULT_BATCH_SIZE,
+    DEFAULT_UPLOAD_CONCURRENCY,
+    UPLOAD_METHODS,
+    BatchFailure,
+    UploadReport,
+    encode_batch,
+    idempotency_key,
+    iter_batches,
+    upload_setting,
+)
+from astro_database_stream import (
+    ACCEPT_ENCODING,
+    RECORD_KEYS,
+    STREAM_CHUNK_SIZE,
+    ColumnBuffer,
+    NdjsonRecordParser,
+    StreamParseError,
+    iter_chunks,
+    parse_into_columns,
+    parser_for,
+)
+
+try:  # pragma: no cover - dependência opcional
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependência opcional
+    pd = None
+
 
 logger = logging.getLogger(__name__)
 
 
+DEFAULT_PAGE_SIZE = 1000
+
+# Variável de ambiente e caminho padrão de cada endpoint.
+ENDPOINTS = {
+    "people": ("ASTRO_DB_PEOPLE_ENDPOINT", "/people"),
+    "cleaned": ("ASTRO_DB_CLEANED_ENDPOINT", "/people/cleaned"),
+    "reduced": ("ASTRO_DB_REDUCED_ENDPOINT", "/people/reduced"),
+    "features": ("ASTRO_DB_FEATURES_ENDPOINT", "/astro-features"),
+    "prepared": ("ASTRO_DB_PREPARED_ENDPOINT", "/ml/prepared"),
+}
+
+FIELDS_PARAM = "fields"
+# Operadores aceitos nos filtros ``campo__operador=valor``.
+FILTER_OPERATORS = ("ne", "gt", "gte", "lt", "lte", "in", "nin", "contains", "isnull")
+# Operadores de comparação aceitam um único valor, nunca uma lista.
+_SCALAR_OPERATORS = ("gt", "gte", "lt", "lte", "contains", "isnull")
+
+Fields = Optional[Union[str, Sequence[str]]]
+
+_RECORD_KEYS = RECORD_KEYS
+# Cabeçalhos guardados no cache junto com o corpo.
+_CACHED_HEADERS = ("Content-Type", "Link")
+_NEXT_LINK_KEYS = ("next", "next_url", "nextUrl")
+_CURSOR_KEYS = ("next_cursor", "nextCursor", "cursor")
+_TOTAL_KEYS = ("total", "count", "total_count")
+
+
 class AstroDatabaseError(RuntimeError):
     """Raised when the astrological database cannot be reached or returns bad data."""
 
 
+class AstroDatabaseUnavailable(AstroDatabaseError):
+    """Raised for transient failures: network errors, retries exhausted or an open circuit."""
+
+
+@dataclass
+class _Body:
+    """Response body from the network (possibly still streaming) or from the cache."""
+
+    content_type: str
+    next_link: Optional[str] = None
+    content: Optional[bytes] = None
+    response: Optional[requests.Response] = None
+
+    @classmethod
+    def from_entry(cls, entry: CacheEntry) -> "_Body":
+        link = entry.headers.get("Link")
+        return cls(entry.headers.get("Content-Type", ""), _next_link_from_header(link), content=entry.body)
+
+    @classmethod
+    def from_response(cls, response: requests.Response) -> "_Body":
+        next_link = response.links.get("next", {}).get("url")
+        return cls(response.headers.get("Content-Type", ""), next_link, response=response)
+
+    @property
+    def is_ndjson(self) -> bool:
+        return isinstance(parser_for(self.content_type), NdjsonRecordParser)
+
+    def read(self) -> bytes:
+        if self.content is None:
+            self.content = self.response.content
+        return self.content
+
+    def chunks(self) -> Iterator[bytes]:
+        if self.content is not None:
+            yield from iter_chunks(self.content)
+            return
+        # Corpo já descomprimido (gzip/deflate/zstd) pelo urllib3, lido aos poucos.
+        try:
+            yield from self.response.iter_content(STREAM_CHUNK_SIZE)
+        finally:
+            self.response.close()
+
+
+def _next_link_from_header(value: Optional[str]) -> Optional[str]:
+    if not value:
+        return None
+    for link in requests.utils.parse_header_links(value):
+        if link.get("rel") == "next":
+            return link.get("url")
+    return None
+
+
 @dataclass
 class _EndpointConfig:
     base_url: str
@@ -59,6 +215,9 @@ class AstroDatabaseClient:
         api_key: Optional[str] = None,
         timeout: Optional[float] = None,
         session: Optional[requests.Session] = None,
+        page_size: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        retry_policy: Optional[RetryPolicy] = None,
     ) -> None:
         base_url = base_url or os.getenv("ASTRO_DB_BASE_URL")
         if not base_url:
@@ -79,47 +238,138 @@ class AstroDatabaseClient:
 
         self._session = session or requests.Session()
 
+        page_size_val = page_size if page_size is not None else os.getenv("ASTRO_DB_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+        try:
+            self._page_size = int(page_size_val)
+        except ValueError as exc:  # pragma: no cover - configuração incorreta pouco comum
+            raise AstroDatabaseError(
+                f"Valor inválido para ASTRO_DB_PAGE_SIZE: {page_size_val!r}. Informe um inteiro."
+            ) from exc
+        if self._page_size <= 0:
+            raise AstroDatabaseError("ASTRO_DB_PAGE_SIZE deve ser maior que zero.")
+
+        try:
+            self._cache = cache if cache is not None else ResponseCache.from_env()
+            self._retry_policy = retry_policy or RetryPolicy.from_env()
+            self._breaker = breaker_for(self._base_url)
+        except ValueError as exc:  # pragma: no cover - configuração incorreta pouco comum
+            raise AstroDatabaseError(str(exc)) from exc
+        self.metrics = ClientMetrics()
+
     # ------------------------------------------------------------------
     # API helpers
     # ------------------------------------------------------------------
-    def fetch_people(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
-        return self._request(
-            os.getenv("ASTRO_DB_PEOPLE_ENDPOINT", "/people"),
-            limit=limit,
-            filters=filters,
-        )
-
-    def fetch_cleaned_people(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
-        return self._request(
-            os.getenv("ASTRO_DB_CLEANED_ENDPOINT", "/people/cleaned"),
-            limit=limit,
-            filters=filters,
-        )
-
-    def fetch_reduced_people(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
-        return self._request(
-            os.getenv("ASTRO_DB_REDUCED_ENDPOINT", "/people/reduced"),
-            limit=limit,
-            filters=filters,
-        )
-
-    def fetch_astrological_features(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
-        return self._request(
-            os.getenv("ASTRO_DB_FEATURES_ENDPOINT", "/astro-features"),
-            limit=limit,
-            filters=filters,
-        )
-
-    def fetch_prepared_ml_dataset(self, limit: Optional[int] = None, **filters: Any) -> List[Dict[str, Any]]:
-        return self._request(
-            os.getenv("ASTRO_DB_PREPARED_ENDPOINT", "/ml/prepared"),
-            limit=limit,
-            filters=filters,
-        )
+    def fetch_people(self, limit: Optional[int] = None, *, fields: Fields = None,
+                     **filters: Any) -> List[Dict[str, Any]]:
+        return self._request(_endpoint_path("people"), limit=limit, filters=build_query(fields, filters))
+
+    def fetch_cleaned_people(self, limit: Optional[int] = None, *, fields: Fields = None,
+                             **filters: Any) -> List[Dict[str, Any]]:
+        return self._request(_endpoint_path("cleaned"), limit=limit, filters=build_query(fields, filters))
+
+    def fetch_reduced_people(self, limit: Optional[int] = None, *, fields: Fields = None,
+                             **filters: Any) -> List[Dict[str, Any]]:
+        return self._request(_endpoint_path("reduced"), limit=limit, filters=build_query(fields, filters))
+
+    def fetch_astrological_features(self, limit: Optional[int] = None, *, fields: Fields = None,
+                                    **filters: Any) -> List[Dict[str, Any]]:
+        return self._request(_endpoint_path("features"), limit=limit, filters=build_query(fields, filters))
+
+    def fetch_prepared_ml_dataset(self, limit: Optional[int] = None, *, fields: Fields = None,
+                                  **filters: Any) -> List[Dict[str, Any]]:
+        return self._request(_endpoint_path("prepared"), limit=limit, filters=build_query(fields, filters))
+
+    # ------------------------------------------------------------------
+    # Paginated iterators
+    # ------------------------------------------------------------------
+    def iter_people(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                    as_frames: bool = False, fields: Fields = None, **filters: Any) -> Iterator[Any]:
+        return self._iterate(_endpoint_path("people"), limit, page_size, as_frames, build_query(fields, filters))
+
+    def iter_cleaned_people(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                            as_frames: bool = False, fields: Fields = None, **filters: Any) -> Iterator[Any]:
+        return self._iterate(_endpoint_path("cleaned"), limit, page_size, as_frames, build_query(fields, filters))
+
+    def iter_reduced_people(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                            as_frames: bool = False, fields: Fields = None, **filters: Any) -> Iterator[Any]:
+        return self._iterate(_endpoint_path("reduced"), limit, page_size, as_frames, build_query(fields, filters))
+
+    def iter_astrological_features(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                                   as_frames: bool = False, fields: Fields = None, **filters: Any) -> Iterator[Any]:
+        return self._iterate(_endpoint_path("features"), limit, page_size, as_frames, build_query(fields, filters))
+
+    def iter_prepared_ml_dataset(self, limit: Optional[int] = None, *, page_size: Optional[int] = None,
+                                 as_frames: bool = False, fields: Fields = None, **filters: Any) -> Iterator[Any]:
+        return self._iterate(_endpoint_path("prepared"), limit, page_size, as_frames, build_query(fields, filters))
+
+    # ------------------------------------------------------------------
+    # Bulk uploads
+    # ------------------------------------------------------------------
+    def upload_astrological_features(self, records: Any, *, method: str = "POST",
+                                     batch_size: Optional[int] = None, concurrency: Optional[int] = None,
+                                     namespace: Optional[str] = None) -> UploadReport:
+        return self._upload(_endpoint_path("features"), records, method, batch_size, concurrency, namespace)
+
+    def upload_prepared_ml_dataset(self, records: Any, *, method: str = "POST",
+                                   batch_size: Optional[int] = None, concurrency: Optional[int] = None,
+                                   namespace: Optional[str] = None) -> UploadReport:
+        return self._upload(_endpoint_path("prepared"), records, method, batch_size, concurrency, namespace)
 
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    def _upload(self, path: str, records: Any, method: str, batch_size: Optional[int],
+                concurrency: Optional[int], namespace: Optional[str]) -> UploadReport:
+        """Send ``records`` to ``path`` in batches; failures end up in the report, not raised."""
+
+        method = method.upper()
+        if method not in UPLOAD_METHODS:
+            raise AstroDatabaseError(f"Método de envio inválido: {method!r}. Use POST ou PUT.")
+        try:
+            batch_size = upload_setting(batch_size, "ASTRO_DB_UPLOAD_BATCH_SIZE", DEFAULT_BATCH_SIZE)
+            concurrency = upload_setting(concurrency, "ASTRO_DB_UPLOAD_CONCURRENCY", DEFAULT_UPLOAD_CONCURRENCY)
+        except ValueError as exc:
+            raise AstroDatabaseError(str(exc)) from exc
+
+        url = _EndpointConfig(base_url=self._base_url, path=path).build_url()
+        report = UploadReport(endpoint=url, method=method)
+        start_time = time.perf_counter()
+
+        def send(body: bytes, key: str) -> Any:
+            headers = self._build_headers()
+            headers.update({"Content-Type": "application/json", "Idempotency-Key": key})
+            response = self._send(url, headers, None, method=method, data=body)
+            return self._parse_json(response.content, url) if response.content else None
+
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="astro-db-upload") as executor:
+            pending: Dict[Any, Tuple[int, List[Dict[str, Any]], str]] = {}
+
+            def collect(futures) -> None:
+                for future in futures:
+                    start, batch, key = pending.pop(future)
+                    try:
+                        report.add_batch(start, batch, future.result())
+                    except AstroDatabaseError as exc:
+                        report.batch_failures.append(BatchFailure(start, len(batch), key, str(exc)))
+
+            for start, batch in iter_batches(records, batch_size):
+                body = encode_batch(batch)
+                key = idempotency_key(path, body, namespace)
+                report.records += len(batch)
+                report.batches += 1
+                pending[executor.submit(send, body, key)] = (start, batch, key)
+                if len(pending) >= concurrency:
+                    # Só ``concurrency`` lotes ficam em memória ao mesmo tempo.
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+            collect(list(pending))
+
+        report.batch_failures.sort(key=lambda failure: failure.start)
+        report.record_failures.sort(key=lambda failure: failure.position)
+        report.elapsed = time.perf_counter() - start_time
+        report.log_summary()
+        return report
+
     def _request(
         self,
         path: str,
@@ -129,34 +379,309 @@ class AstroDatabaseClient:
     ) -> List[Dict[str, Any]]:
         config = _EndpointConfig(base_url=self._base_url, path=path)
         params = self._build_params(limit=limit, filters=filters)
-        headers = self._build_headers()
         url = config.build_url()
 
+        payload = self._get_json(url, params)
+        data = self._records_from(payload, url)
+
+        logger.info("Banco astrológico retornou %s registros de %s", len(data), url)
+        return data
+
+    def _get_json(self, url: str, params: Optional[Dict[str, Any]]) -> Any:
+        body = self._get_body(url, params)
+        content = body.read()
+        if body.is_ndjson:
+            parser = NdjsonRecordParser()
+            try:
+                records = parser.feed(content) + parser.close()
+            except StreamParseError as exc:
+                raise AstroDatabaseError(f"Resposta inválida recebida de {url}: {exc}") from exc
+            # NDJSON não tem envelope: a próxima página vem do cabeçalho Link.
+            return {"results": records, "next": body.next_link} if body.next_link else records
+        return self._parse_json(content, url)
+
+    def _get_columns(self, url: str, params: Optional[Dict[str, Any]]) -> Tuple[ColumnBuffer, Any]:
+        """Stream ``url`` straight into a :class:`ColumnBuffer`.
+
+        Returns the buffer and the envelope (the other top-level keys, used for
+        pagination; ``None`` for a bare array).  NDJSON bodies take the next
+        page from the ``Link: <...>; rel="next"`` header.
+        """
+
+        body = self._get_body(url, params, stream=True)
+        try:
+            records, envelope, found = parse_into_columns(body.chunks(), body.content_type)
+        except (StreamParseError, requests.RequestException) as exc:
+            raise AstroDatabaseError(f"Resposta inválida recebida de {url}: {exc}") from exc
+        if not found:
+            raise AstroDatabaseError(
+                "Resposta inesperada do banco astrológico. Esperado lista de registros, "
+                f"mas foi recebido: {envelope!r}"
+            )
+        if body.is_ndjson and body.next_link:
+            envelope = {"next": body.next_link}
+        return records, envelope
+
+    def _get_body(self, url: str, params: Optional[Dict[str, Any]], *, stream: bool = False) -> "_Body":
+        """Fetch ``url`` through the cache; ``stream`` avoids reading the body up front."""
+
         logger.debug("Consultando banco astrológico: %s", url)
 
+        headers = self._build_headers()
+        cache_key = entry = None
+        if self._cache is not None:
+            cache_key = ResponseCache.make_key(url, params, self._api_key)
+            entry = self._cache.get(cache_key)
+            if entry is not None and entry.is_fresh(self._cache.ttl):
+                self._cache.record("hit", url)
+                return _Body.from_entry(entry)
+            if entry is not None:
+                headers.update(entry.validators())
+
+        try:
+            # Com cache o corpo é lido inteiro para ser armazenado.
+            response = self._send(url, headers, params, stream=stream and self._cache is None)
+        except AstroDatabaseUnavailable as exc:
+            if entry is None:
+                raise
+            # Banco indisponível: a cópia expirada do cache é melhor que os CSVs de amostra.
+            # Erros do pedido (401, 403, 404...) não chegam aqui: a resposta guardada
+            # pode não valer mais para esta credencial.
+            logger.warning("%s; usando resposta expirada do cache.", exc)
+            self._cache.record("stale", url)
+            return _Body.from_entry(entry)
+
+        if self._cache is not None:
+            if response.status_code == 304 and entry is not None:
+                self._cache.touch(cache_key)
+                self._cache.record("revalidated", url)
+                return _Body.from_entry(entry)
+            self._cache.record("miss", url)
+            if "no-store" not in response.headers.get("Cache-Control", ""):
+                self._cache.put(
+                    cache_key,
+                    response.content,
+                    url=url,
+                    etag=response.headers.get("ETag"),
+                    last_modified=response.headers.get("Last-Modified"),
+                    headers={name: response.headers[name] for name in _CACHED_HEADERS if name in response.headers},
+                )
+
+        return _Body.from_response(response)
+
+    def _send(self, url: str, headers: Dict[str, str], params: Optional[Dict[str, Any]], *,
+              stream: bool = False, method: str = "GET", data: Optional[bytes] = None) -> requests.Response:
+        """Send a request with retries, backoff and the shared circuit breaker.
+
+        Writes are only retried safely because they carry an ``Idempotency-Key``.
+        """
+
+        endpoint = urlsplit(url).path or "/"
         try:
-            response = self._session.get(url, headers=headers, params=params, timeout=self._timeout)
-            response.raise_for_status()
-        except requests.RequestException as exc:
-            raise AstroDatabaseError(f"Falha ao consultar {url}: {exc}") from exc
+            self._breaker.before_call()
+        except CircuitOpenError as exc:
+            self.metrics.record_rejected(endpoint)
+            raise AstroDatabaseUnavailable(str(exc)) from exc
+
+        attempt = 0
+        while True:
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                response = self._session.request(
+                    method, url, headers=headers, params=params, data=data, timeout=self._timeout, stream=stream
+                )
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as exc:
+                error: Exception = exc
+            except requests.RequestException as exc:
+                # URL inválida, esquema ausente etc.: erro do cliente, o serviço nem foi
+                # consultado; não conta como falha nem prende a tentativa do meio-aberto.
+                self.metrics.record(endpoint, time.perf_counter() - start, error=True)
+                self._breaker.release_trial()
+                raise AstroDatabaseError(f"Falha ao consultar {url}: {exc}") from exc
+            else:
+                if response.status_code not in self._retry_policy.retry_statuses:
+                    self.metrics.record(endpoint, time.perf_counter() - start, error=response.status_code >= 400)
+                    try:
+                        response.raise_for_status()
+                    except requests.HTTPError as exc:
+                        # Erros 4xx são do pedido, não do serviço: não abrem o circuito.
+                        response.close()
+                        self._breaker.record_success()
+                        raise AstroDatabaseError(f"Falha ao consultar {url}: {exc}") from exc
+                    self._breaker.record_success()
+                    return response
+                error = requests.HTTPError(f"{response.status_code} {response.reason}", response=response)
+                retry_after = parse_retry_after(response.headers.get("Retry-After"))
+                # Com ``stream=True`` a conexão só volta ao pool depois de fechada.
+                response.close()
+
+            self.metrics.record(endpoint, time.perf_counter() - start, error=True)
+            if attempt >= self._retry_policy.max_retries:
+                self._breaker.record_failure()
+                raise AstroDatabaseUnavailable(
+                    f"Falha ao consultar {url} após {attempt + 1} tentativas: {error}"
+                ) from error
+
+            delay = self._retry_policy.delay(attempt, retry_after)
+            attempt += 1
+            self.metrics.record_retry(endpoint)
+            logger.warning(
+                "Falha temporária em %s (%s); tentativa %s de %s em %.2fs.",
+                url,
+                error,
+                attempt,
+                self._retry_policy.max_retries,
+                delay,
+            )
+            time.sleep(delay)
 
+    @staticmethod
+    def _parse_json(body: bytes, url: str) -> Any:
         try:
-            payload = response.json()
+            return json.loads(body)
         except ValueError as exc:
             raise AstroDatabaseError(f"Resposta inválida recebida de {url}: {exc}") from exc
 
+    def _records_from(self, payload: Any, url: str) -> List[Dict[str, Any]]:
         data = self._extract_list(payload)
         if not isinstance(data, list):
             raise AstroDatabaseError(
                 "Resposta inesperada do banco astrológico. Esperado lista de registros, "
                 f"mas foi recebido: {payload!r}"
             )
-
-        logger.info("Banco astrológico retornou %s registros de %s", len(data), url)
         return data
 
+    def _iterate(self, path: str, limit: Optional[int], page_size: Optional[int], as_frames: bool,
+                 filters: Dict[str, Any]) -> Iterator[Any]:
+        if as_frames:
+            if pd is None:
+                raise AstroDatabaseError("Pandas é obrigatório para iterar em blocos de DataFrame.")
+            # Registros vão direto do corpo da resposta para buffers por coluna.
+            pages = self._iter_pages(path, limit=limit, page_size=page_size, filters=filters, columnar=True)
+            return (page.to_frame() for page in pages)
+        pages = self._iter_pages(path, limit=limit, page_size=page_size, filters=filters)
+        return (record for page in pages for record in page)
+
+    def _iter_pages(
+        self,
+        path: str,
+        *,
+        limit: Optional[int] = None,
+        page_size: Optional[int] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        first_payload: Any = None,
+        columnar: bool = False,
+    ) -> Iterator[Any]:
+        """Yield the records of ``path`` one page at a time.
+
+        Only the current page is kept in memory.  ``limit`` caps the total
+        number of records; ``page_size`` overrides the client default.
+        ``first_payload`` is the already fetched response of the first page
+        (used by the async client after detecting the pagination style).
+        With ``columnar`` each page is a :class:`ColumnBuffer` parsed while
+        the body streams in, instead of a list of dictionaries.
+        """
+
+        page_size = page_size or self._page_size
+        url = _EndpointConfig(base_url=self._base_url, path=path).build_url()
+        params = self._build_params(limit=page_size if limit is None else min(page_size, limit), filters=filters)
+        offset = 0
+        received = 0
+        pages = 0
+        seen_tokens = set()
+        followed_links = False
+
+        while True:
+            if first_payload is not None:
+                payload, first_payload = first_payload, None
+                records = self._records_from(payload, url)
+            elif columnar:
+                records, payload = self._get_columns(url, params)
+            else:
+                payload = self._get_json(url, params)
+                records = self._records_from(payload, url)
+            if limit is not None and received + len(records) > limit:
+                keep = limit - received
+                records = records.truncate(keep) if columnar else records[:keep]
+            if not records:
+                break
+
+            pages += 1
+            received += len(records)
+            yield records
+
+            if limit is not None and received >= limit:
+                break
+
+            remaining = None if limit is None else limit - received
+            request_size = page_size if remaining is None else min(page_size, remaining)
+            next_url, cursor = self._next_page(payload)
+            token = next_url or cursor
+            if token is not None:
+                if repr(token) in seen_tokens:
+                    logger.warning("Paginação de %s repetiu a página %r; interrompendo.", path, token)
+                    break
+                seen_tokens.add(repr(token))
+            if next_url:
+                # O link seguinte já traz os parâmetros da consulta.
+                url, params = urljoin(url, next_url), None
+                followed_links = True
+            elif cursor is not None:
+                params = self._build_params(limit=request_size, filters=filters)
+                params["cursor"] = cursor
+                followed_links = True
+            elif followed_links or (
+                isinstance(payload, dict) and any(key in payload for key in _NEXT_LINK_KEYS + _CURSOR_KEYS + ("links",))
+            ):
+                # Paginação por link/cursor sem próxima página (p. ex. NDJSON sem
+                # cabeçalho Link na última página): fim da coleção.
+                break
+            elif len(records) > page_size:
+                # Servidor que ignora a paginação: a coleção inteira veio de uma vez.
+                break
+            else:
+                # Servidores podem limitar o tamanho da página abaixo do pedido: uma
+                # página curta não é a última.  O fim é o ``total`` do envelope ou,
+                # sem ele, a primeira página vazia.
+                total = self._declared_total(payload)
+                if total is not None and received >= total:
+                    break
+                offset += len(records)
+                params = self._build_params(limit=request_size, filters=filters)
+                params["offset"] = offset
+
+        logger.info("Banco astrológico retornou %s registros de %s em %s páginas", received, path, pages)
+
+    @staticmethod
+    def _declared_total(payload: Any) -> Optional[int]:
+        if not isinstance(payload, dict):
+            return None
+        return next((payload[key] for key in _TOTAL_KEYS if type(payload.get(key)) is int), None)
+
+    @staticmethod
+    def _next_page(payload: Any) -> Tuple[Optional[str], Optional[Any]]:
+        if not isinstance(payload, dict):
+            return None, None
+        links = payload.get("links")
+        candidates = [payload] + ([links] if isinstance(links, dict) else [])
+        for container in candidates:
+            for key in _NEXT_LINK_KEYS:
+                value = container.get(key)
+                if isinstance(value, str) and value:
+                    return value, None
+        for key in _CURSOR_KEYS:
+            value = payload.get(key)
+            if value not in (None, ""):
+                return None, value
+        return None, None
+
     def _build_headers(self) -> Dict[str, str]:
-        headers = {"Accept": "application/json"}
+        headers = {
+            "Accept": "application/json, application/x-ndjson;q=0.9",
+            # gzip/deflate sempre; zstd quando o urllib3 consegue descomprimir.
+            "Accept-Encoding": ACCEPT_ENCODING,
+        }
         if self._api_key:
             headers["Authorization"] = f"Bearer {self._api_key}"
         return headers
@@ -177,11 +702,73 @@ class AstroDatabaseClient:
         if isinstance(payload, list):
             return payload
         if isinstance(payload, dict):
-            for key in ("results", "data", "items", "records"):
+            for key in _RECORD_KEYS:
                 value = payload.get(key)
                 if isinstance(value, list):
                     return value
         return payload
 
 
-__all__ = ["AstroDatabaseClient", "AstroDatabaseError"]
+def _encode_value(value: Any) -> Any:
+    if hasattr(value, "item") and callable(value.item):
+        value = value.item()  # escalares do numpy
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _is_sequence(value: Any) -> bool:
+    return isinstance(value, (list, tuple, set, frozenset))
+
+
+def build_query(fields: Fields = None, filters: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Encode ``fields`` and typed ``filters`` as query parameters.
+
+    Filters set to ``None`` are dropped.  Raises :class:`AstroDatabaseError` for
+    an unknown operator or a list given to a comparison operator.
+    """
+
+    params: Dict[str, Any] = {}
+    for key, value in (filters or {}).items():
+        if value is None:
+            continue
+        column, _, operator = key.rpartition("__")
+        if column and operator not in FILTER_OPERATORS:
+            raise AstroDatabaseError(
+                f"Operador de filtro desconhecido em {key!r}. Use um de: {', '.join(FILTER_OPERATORS)}."
+            )
+        if _is_sequence(value):
+            if column and operator in _SCALAR_OPERATORS:
+                raise AstroDatabaseError(f"O filtro {key!r} aceita um único valor, não uma lista.")
+            values = sorted(value, key=str) if isinstance(value, (set, frozenset)) else value
+            params[key] = ",".join(str(_encode_value(item)) for item in values)
+        else:
+            params[key] = _encode_value(value)
+
+    if fields is not None:
+        names: Iterable[str] = fields.split(",") if isinstance(fields, str) else fields
+        # Ordem preservada e sem repetições: a mesma projeção gera a mesma chave de cache.
+        unique = list(dict.fromkeys(name.strip() for name in names if name and name.strip()))
+        if not unique:
+            raise AstroDatabaseError("fields= precisa de pelo menos uma coluna.")
+        params[FIELDS_PARAM] = ",".join(unique)
+    return params
+
+
+def _endpoint_path(name: str) -> str:
+    env_var, default = ENDPOINTS[name]
+    return os.getenv(env_var, default)
+
+
+__all__ = [
+    "AstroDatabaseClient",
+    "AstroDatabaseError",
+    "AstroDatabaseUnavailable",
+    "DEFAULT_PAGE_SIZE",
+    "ENDPOINTS",
+    "FIELDS_PARAM",
+    "FILTER_OPERATORS",
+    "build_query",
+]
@@ -0,0 +1,269 @@
+"""Retries, circuit breaker and request metrics for the database client.
+
+Without this layer a single timeout of the remote database became an
+:class:`astro_database_client.AstroDatabaseError` and every script silently
+fell back to the sample CSVs.  :class:`astro_database_client.AstroDatabaseClient`
+now:
+
+- retries connection errors, timeouts and ``429``/``5xx`` answers with
+  exponential backoff and full jitter, honouring ``Retry-After``;
+- shares one :class:`CircuitBreaker` per base URL inside the process: after
+  ``failure_threshold`` consecutive failed requests (connection errors,
+  timeouts and retryable statuses after the last retry) it fails fast for
+  ``reset_timeout`` seconds, then lets one trial request through;
+- records per-endpoint latency percentiles, errors and retries in
+  :class:`ClientMetrics`.
+
+Environment variables (all optional):
+
+``ASTRO_DB_MAX_RETRIES`` (default 3), ``ASTRO_DB_BACKOFF_BASE`` (seconds,
+default 0.5), ``ASTRO_DB_BACKOFF_MAX`` (seconds, default 30),
+``ASTRO_DB_BREAKER_THRESHOLD`` (default 5) and ``ASTRO_DB_BREAKER_RESET``
+(seconds, default 30).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import random
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Deque, Dict, FrozenSet, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+# Latências guardadas por endpoint para os percentis (janela das mais recentes).
+LATENCY_WINDOW = 2048
+
+
+def _env_number(name: str, default: float, cast=float):
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    try:
+        return cast(value)
+    except ValueError as exc:
+        raise ValueError(f"Valor inválido para {name}: {value!r}.") from exc
+
+
+@dataclass
+class RetryPolicy:
+    """Exponential backoff with full jitter: ``uniform(0, min(max, base * 2**attempt))``."""
+
+    max_retries: int = 3
+    backoff_base: float = 0.5
+    backoff_max: float = 30.0
+    retry_statuses: FrozenSet[int] = RETRY_STATUSES
+
+    @classmethod
+    def from_env(cls) -> "RetryPolicy":
+        return cls(
+            max_retries=_env_number("ASTRO_DB_MAX_RETRIES", cls.max_retries, int),
+            backoff_base=_env_number("ASTRO_DB_BACKOFF_BASE", cls.backoff_base),
+            backoff_max=_env_number("ASTRO_DB_BACKOFF_MAX", cls.backoff_max),
+        )
+
+    def delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a ``Retry-After`` header (delta-seconds or HTTP date)."""
+
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    try:
+        return parsedate_to_datetime(value).timestamp() - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised by :meth:`CircuitBreaker.before_call` while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with the usual closed/open/half-open states."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, name: str, *, failure_threshold: int = 5, reset_timeout: float = 30.0) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            remaining = self._opened_at + self.reset_timeout - time.monotonic()
+            if self.state == self.OPEN and remaining <= 0:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.HALF_OPEN and not self._trial_in_flight:
+                # Apenas uma requisição de teste passa enquanto o circuito está meio aberto.
+                self._trial_in_flight = True
+                return
+            raise CircuitOpenError(
+                f"Circuito do banco astrológico aberto para {self.name}; "
+                f"nova tentativa em {max(remaining, 0):.0f}s."
+            )
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logger.info("Circuito do banco astrológico fechado para %s.", self.name)
+            self.state = self.CLOSED
+            self._failures = 0
+            self._trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """End a call that says nothing about the service (it was never reached)."""
+
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._trial_in_flight = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        "Circuito do banco astrológico aberto para %s após %s falhas consecutivas.",
+                        self.name,
+                        self._failures,
+                    )
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+_BREAKERS: Dict[str, CircuitBreaker] = {}
+_BREAKERS_LOCK = threading.Lock()
+
+
+def breaker_for(base_url: str) -> CircuitBreaker:
+    """Process-wide breaker of ``base_url`` (shared by every client instance)."""
+
+    with _BREAKERS_LOCK:
+        breaker = _BREAKERS.get(base_url)
+        if breaker is None:
+            breaker = CircuitBreaker(
+                base_url,
+                failure_threshold=_env_number("ASTRO_DB_BREAKER_THRESHOLD", 5, int),
+                reset_timeout=_env_number("ASTRO_DB_BREAKER_RESET", 30.0),
+            )
+            _BREAKERS[base_url] = breaker
+        return breaker
+
+
+@dataclass
+class EndpointMetrics:
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    rejected: int = 0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=LATENCY_WINDOW))
+
+
+class ClientMetrics:
+    """Per-endpoint request counters and latency window (thread-safe)."""
+
+    def __init__(self) -> None:
+        self._endpoints: Dict[str, EndpointMetrics] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints.setdefault(endpoint, EndpointMetrics())
+        return metrics
+
+    def record(self, endpoint: str, seconds: float, *, error: bool = False) -> None:
+        with self._lock:
+            metrics = self._get(endpoint)
+            metrics.requests += 1
+            metrics.errors += int(error)
+            metrics.latencies.append(seconds)
+
+    def record_retry(self, endpoint: str) -> None:
+        with self._lock:
+            self._get(endpoint).retries += 1
+
+    def record_rejected(self, endpoint: str) -> None:
+        with self._lock:
+            self._get(endpoint).rejected += 1
+
+    def summary(self) -> List[Dict[str, float]]:
+        rows = []
+        with self._lock:
+            for endpoint, metrics in sorted(self._endpoints.items()):
+                latencies = sorted(metrics.latencies)
+
+                def percentile(q: float) -> float:
+                    if not latencies:
+                        return float("nan")
+                    return latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000
+
+                rows.append(
+                    {
+                        "endpoint": endpoint,
+                        "requests": metrics.requests,
+                        "errors": metrics.errors,
+                        "error_rate": metrics.errors / metrics.requests if metrics.requests else 0.0,
+                        "retries": metrics.retries,
+                        "rejected": metrics.rejected,
+                        "p50_ms": percentile(0.50),
+                        "p95_ms": percentile(0.95),
+                        "p99_ms": percentile(0.99),
+                        "max_ms": latencies[-1] * 1000 if latencies else float("nan"),
+                    }
+                )
+        return rows
+
+    def log_summary(self) -> None:
+        for row in self.summary():
+            logger.info(
+                "Banco astrológico %s: %s req, %s erros (%.1f%%), %s retentativas, %s rejeitadas; "
+                "p50=%.1fms p95=%.1fms p99=%.1fms max=%.1fms",
+                row["endpoint"],
+                row["requests"],
+                row["errors"],
+                row["error_rate"] * 100,
+                row["retries"],
+                row["rejected"],
+                row["p50_ms"],
+                row["p95_ms"],
+                row["p99_ms"],
+                row["max_ms"],
+            )
+
+
+__all__ = [
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "ClientMetrics",
+    "RETRY_STATUSES",
+    "RetryPolicy",
+    "breaker_for",
+    "parse_retry_after",
+]
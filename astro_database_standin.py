@@ -0,0 +1,300 @@
+"""Local stand-in for the astrological database service.
+
+Serves the sample datasets of ``data/`` on the endpoint paths used by
+:class:`astro_database_client.AstroDatabaseClient`, so the client (and the
+whole pipeline) can be exercised and measured offline:
+
+- ``records`` rows per endpoint, cycling the sample rows (names get a
+  ``#<n>`` suffix after the first cycle so they stay unique);
+- ``latency_ms`` of simulated round trip before every response;
+- ``pagination``: ``offset`` (with ``total`` in the envelope), ``cursor``
+  (``next_cursor``) or ``link`` (relative ``next`` URL);
+- ``response_format``: ``json`` envelopes or ``ndjson`` lines (the next page
+  of cursor/link pagination then goes in the ``Link`` header);
+- gzip bodies when the request accepts them (``gzip=False`` disables it);
+- ``fields=`` projection; other filters are ignored;
+- ``POST``/``PUT`` uploads are accepted and counted in ``uploads``.
+
+Usage::
+
+    python astro_database_standin.py --port 8765 --records 100000 --latency-ms 20
+    export ASTRO_DB_BASE_URL="http://127.0.0.1:8765"
+"""
+
+from __future__ import annotations
+
+import csv
+import gzip
+import json
+import logging
+import multiprocessing
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlencode, urlparse
+
+from astro_database_client import ENDPOINTS, _endpoint_path
+
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+DATA_DIR = BASE_DIR / "data"
+
+# Amostra servida por cada endpoint do cliente.
+SAMPLE_FILES = {
+    "people": DATA_DIR / "sample_person_2025_update.csv",
+    "cleaned": DATA_DIR / "sample_pantheon_cleaned_data.csv",
+    "reduced": DATA_DIR / "sample_pantheon_reduced_1000.csv",
+    "features": DATA_DIR / "sample_astrological_features.csv",
+    "prepared": DATA_DIR / "sample_prepared_ml_data.csv",
+}
+PAGINATION_STYLES = ("offset", "cursor", "link")
+RESPONSE_FORMATS = ("json", "ndjson")
+DEFAULT_LIMIT = 1000
+# Corpos menores que isso não compensam a compressão.
+_GZIP_MIN_BYTES = 1024
+
+
+def _coerce(value: str) -> Any:
+    if value == "":
+        return None
+    for cast in (int, float):
+        try:
+            return cast(value)
+        except ValueError:
+            pass
+    return value
+
+
+def load_sample(path: Path) -> List[Dict[str, Any]]:
+    with open(path, newline="", encoding="utf-8") as handle:
+        return [{key: _coerce(value) for key, value in row.items()} for row in csv.DictReader(handle)]
+
+
+@dataclass
+class StandinConfig:
+    records: Optional[int] = None
+    latency_ms: float = 0.0
+    pagination: str = "offset"
+    response_format: str = "json"
+    gzip: bool = True
+
+    def __post_init__(self) -> None:
+        if self.pagination not in PAGINATION_STYLES:
+            raise ValueError(f"Paginação desconhecida: {self.pagination!r}. Use {', '.join(PAGINATION_STYLES)}.")
+        if self.response_format not in RESPONSE_FORMATS:
+            raise ValueError(f"Formato desconhecido: {self.response_format!r}. Use {', '.join(RESPONSE_FORMATS)}.")
+
+
+class _Dataset:
+    """``size`` rows generated on demand from the sample rows."""
+
+    def __init__(self, sample: List[Dict[str, Any]], size: Optional[int]) -> None:
+        self._sample = sample
+        self.size = len(sample) if size is None else size
+
+    def rows(self, start: int, stop: int, fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+        rows = []
+        count = len(self._sample)
+        for index in range(start, min(stop, self.size)):
+            row = self._sample[index % count]
+            if index >= count and "name" in row:
+                row = {**row, "name": f"{row['name']} #{index}"}
+            if fields:
+                row = {key: row.get(key) for key in fields}
+            rows.append(row)
+        return rows
+
+
+class StandinServer:
+    """Threaded HTTP stand-in; use as a context manager or call :meth:`close`."""
+
+    def __init__(self, config: Optional[StandinConfig] = None, *, host: str = "127.0.0.1", port: int = 0,
+                 serve: bool = True) -> None:
+        self.config = config or StandinConfig()
+        self.datasets = {
+            _endpoint_path(name).rstrip("/") or "/": _Dataset(load_sample(SAMPLE_FILES[name]), self.config.records)
+            for name in ENDPOINTS
+        }
+        self.requests = 0
+        self.uploads = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://{host}:{self._httpd.server_port}"
+        if serve:
+            threading.Thread(target=self.serve_forever, daemon=True).start()
+
+    def __enter__(self) -> "StandinServer":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever(poll_interval=0.1)
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def page(self, path: str, query: Dict[str, str]) -> Tuple[Optional[List[Dict[str, Any]]], Dict[str, Any]]:
+        """Rows of one page and the envelope keys (``total``/``next``/``next_cursor``)."""
+
+        dataset = self.datasets.get(path.rstrip("/") or "/")
+        if dataset is None:
+            return None, {}
+        limit = int(query.get("limit", DEFAULT_LIMIT))
+        if self.config.pagination == "cursor" and query.get("cursor"):
+            offset = int(query["cursor"].lstrip("c"))
+        else:
+            offset = int(query.get("offset", 0))
+        fields = [name for name in query.get("fields", "").split(",") if name] or None
+        rows = dataset.rows(offset, offset + limit, fields)
+
+        following = offset + len(rows)
+        more = following < dataset.size and len(rows) == limit
+        envelope: Dict[str, Any] = {}
+        if self.config.pagination == "offset":
+            envelope["total"] = dataset.size
+        elif self.config.pagination == "cursor":
+            envelope["next_cursor"] = f"c{following}" if more else None
+        else:
+            next_query = {key: value for key, value in query.items() if key != "offset"}
+            next_query.update({"offset": following, "limit": limit})
+            envelope["next"] = f"{path}?{urlencode(next_query)}" if more else None
+        return rows, envelope
+
+    def _handler_class(self):
+        server = self
+        delay = self.config.latency_ms / 1000.0
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Cabeçalhos e corpo saem em writes separados; com Nagle o segundo
+            # esperaria o ACK atrasado do cliente (~40 ms por resposta).
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args) -> None:  # pragma: no cover - silencia o log do servidor
+                pass
+
+            def _reply(self, status: int, body: bytes, content_type: str, headers: Dict[str, str]) -> None:
+                if (
+                    server.config.gzip
+                    and len(body) >= _GZIP_MIN_BYTES
+                    and "gzip" in self.headers.get("Accept-Encoding", "")
+                ):
+                    body = gzip.compress(body, compresslevel=1)
+                    headers = {**headers, "Content-Encoding": "gzip"}
+                time.sleep(delay)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                with server._lock:
+                    server.requests += 1
+                rows, envelope = server.page(parsed.path, query)
+                if rows is None:
+                    self._reply(404, b'{"detail": "not found"}', "application/json", {})
+                    return
+                if server.config.response_format == "json":
+                    body = json.dumps({"results": rows, **envelope}).encode("utf-8")
+                    self._reply(200, body, "application/json", {})
+                    return
+                headers = {}
+                link = envelope.get("next") or (
+                    f"{parsed.path}?{urlencode({**query, 'cursor': envelope['next_cursor']})}"
+                    if envelope.get("next_cursor")
+                    else None
+                )
+                if link:
+                    headers["Link"] = f'<{link}>; rel="next"'
+                body = "".join(json.dumps(row) + "\n" for row in rows).encode("utf-8")
+                self._reply(200, body, "application/x-ndjson", headers)
+
+            def do_POST(self) -> None:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                accepted = len(payload.get("records", []))
+                with server._lock:
+                    server.requests += 1
+                    server.uploads += accepted
+                self._reply(200, json.dumps({"accepted": accepted}).encode("utf-8"), "application/json", {})
+
+            do_PUT = do_POST
+
+        return Handler
+
+
+def _serve_in_child(config: StandinConfig, ready) -> None:
+    server = StandinServer(config, serve=False)
+    ready.put(server.base_url)
+    server.serve_forever()
+
+
+def start_standin_process(config: Optional[StandinConfig] = None) -> Tuple[multiprocessing.Process, str]:
+    """Run the stand-in in a child process (keeps its CPU and memory out of measurements)."""
+
+    ready = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve_in_child, args=(config or StandinConfig(), ready), daemon=True)
+    process.start()
+    return process, ready.get(timeout=30)
+
+
+def main() -> None:
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="Servidor local que imita o banco astrológico.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--records", type=int, default=None, help="Registros por endpoint (padrão: a amostra).")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Latência simulada por requisição.")
+    parser.add_argument("--pagination", choices=PAGINATION_STYLES, default="offset")
+    parser.add_argument("--format", dest="response_format", choices=RESPONSE_FORMATS, default="json")
+    parser.add_argument("--no-gzip", dest="gzip", action="store_false", help="Nunca comprime as respostas.")
+    args = parser.parse_args()
+
+    config = StandinConfig(
+        records=args.records,
+        latency_ms=args.latency_ms,
+        pagination=args.pagination,
+        response_format=args.response_format,
+        gzip=args.gzip,
+    )
+    server = StandinServer(config, host=args.host, port=args.port, serve=False)
+    logging.info("Servidor local do banco astrológico em %s (Ctrl+C para encerrar)", server.base_url)
+    for path, dataset in sorted(server.datasets.items()):
+        logging.info("  %s: %s registros", path, dataset.size)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+
+__all__ = [
+    "PAGINATION_STYLES",
+    "RESPONSE_FORMATS",
+    "SAMPLE_FILES",
+    "StandinConfig",
+    "StandinServer",
+    "load_sample",
+    "start_standin_process",
+]
+
+
+if __name__ == "__main__":
+    main()
+
@@ -0,0 +1,410 @@
+"""Incremental parsing of database responses into typed column buffers.
+
+``response.json()`` keeps the whole body in memory and then builds a list of
+dictionaries on top of it.  For multi-hundred-MB pages the streaming path of
+:class:`astro_database_client.AstroDatabaseClient` (``as_frames=True``)
+instead:
+
+- reads the (gzip/deflate/zstd-decoded) body in chunks;
+- parses it incrementally: :class:`JsonRecordParser` walks the top-level
+  object, streams the elements of the ``results``/``data``/``items``/
+  ``records`` array one by one and keeps the other keys (``next``,
+  ``total``...) as the envelope; :class:`NdjsonRecordParser` handles
+  ``application/x-ndjson`` bodies, one record per line;
+- appends each record straight to a :class:`ColumnBuffer`, which stores
+  integers, floats and booleans in ``array.array`` buffers (8 bytes per value,
+  no Python object per cell) and converts to a ``DataFrame`` without an
+  intermediate list of dictionaries.
+
+zstd is negotiated only when ``urllib3`` can decode it (``zstandard``
+installed); gzip and deflate are always accepted.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:  # pragma: no cover - dependências opcionais
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependências opcionais
+    np = None
+    pd = None
+
+try:  # pragma: no cover - depende da versão do urllib3
+    from urllib3.util.request import ACCEPT_ENCODING
+except ImportError:  # pragma: no cover - depende da versão do urllib3
+    ACCEPT_ENCODING = "gzip,deflate"
+
+
+RECORD_KEYS = ("results", "data", "items", "records")
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/ndjson", "application/jsonl", "application/json-lines")
+STREAM_CHUNK_SIZE = 256 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_NUMBER_CONTINUATION = frozenset("0123456789+-.eE")
+# Descarta o prefixo já consumido do buffer de texto a partir deste tamanho.
+_COMPACT_AT = 1 << 16
+
+
+class StreamParseError(ValueError):
+    """Raised when a streamed body is not valid JSON/NDJSON."""
+
+
+# ----------------------------------------------------------------------
+# Column buffers
+# ----------------------------------------------------------------------
+class _Column:
+    __slots__ = ("kind", "values")
+
+    # kind: "int" -> array('q'), "float" -> array('d'), "bool" -> array('b'), "object" -> list
+    def __init__(self, kind: str, values) -> None:
+        self.kind = kind
+        self.values = values
+
+    @classmethod
+    def for_value(cls, value: Any, backfill: int) -> "_Column":
+        if backfill:
+            # Linhas anteriores sem a coluna: nulos.
+            column = cls("float", array("d", [float("nan")] * backfill)) if _is_number(value) else cls(
+                "object", [None] * backfill
+            )
+        elif isinstance(value, bool):
+            column = cls("bool", array("b"))
+        elif isinstance(value, int):
+            column = cls("int", array("q"))
+        elif isinstance(value, float):
+            column = cls("float", array("d"))
+        else:
+            column = cls("object", [])
+        return column
+
+    def append(self, value: Any) -> None:
+        kind = self.kind
+        if kind == "object":
+            self.values.append(value)
+        elif kind == "int":
+            if type(value) is int and -(2**63) <= value < 2**63:
+                self.values.append(value)
+            elif isinstance(value, float) or value is None:
+                self._promote("float")
+                self.values.append(float("nan") if value is None else value)
+            else:
+                self._promote("object")
+                self.values.append(value)
+        elif kind == "float":
+            if value is None:
+                self.values.append(float("nan"))
+            elif _is_number(value):
+                self.values.append(float(value))
+            else:
+                self._promote("object")
+                self.values.append(value)
+        else:  # bool
+            if isinstance(value, bool):
+                self.values.append(value)
+            else:
+                self._promote("object")
+                self.values.append(value)
+
+    def _promote(self, kind: str) -> None:
+        if kind == "float":
+            self.values = array("d", self.values)
+        else:
+            source = self.values
+            if self.kind == "bool":
+                self.values = [bool(value) for value in source]
+            elif self.kind == "float":
+                self.values = [None if value != value else value for value in source]
+            else:
+                self.values = list(source)
+        self.kind = kind
+
+    def to_numpy(self):
+        if self.kind == "int":
+            return np.frombuffer(self.values, dtype=np.int64) if len(self.values) else np.empty(0, dtype=np.int64)
+        if self.kind == "float":
+            return np.frombuffer(self.values, dtype=np.float64) if len(self.values) else np.empty(0)
+        if self.kind == "bool":
+            return np.frombuffer(self.values, dtype=np.int8).astype(bool) if len(self.values) else np.empty(0, bool)
+        values = np.empty(len(self.values), dtype=object)
+        values[:] = self.values
+        return values
+
+
+def _is_number(value: Any) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+class ColumnBuffer:
+    """Column-oriented accumulator of JSON records."""
+
+    def __init__(self) -> None:
+        self._columns: Dict[str, _Column] = {}
+        self._rows = 0
+
+    def __len__(self) -> int:
+        return self._rows
+
+    @property
+    def columns(self) -> List[str]:
+        return list(self._columns)
+
+    def append(self, record: Dict[str, Any]) -> None:
+        if not isinstance(record, dict):
+            raise StreamParseError(f"Registro inesperado (esperado objeto JSON): {record!r}")
+        columns = self._columns
+        for name, value in record.items():
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = _Column.for_value(value, self._rows)
+            column.append(value)
+        self._rows += 1
+        if len(record) != len(columns):
+            for name, column in columns.items():
+                if len(column.values) < self._rows:
+                    column.append(None)
+
+    def truncate(self, rows: int) -> "ColumnBuffer":
+        """Keep only the first ``rows`` records (in place)."""
+
+        if rows < self._rows:
+            for column in self._columns.values():
+                del column.values[rows:]
+            self._rows = max(rows, 0)
+        return self
+
+    def to_frame(self) -> "pd.DataFrame":
+        if pd is None:
+            raise RuntimeError("Pandas é obrigatório para converter os registros em DataFrame.")
+        return pd.DataFrame({name: column.to_numpy() for name, column in self._columns.items()})
+
+    def to_records(self) -> List[Dict[str, Any]]:
+        names = list(self._columns)
+        columns = [column.values for column in self._columns.values()]
+        return [dict(zip(names, row)) for row in zip(*columns)]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the numeric buffers (object columns count 8 bytes per reference)."""
+
+        return sum(
+            column.values.itemsize * len(column.values) if isinstance(column.values, array) else 8 * len(column.values)
+            for column in self._columns.values()
+        )
+
+
+# ----------------------------------------------------------------------
+# Incremental parsers
+# ----------------------------------------------------------------------
+class JsonRecordParser:
+    """Push parser for ``[...]`` or ``{"results": [...], ...}`` bodies.
+
+    :meth:`feed` returns the records completed by the new chunk; after
+    :meth:`close`, :attr:`envelope` holds the other top-level keys (``None``
+    when the body is a bare array) and :attr:`found_records` tells whether a
+    record array was present at all.
+    """
+
+    def __init__(self, record_keys: Iterable[str] = RECORD_KEYS) -> None:
+        self._record_keys = tuple(record_keys)
+        self._decoder = json.JSONDecoder()
+        self._text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self._buffer = ""
+        self._pos = 0
+        # start -> object (entre chaves) | array (elementos) -> object ... -> done
+        self._state = "start"
+        self._key: Optional[str] = None
+        # Objeto: "first" | "key" -> "colon" -> "value" -> "comma"; lista: "first" | "value" -> "comma"
+        self._expect = "first"
+        self.envelope: Optional[Dict[str, Any]] = None
+        self.found_records = False
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        self._decode_text(chunk, final=False)
+        return self._parse(final=False)
+
+    def close(self) -> List[Any]:
+        self._decode_text(b"", final=True)
+        records = self._parse(final=True)
+        if self._state != "done":
+            raise StreamParseError("Resposta JSON truncada.")
+        return records
+
+    def _decode_text(self, chunk: bytes, final: bool) -> None:
+        try:
+            self._buffer += self._text_decoder.decode(chunk, final=final)
+        except UnicodeDecodeError as exc:
+            raise StreamParseError(f"Resposta com UTF-8 inválido: {exc.reason}") from exc
+
+    def _skip_ws(self) -> None:
+        self._pos = _WHITESPACE.match(self._buffer, self._pos).end()
+
+    def _decode_value(self, final: bool):
+        """Decode the next complete value, or return ``(None, False)`` if more data is needed."""
+
+        try:
+            value, end = self._decoder.raw_decode(self._buffer, self._pos)
+        except json.JSONDecodeError as exc:
+            if final:
+                raise StreamParseError(f"JSON inválido na posição {exc.pos}: {exc.msg}") from exc
+            return None, False
+        # Um número no fim do buffer (ou cortado em "1." / "2e") pode continuar no próximo bloco.
+        if not final and not isinstance(value, (dict, list, str)):
+            if end == len(self._buffer) or (_is_number(value) and self._buffer[end] in _NUMBER_CONTINUATION):
+                return None, False
+        self._pos = end
+        return value, True
+
+    def _parse(self, final: bool) -> List[Any]:
+        records: List[Any] = []
+        while True:
+            self._skip_ws()
+            if self._pos >= len(self._buffer):
+                break
+            char = self._buffer[self._pos]
+            state = self._state
+
+            if state == "start":
+                if char == "[":
+                    self._pos += 1
+                    self._state, self.found_records = "array", True
+                elif char == "{":
+                    self._pos += 1
+                    self._state, self.envelope = "object", {}
+                else:
+                    raise StreamParseError("Esperado objeto ou lista JSON no início da resposta.")
+
+            elif state == "object":
+                if self._expect == "comma":
+                    if char == ",":
+                        self._pos += 1
+                        self._expect = "key"
+                    elif char == "}":
+                        self._pos += 1
+                        self._state = "done"
+                    else:
+                        raise StreamParseError(f"Esperado ',' ou '}}' na resposta JSON, encontrado {char!r}.")
+                elif self._expect in ("first", "key"):
+                    if char == "}" and self._expect == "first":
+                        self._pos += 1
+                        self._state = "done"
+                    elif char != '"':
+                        raise StreamParseError(f"Esperada chave JSON na resposta, encontrado {char!r}.")
+                    else:
+                        key, complete = self._decode_value(final)
+                        if not complete:
+                            break
+                        self._key, self._expect = key, "colon"
+                elif self._expect == "colon":
+                    if char != ":":
+                        raise StreamParseError(f"Caractere inesperado {char!r} na resposta JSON.")
+                    self._pos += 1
+                    self._expect = "value"
+                elif self._key in self._record_keys and not self.found_records and char == "[":
+                    self._pos += 1
+                    self._state, self.found_records = "array", True
+                    self._key, self._expect = None, "first"
+                else:
+                    value, complete = self._decode_value(final)
+                    if not complete:
+                        break
+                    self.envelope[self._key] = value
+                    self._key, self._expect = None, "comma"
+
+            elif state == "array":
+                if self._expect == "comma":
+                    if char == ",":
+                        self._pos += 1
+                        self._expect = "value"
+                    elif char == "]":
+                        self._pos += 1
+                        self._state = "object" if self.envelope is not None else "done"
+                    else:
+                        raise StreamParseError(f"Esperado ',' ou ']' na resposta JSON, encontrado {char!r}.")
+                elif char == "]" and self._expect == "first":
+                    self._pos += 1
+                    self._state = "object" if self.envelope is not None else "done"
+                    self._expect = "comma"
+                elif char in ",]":
+                    raise StreamParseError(f"Caractere inesperado {char!r} na lista JSON.")
+                else:
+                    value, complete = self._decode_value(final)
+                    if not complete:
+                        break
+                    records.append(value)
+                    self._expect = "comma"
+
+            else:  # done
+                raise StreamParseError("Dados extras após o fim da resposta JSON.")
+
+        if self._pos > _COMPACT_AT:
+            self._buffer = self._buffer[self._pos:]
+            self._pos = 0
+        return records
+
+
+class NdjsonRecordParser:
+    """Push parser for newline-delimited JSON (one record per line)."""
+
+    def __init__(self) -> None:
+        self._pending = b""
+        self.envelope: Optional[Dict[str, Any]] = None
+        self.found_records = True
+
+    def feed(self, chunk: bytes) -> List[Any]:
+        lines = (self._pending + chunk).split(b"\n")
+        self._pending = lines.pop()
+        return [self._loads(line) for line in lines if line.strip()]
+
+    def close(self) -> List[Any]:
+        line, self._pending = self._pending, b""
+        return [self._loads(line)] if line.strip() else []
+
+    @staticmethod
+    def _loads(line: bytes) -> Any:
+        try:
+            return json.loads(line)
+        except ValueError as exc:
+            raise StreamParseError(f"Linha NDJSON inválida: {exc}") from exc
+
+
+def parser_for(content_type: Optional[str]):
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    return NdjsonRecordParser() if media_type in NDJSON_CONTENT_TYPES else JsonRecordParser()
+
+
+def parse_into_columns(chunks: Iterable[bytes], content_type: Optional[str] = None):
+    """Parse byte ``chunks`` into ``(ColumnBuffer, envelope, found_records)``."""
+
+    parser = parser_for(content_type)
+    buffer = ColumnBuffer()
+    for chunk in chunks:
+        for record in parser.feed(chunk):
+            buffer.append(record)
+    for record in parser.close():
+        buffer.append(record)
+    return buffer, parser.envelope, parser.found_records
+
+
+def iter_chunks(body: bytes, size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+    view = memoryview(body)
+    for start in range(0, len(view), size):
+        yield bytes(view[start:start + size])
+
+
+__all__ = [
+    "ACCEPT_ENCODING",
+    "ColumnBuffer",
+    "JsonRecordParser",
+    "NdjsonRecordParser",
+    "RECORD_KEYS",
+    "STREAM_CHUNK_SIZE",
+    "StreamParseError",
+    "iter_chunks",
+    "parse_into_columns",
+    "parser_for",
+]
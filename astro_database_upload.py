@@ -0,0 +1,214 @@
+"""Batching and reporting for bulk uploads to the astrological database.
+
+:meth:`astro_database_client.AstroDatabaseClient.upload_astrological_features`
+and :meth:`~astro_database_client.AstroDatabaseClient.upload_prepared_ml_dataset`
+send computed rows back to the service so other pipeline nodes can reuse them
+instead of recomputing them:
+
+- rows (a ``DataFrame``, a list or any iterable of dictionaries) are split
+  into batches of ``batch_size`` and sent as ``{"records": [...]}`` with
+  ``POST`` (or ``PUT`` for replacements);
+- every batch carries an ``Idempotency-Key`` derived from the endpoint and the
+  batch content, so retries and re-runs of the same publication are
+  deduplicated by the server;
+- at most ``concurrency`` batches are in flight, and only those batches are
+  held in memory;
+- a failed batch does not stop the others: :class:`UploadReport` lists failed
+  batches and the per-record errors the server reports in ``errors``/
+  ``failed`` (``{"index": <position in the batch>, "error": ...}``).
+
+Environment variables (optional): ``ASTRO_DB_UPLOAD_BATCH_SIZE`` (default 500)
+and ``ASTRO_DB_UPLOAD_CONCURRENCY`` (default 4).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import math
+import os
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:  # pragma: no cover - dependências opcionais
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependências opcionais
+    pd = None
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_UPLOAD_CONCURRENCY = 4
+UPLOAD_METHODS = ("POST", "PUT")
+_RECORD_ERROR_KEYS = ("errors", "failed")
+
+
+def upload_setting(value: Optional[int], env_var: str, default: int) -> int:
+    """Explicit ``value``, else ``env_var``, else ``default``; must be positive."""
+
+    raw = value if value is not None else os.getenv(env_var, default)
+    try:
+        number = int(raw)
+    except ValueError as exc:
+        raise ValueError(f"Valor inválido para {env_var}: {raw!r}. Informe um inteiro.") from exc
+    if number <= 0:
+        raise ValueError(f"{env_var} deve ser maior que zero.")
+    return number
+
+
+def _clean_value(value: Any) -> Any:
+    if pd is not None and (value is pd.NA or value is pd.NaT):
+        return None
+    if hasattr(value, "item") and callable(value.item):
+        value = value.item()  # escalares do numpy
+    if isinstance(value, float) and not math.isfinite(value):
+        return None  # NaN/inf não existem em JSON
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _iter_rows(records: Any) -> Iterator[Dict[str, Any]]:
+    if pd is not None and isinstance(records, pd.DataFrame):
+        columns = [str(column) for column in records.columns]
+        for values in records.itertuples(index=False, name=None):
+            yield dict(zip(columns, values))
+    else:
+        yield from records
+
+
+def iter_batches(records: Any, batch_size: int) -> Iterator[Tuple[int, List[Dict[str, Any]]]]:
+    """Yield ``(start, batch)`` with JSON-ready rows, ``batch_size`` at a time."""
+
+    rows = _iter_rows(records)
+    start = 0
+    while True:
+        batch = [{key: _clean_value(value) for key, value in row.items()} for row in islice(rows, batch_size)]
+        if not batch:
+            return
+        yield start, batch
+        start += len(batch)
+
+
+def encode_batch(batch: List[Dict[str, Any]]) -> bytes:
+    return json.dumps({"records": batch}, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def idempotency_key(endpoint: str, body: bytes, namespace: Optional[str] = None) -> str:
+    """Deterministic key: the same batch sent twice to ``endpoint`` gets the same key."""
+
+    digest = hashlib.sha256()
+    for part in (namespace or "", endpoint):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    digest.update(body)
+    return digest.hexdigest()
+
+
+def record_errors(payload: Any) -> List[Dict[str, Any]]:
+    """Per-record errors reported in a batch response (empty when all were accepted)."""
+
+    if not isinstance(payload, dict):
+        return []
+    for key in _RECORD_ERROR_KEYS:
+        value = payload.get(key)
+        if isinstance(value, list):
+            return [item if isinstance(item, dict) else {"error": item} for item in value]
+    return []
+
+
+@dataclass
+class BatchFailure:
+    """A batch rejected as a whole (network error, 4xx/5xx after retries)."""
+
+    start: int
+    size: int
+    idempotency_key: str
+    error: str
+
+
+@dataclass
+class RecordFailure:
+    """A single row rejected inside an otherwise accepted batch."""
+
+    position: int
+    error: Any
+    record: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class UploadReport:
+    endpoint: str
+    method: str
+    records: int = 0
+    batches: int = 0
+    uploaded: int = 0
+    elapsed: float = 0.0
+    batch_failures: List[BatchFailure] = field(default_factory=list)
+    record_failures: List[RecordFailure] = field(default_factory=list)
+
+    @property
+    def failed(self) -> int:
+        return self.records - self.uploaded
+
+    @property
+    def ok(self) -> bool:
+        return not self.batch_failures and not self.record_failures
+
+    def add_batch(self, start: int, batch: List[Dict[str, Any]], payload: Any) -> None:
+        errors = record_errors(payload)
+        for item in errors:
+            index = item.get("index")
+            in_batch = isinstance(index, int) and 0 <= index < len(batch)
+            self.record_failures.append(
+                RecordFailure(
+                    position=start + index if in_batch else start,
+                    error=item.get("error", item),
+                    record=batch[index] if in_batch else None,
+                )
+            )
+        self.uploaded += len(batch) - len(errors)
+
+    def log_summary(self) -> None:
+        level = logging.INFO if self.ok else logging.WARNING
+        logger.log(
+            level,
+            "Envio para %s (%s): %s de %s registros aceitos em %s lotes (%.2fs); "
+            "%s lotes e %s registros rejeitados.",
+            self.endpoint,
+            self.method,
+            self.uploaded,
+            self.records,
+            self.batches,
+            self.elapsed,
+            len(self.batch_failures),
+            len(self.record_failures),
+        )
+        for failure in self.batch_failures[:5]:
+            logger.warning(
+                "Lote com registros %s-%s rejeitado: %s",
+                failure.start,
+                failure.start + failure.size - 1,
+                failure.error,
+            )
+        for failure in self.record_failures[:5]:
+            logger.warning("Registro %s rejeitado: %s", failure.position, failure.error)
+
+
+__all__ = [
+    "BatchFailure",
+    "DEFAULT_BATCH_SIZE",
+    "DEFAULT_UPLOAD_CONCURRENCY",
+    "RecordFailure",
+    "UPLOAD_METHODS",
+    "UploadReport",
+    "encode_batch",
+    "idempotency_key",
+    "iter_batches",
+    "record_errors",
+    "upload_setting",
+]
@@ -0,0 +1,189 @@
+"""Throughput and memory benchmark of the database client fetch modes.
+
+The local stand-in of :mod:`astro_database_standin` runs in a child process
+and serves ``--records`` rows of one endpoint (built from the ``data/``
+samples) with the chosen pagination, response format and simulated latency.
+Each fetch mode then reads the whole endpoint the way a script would:
+
+``fetch``
+    one ``fetch_*`` call that returns the full list of dictionaries;
+``iter``
+    ``iter_*`` records consumed one at a time;
+``frames``
+    ``iter_*(as_frames=True)`` DataFrame chunks consumed one at a time;
+``async xN``
+    :class:`AsyncAstroDatabaseClient` with ``N`` pages in flight (full list).
+
+Every mode runs twice: once timed (records/s) and once under ``tracemalloc``
+for the peak of Python allocations (``--no-memory`` skips the second run).
+
+Usage::
+
+    python benchmark_astro_database_client.py --records 20000 --page-size 500 --latency-ms 50
+    python benchmark_astro_database_client.py --endpoint prepared --format ndjson --pagination link
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+from astro_database_async import AsyncAstroDatabaseClient
+from astro_database_client import ENDPOINTS, AstroDatabaseClient
+from astro_database_standin import PAGINATION_STYLES, RESPONSE_FORMATS, StandinConfig, start_standin_process
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+BASE_DIR = Path(__file__).resolve().parent
+
+# Nome do endpoint em ENDPOINTS -> sufixo dos métodos fetch_*/iter_*.
+METHOD_SUFFIXES = {
+    "people": "people",
+    "cleaned": "cleaned_people",
+    "reduced": "reduced_people",
+    "features": "astrological_features",
+    "prepared": "prepared_ml_dataset",
+}
+
+
+def _run_fetch(base_url: str, endpoint: str, records: int, page_size: int) -> int:
+    client = AstroDatabaseClient(base_url=base_url, page_size=page_size)
+    rows = getattr(client, f"fetch_{METHOD_SUFFIXES[endpoint]}")(limit=records)
+    return len(rows)
+
+
+def _run_iter(base_url: str, endpoint: str, page_size: int) -> int:
+    client = AstroDatabaseClient(base_url=base_url, page_size=page_size)
+    count = sum(1 for _ in getattr(client, f"iter_{METHOD_SUFFIXES[endpoint]}")())
+    client.metrics.log_summary()
+    return count
+
+
+def _run_frames(base_url: str, endpoint: str, page_size: int) -> int:
+    client = AstroDatabaseClient(base_url=base_url, page_size=page_size)
+    return sum(len(frame) for frame in getattr(client, f"iter_{METHOD_SUFFIXES[endpoint]}")(as_frames=True))
+
+
+def _run_async(base_url: str, endpoint: str, page_size: int, concurrency: int) -> int:
+    async def _fetch() -> int:
+        async with AsyncAstroDatabaseClient(base_url=base_url, page_size=page_size, concurrency=concurrency) as db:
+            return len(await getattr(db, f"fetch_{METHOD_SUFFIXES[endpoint]}")())
+
+    return asyncio.run(_fetch())
+
+
+def _measure(run: Callable[[], int], memory: bool) -> Tuple[int, float, float]:
+    start = time.perf_counter()
+    count = run()
+    elapsed = time.perf_counter() - start
+    peak = float("nan")
+    if memory:
+        tracemalloc.start()
+        try:
+            run()
+            peak = tracemalloc.get_traced_memory()[1] / 2**20
+        finally:
+            tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mede registros/s e pico de memória de cada modo do cliente.")
+    parser.add_argument("--records", type=int, default=20000, help="Registros servidos pelo servidor local.")
+    parser.add_argument("--endpoint", choices=sorted(ENDPOINTS), default="people", help="Endpoint lido.")
+    parser.add_argument("--page-size", type=int, default=500, help="Registros por página.")
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Latência simulada por requisição.")
+    parser.add_argument("--pagination", choices=PAGINATION_STYLES, default="offset")
+    parser.add_argument("--format", dest="response_format", choices=RESPONSE_FORMATS, default="json")
+    parser.add_argument("--no-gzip", dest="gzip", action="store_false", help="Servidor sem compressão.")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        nargs="+",
+        default=[2, 4, 8, 16],
+        help="Níveis de concorrência testados no modo assíncrono.",
+    )
+    parser.add_argument("--modes", nargs="+", default=["fetch", "iter", "frames", "async"],
+                        choices=["fetch", "iter", "frames", "async"], help="Modos medidos.")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="Não mede o pico de memória.")
+    parser.add_argument("--output", type=Path, help="Grava os resultados em JSON.")
+    args = parser.parse_args()
+
+    # O cache em disco mediria o disco, não o cliente.
+    os.environ.pop("ASTRO_DB_CACHE_DIR", None)
+    logging.getLogger("astro_database_client").setLevel(logging.WARNING)
+    logging.getLogger("astro_database_async").setLevel(logging.WARNING)
+
+    config = StandinConfig(
+        records=args.records,
+        latency_ms=args.latency_ms,
+        pagination=args.pagination,
+        response_format=args.response_format,
+        gzip=args.gzip,
+    )
+    process, base_url = start_standin_process(config)
+
+    modes: List[Tuple[str, Callable[[], int]]] = []
+    if "fetch" in args.modes:
+        modes.append(("fetch", lambda: _run_fetch(base_url, args.endpoint, args.records, args.page_size)))
+    if "iter" in args.modes:
+        modes.append(("iter", lambda: _run_iter(base_url, args.endpoint, args.page_size)))
+    if "frames" in args.modes:
+        modes.append(("frames", lambda: _run_frames(base_url, args.endpoint, args.page_size)))
+    if "async" in args.modes:
+        modes += [
+            (f"async x{level}", lambda level=level: _run_async(base_url, args.endpoint, args.page_size, level))
+            for level in args.concurrency
+        ]
+
+    results: List[Dict[str, float]] = []
+    try:
+        for name, run in modes:
+            count, elapsed, peak = _measure(run, args.memory)
+            results.append(
+                {
+                    "mode": name,
+                    "records": count,
+                    "seconds": elapsed,
+                    "records_per_second": count / elapsed if elapsed else float("inf"),
+                    "peak_mib": peak,
+                }
+            )
+    finally:
+        process.terminate()
+        process.join()
+
+    logging.info(
+        "Benchmark: %s registros de %s, páginas de %s, latência %.0f ms, paginação %s, %s%s",
+        args.records,
+        args.endpoint,
+        args.page_size,
+        args.latency_ms,
+        args.pagination,
+        args.response_format,
+        " gzip" if args.gzip else "",
+    )
+    for row in results:
+        logging.info(
+            "%-10s %8s registros  %7.2fs  %9.0f registros/s  pico %7.1f MiB",
+            row["mode"],
+            row["records"],
+            row["seconds"],
+            row["records_per_second"],
+            row["peak_mib"],
+        )
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        logging.info("Resultados salvos em %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,385 @@
+"""Speed and parity benchmark of the chart engines used in the tree.
+
+The same ``--count`` births (a seeded reservoir sample of the cleaned
+Pantheon data, at local noon like the pipeline) are charted by every
+available engine:
+
+``swisseph``
+    raw pyswisseph: ``calc_ut`` per body and Placidus ``houses``;
+``kerykeion``
+    ``AstrologicalSubject`` (``generate_astro_charts.py``);
+``immanuel``
+    ``charts.Natal`` (``generate_astro_features.py`` and ``astro.py``).
+
+Each engine runs in its own freshly *spawned* process and imports its library
+only there, so the reported peak RSS holds one engine and nothing inherited
+from this process (a forked child would start at the parent's RSS).  The
+baseline of an empty worker is measured the same way, so the memory an engine
+adds is ``peak_rss_mib - baseline``; charts/s excludes one warm-up chart
+(libraries and ephemeris files are loaded lazily).  Every engine is then compared with ``--reference``
+(``swisseph`` by default): per body, the mean and maximum absolute difference
+of ecliptic longitude and how often the sign and the house agree.
+
+Usage::
+
+    python benchmark_chart_engines.py --count 500 --output chart_engines.json
+    python benchmark_chart_engines.py --engines kerykeion immanuel --reference immanuel
+"""
+
+from __future__ import annotations
+
+import argparse
+import importlib.util
+import json
+import logging
+import math
+import multiprocessing
+import resource
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from zoneinfo import ZoneInfo
+
+from create_reduced_dataset import reservoir_sample
+from feature_registry import BODIES
+from historical_dates import parse_dates
+
+try:  # pragma: no cover - dependências opcionais
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependências opcionais
+    pd = None
+
+try:  # pragma: no cover - dependências opcionais
+    from timezonefinder import TimezoneFinder
+except ImportError:  # pragma: no cover - dependências opcionais
+    TimezoneFinder = None
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+BASE_DIR = Path(__file__).resolve().parent
+INPUT_FILE = BASE_DIR / "pantheon_cleaned_data.csv"
+SAMPLE_FILE = BASE_DIR / "data" / "sample_pantheon_cleaned_data.csv"
+
+ENGINES = ("swisseph", "kerykeion", "immanuel")
+# Os motores só são importados dentro do processo de cada um (ver _run_engine).
+ENGINE_MODULES = {"swisseph": "swisseph", "kerykeion": "kerykeion", "immanuel": "immanuel"}
+ANGLES = ("Ascendant", "MC")
+POINTS = BODIES + ANGLES
+HOUSE_SYSTEM = b"P"  # Placidus, o padrão do kerykeion e do immanuel
+HOUSE_NAMES = (
+    "first", "second", "third", "fourth", "fifth", "sixth",
+    "seventh", "eighth", "ninth", "tenth", "eleventh", "twelfth",
+)
+
+# Longitude eclíptica (graus) e casa (1-12, ``None`` para os ângulos) de cada ponto.
+Position = Tuple[float, Optional[int]]
+Chart = Dict[str, Position]
+
+
+@dataclass
+class Birth:
+    name: str
+    year: int
+    month: int
+    day: int
+    latitude: float
+    longitude: float
+    timezone: str = "UTC"
+    hour: int = 12
+
+    def local_datetime(self) -> datetime:
+        return datetime(self.year, self.month, self.day, self.hour, tzinfo=ZoneInfo(self.timezone))
+
+
+def load_births(path: Path, count: int, seed: int) -> List[Birth]:
+    """``count`` valid births sampled from a cleaned CSV (dates within ``datetime`` range)."""
+
+    columns = ["name", "birthdate", "bplace_lat", "bplace_lon"]
+    with pd.read_csv(path, usecols=columns, dtype={"name": str, "birthdate": str}, chunksize=100_000) as reader:
+        # Sorteia com folga: linhas sem data utilizável são descartadas abaixo.
+        sample, _ = reservoir_sample(reader, 2 * count, seed)
+    parsed = parse_dates(sample["birthdate"])
+    usable = parsed.valid & (parsed.year >= 1) & sample["bplace_lat"].notna().to_numpy()
+    finder = TimezoneFinder() if TimezoneFinder is not None else None
+    births = []
+    for position in usable.nonzero()[0][:count]:
+        row = sample.iloc[position]
+        tz = finder.timezone_at(lng=row["bplace_lon"], lat=row["bplace_lat"]) if finder is not None else None
+        births.append(
+            Birth(
+                row["name"],
+                int(parsed.year[position]),
+                int(parsed.month[position]),
+                int(parsed.day[position]),
+                float(row["bplace_lat"]),
+                float(row["bplace_lon"]),
+                tz or "UTC",
+            )
+        )
+    return births
+
+
+def _house_of(longitude: float, cusps: Sequence[float]) -> int:
+    for index in range(12):
+        start, end = cusps[index], cusps[(index + 1) % 12]
+        if (longitude - start) % 360.0 < (end - start) % 360.0:
+            return index + 1
+    return 12
+
+
+def _house_number(value) -> Optional[int]:
+    """House as 1-12 from an int, ``house.number`` or a name like ``"First_House"``."""
+
+    value = getattr(value, "number", value)
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        word = value.lower().split("_")[0]
+        if word in HOUSE_NAMES:
+            return HOUSE_NAMES.index(word) + 1
+    return None
+
+
+def _longitude(value) -> Optional[float]:
+    value = getattr(value, "raw", value)
+    return float(value) % 360.0 if isinstance(value, (int, float)) else None
+
+
+def _swisseph_chart(birth: Birth) -> Chart:
+    import swisseph as swe
+
+    moment = birth.local_datetime().astimezone(timezone.utc)
+    jd = swe.julday(moment.year, moment.month, moment.day, moment.hour + moment.minute / 60 + moment.second / 3600)
+    cusps, ascmc = swe.houses(jd, birth.latitude, birth.longitude, HOUSE_SYSTEM)
+    # Versões antigas devolvem 13 cúspides (a primeira vazia).
+    cusps = cusps[-12:]
+    chart: Chart = {}
+    for body in BODIES:
+        longitude = swe.calc_ut(jd, getattr(swe, body.upper()))[0][0]
+        chart[body] = (longitude, _house_of(longitude, cusps))
+    chart["Ascendant"] = (ascmc[0], None)
+    chart["MC"] = (ascmc[1], None)
+    return chart
+
+
+def _kerykeion_chart(birth: Birth) -> Chart:
+    from kerykeion import AstrologicalSubject
+
+    subject = AstrologicalSubject(
+        name=birth.name,
+        year=birth.year,
+        month=birth.month,
+        day=birth.day,
+        hour=birth.hour,
+        minute=0,
+        lat=birth.latitude,
+        lng=birth.longitude,
+        tz_str=birth.timezone,
+        geonames_username=None,
+    )
+    chart: Chart = {}
+    for body in BODIES:
+        point = getattr(subject, body.lower(), None)
+        if point is not None:
+            chart[body] = (_longitude(point.abs_pos), _house_number(getattr(point, "house", None)))
+    for angle, attributes in (("Ascendant", ("ascendant", "first_house")), ("MC", ("mc", "tenth_house"))):
+        point = next((getattr(subject, name) for name in attributes if getattr(subject, name, None)), None)
+        if point is not None:
+            chart[angle] = (_longitude(point.abs_pos), None)
+    return chart
+
+
+def _immanuel_chart(birth: Birth) -> Chart:
+    from immanuel import charts
+
+    natal = charts.Natal(
+        charts.Subject(date_time=birth.local_datetime(), latitude=birth.latitude, longitude=birth.longitude)
+    )
+    names = {body: body for body in BODIES}
+    names.update({"Asc": "Ascendant", "Ascendant": "Ascendant", "MC": "MC", "Midheaven": "MC"})
+    chart: Chart = {}
+    for group in (natal.objects, getattr(natal, "angles", {}) or {}):
+        for item in group.values():
+            point = names.get(getattr(item, "name", None))
+            if point is None or point in chart:
+                continue
+            house = None if point in ANGLES else _house_number(getattr(item, "house", None))
+            chart[point] = (_longitude(item.longitude), house)
+    return chart
+
+
+ENGINE_CHARTS: Dict[str, Callable[[Birth], Chart]] = {
+    "swisseph": _swisseph_chart,
+    "kerykeion": _kerykeion_chart,
+    "immanuel": _immanuel_chart,
+}
+
+
+def engine_available(engine: str) -> bool:
+    """Whether the engine's library is installed (checked without importing it)."""
+
+    return importlib.util.find_spec(ENGINE_MODULES[engine]) is not None
+
+
+def _max_rss_mib() -> float:
+    # No Linux o ru_maxrss sobrevive ao fork + exec e herda o pico do processo pai;
+    # o VmHWM é o pico do espaço de endereçamento atual, que nasce no exec.
+    try:
+        with open("/proc/self/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _run_engine(engine: str, births: List[Birth]) -> Dict[str, object]:
+    """Chart ``births`` with ``engine`` (runs in a fresh process)."""
+
+    compute = ENGINE_CHARTS[engine]
+    rss_before = _max_rss_mib()
+    failures: List[str] = []
+
+    def chart(birth: Birth) -> Optional[Chart]:
+        try:
+            return compute(birth)
+        except Exception as exc:  # um mapa com erro não derruba a medição
+            failures.append(f"{birth.name}: {exc}")
+            return None
+
+    warmup = chart(births[0]) if births else None
+    start = time.perf_counter()
+    results = [warmup] + [chart(birth) for birth in births[1:]] if births else []
+    elapsed = time.perf_counter() - start
+    timed = max(len(births) - 1, 0)
+    return {
+        "engine": engine,
+        "charts": sum(result is not None for result in results),
+        "failures": len(failures),
+        "failure_examples": failures[:5],
+        "seconds": elapsed,
+        "charts_per_second": timed / elapsed if elapsed else float("nan"),
+        "peak_rss_mib": _max_rss_mib(),
+        "rss_growth_mib": _max_rss_mib() - rss_before,
+        "results": results,
+    }
+
+
+def _in_fresh_process(function, *args):
+    """Run ``function`` in a spawned process: nothing is inherited from this one."""
+
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn")) as executor:
+        return executor.submit(function, *args).result()
+
+
+def _angle_difference(first: float, second: float) -> float:
+    return abs((first - second + 180.0) % 360.0 - 180.0)
+
+
+def compare_charts(reference: Sequence[Optional[Chart]], other: Sequence[Optional[Chart]]) -> Dict[str, Dict[str, float]]:
+    """Per point: compared charts, mean/max longitude difference and sign/house agreement."""
+
+    parity = {}
+    for point in POINTS:
+        differences, signs, houses = [], [], []
+        for expected, actual in zip(reference, other):
+            if not expected or not actual or point not in expected or point not in actual:
+                continue
+            (lon_a, house_a), (lon_b, house_b) = expected[point], actual[point]
+            if lon_a is None or lon_b is None:
+                continue
+            differences.append(_angle_difference(lon_a, lon_b))
+            signs.append(int(lon_a // 30) == int(lon_b // 30))
+            if house_a is not None and house_b is not None:
+                houses.append(house_a == house_b)
+        parity[point] = {
+            "compared": len(differences),
+            "mean_abs_deg": sum(differences) / len(differences) if differences else math.nan,
+            "max_abs_deg": max(differences) if differences else math.nan,
+            "sign_agreement": sum(signs) / len(signs) if signs else math.nan,
+            "house_agreement": sum(houses) / len(houses) if houses else math.nan,
+        }
+    return parity
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara velocidade e resultados dos motores de mapas astrais.")
+    parser.add_argument("--input", type=Path, default=None, help="CSV limpo (padrão: base limpa ou amostra).")
+    parser.add_argument("--count", type=int, default=200, help="Nascimentos calculados por motor.")
+    parser.add_argument("--seed", type=int, default=42, help="Semente do sorteio dos nascimentos.")
+    parser.add_argument("--engines", nargs="+", choices=ENGINES, default=list(ENGINES))
+    parser.add_argument("--reference", choices=ENGINES, default="swisseph", help="Motor usado como referência.")
+    parser.add_argument("--output", type=Path, help="Grava métricas e paridade em JSON.")
+    args = parser.parse_args()
+
+    if pd is None:
+        raise SystemExit("Pandas é obrigatório para sortear os nascimentos.")
+    path = args.input or (INPUT_FILE if INPUT_FILE.exists() else SAMPLE_FILE)
+    births = load_births(path, args.count, args.seed)
+    if TimezoneFinder is None:
+        logging.warning("timezonefinder indisponível: todos os nascimentos ao meio-dia UTC.")
+    logging.info("%s nascimentos sorteados de %s", len(births), path)
+
+    available = [engine for engine in args.engines if engine_available(engine)]
+    for engine in sorted(set(args.engines) - set(available)):
+        logging.warning("Motor %s indisponível (dependência não instalada); ignorado.", engine)
+    if not available or not births:
+        raise SystemExit("Nenhum motor disponível ou nenhum nascimento válido para comparar.")
+
+    baseline = _in_fresh_process(_max_rss_mib)
+    logging.info("RSS de um processo vazio (interpretador + este módulo): %.1f MiB", baseline)
+    runs = {}
+    for engine in available:
+        runs[engine] = run = _in_fresh_process(_run_engine, engine, births)
+        run["engine_rss_mib"] = run["peak_rss_mib"] - baseline
+        logging.info(
+            "%-10s %5s mapas  %5s falhas  %8.1f mapas/s  pico RSS %7.1f MiB (motor +%.1f)",
+            engine,
+            run["charts"],
+            run["failures"],
+            run["charts_per_second"],
+            run["peak_rss_mib"],
+            run["engine_rss_mib"],
+        )
+        for failure in run["failure_examples"]:
+            logging.warning("  %s", failure)
+
+    reference = args.reference if args.reference in runs else available[0]
+    parity = {
+        engine: compare_charts(runs[reference]["results"], run["results"])
+        for engine, run in runs.items()
+        if engine != reference
+    }
+    for engine, points in parity.items():
+        logging.info("Paridade %s x %s (longitude em graus; concordância de signo e casa):", engine, reference)
+        for point, stats in points.items():
+            logging.info(
+                "  %-10s n=%-5s média %8.4f  máx %8.4f  signo %6.1f%%  casa %6.1f%%",
+                point,
+                stats["compared"],
+                stats["mean_abs_deg"],
+                stats["max_abs_deg"],
+                100 * stats["sign_agreement"],
+                100 * stats["house_agreement"],
+            )
+
+    if args.output:
+        report = {
+            "input": str(path),
+            "births": [asdict(birth) for birth in births],
+            "reference": reference,
+            "baseline_rss_mib": baseline,
+            "engines": {engine: {k: v for k, v in run.items() if k != "results"} for engine, run in runs.items()},
+            "parity": parity,
+        }
+        args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        logging.info("Resultados salvos em %s", args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,35 @@
-"""Create a reduced Pantheon dataset that feeds the feature generator."""
+"""Create a reduced Pantheon dataset that feeds the feature generator.
+
+The cleaned rows are read in chunks (CSV chunks or database pages) and sampled
+in a single pass, so the subset comes out quickly from arbitrarily large inputs:
+
+``reservoir`` (default)
+    uniform sample of ``--records`` rows: every row gets a random key and the
+    rows with the smallest keys are kept (bottom-k reservoir);
+``stratified``
+    the same keys, drawn per ``occupation``: at most ``--per-class-cap`` rows
+    per class are kept and the final ``--records`` rows are split as evenly as
+    possible between the classes, so rare occupations are not swamped;
+``head``
+    the first ``--records`` rows (the previous behaviour; stops reading early).
+
+The sample keeps the input order and is reproducible for a given ``--seed``
+(independently of ``--chunksize``).
+"""
 
 from pathlib import Path
 import shutil
+from typing import Iterable, Iterator, Optional, Tuple
 
 import logging
 
 from astro_database_client import AstroDatabaseClient, AstroDatabaseError
 
 try:  # pragma: no cover - dependência opcional
+    import numpy as np
     import pandas as pd
 except ImportError:  # pragma: no cover - dependência opcional
+    np = None
     pd = None
 
 
@@ -22,9 +42,137 @@ SAMPLE_FILE = BASE_DIR / "data" / "sample_pantheon_cleaned_data.csv"
 OUTPUT_FILE = BASE_DIR / "pantheon_reduced_1000.csv"
 
 MAX_RECORDS = 1000
+# Colunas da base limpa consumidas pelo gerador de features: ``birth_jdn`` guarda o
+# calendário usado na limpeza e ``place_id`` liga a linha a pantheon_places.csv.
+REDUCED_FIELDS = [
+    "name", "occupation", "birthdate", "birth_jdn", "bplace_name", "bplace_lat", "bplace_lon", "place_id",
+]
+
+SAMPLING_MODES = ("reservoir", "stratified", "head")
+DEFAULT_SEED = 42
+DEFAULT_CHUNKSIZE = 100_000
+STRATIFY_COLUMN = "occupation"
+
+# Colunas auxiliares, removidas antes de gravar a amostra.
+_KEY = "__sample_key"
+_POSITION = "__sample_position"
+_RANK = "__sample_rank"
+
+
+def _keyed_chunks(chunks: Iterable["pd.DataFrame"], seed: int) -> Iterator["pd.DataFrame"]:
+    """Attach the source position and a uniform random key to every row."""
+
+    rng = np.random.default_rng(seed)
+    position = 0
+    for chunk in chunks:
+        size = len(chunk)
+        # Sorteios consecutivos do mesmo gerador: as chaves não dependem do tamanho dos blocos.
+        yield chunk.reset_index(drop=True).assign(
+            **{_POSITION: np.arange(position, position + size), _KEY: rng.random(size)}
+        )
+        position += size
+
+
+def _finish(sample: Optional["pd.DataFrame"], columns) -> "pd.DataFrame":
+    if sample is None:
+        return pd.DataFrame(columns=columns)
+    return sample.sort_values(_POSITION).drop(columns=[_KEY, _POSITION]).reset_index(drop=True)
+
+
+def reservoir_sample(chunks: Iterable["pd.DataFrame"], size: int,
+                     seed: int = DEFAULT_SEED) -> Tuple["pd.DataFrame", int]:
+    """Uniform sample of ``size`` rows of ``chunks`` and the number of rows read."""
+
+    reservoir = None
+    columns = None
+    read = 0
+    for chunk in _keyed_chunks(chunks, seed):
+        read += len(chunk)
+        columns = chunk.columns.drop([_KEY, _POSITION])
+        if reservoir is not None and len(reservoir) >= size:
+            # Só entram linhas com chave menor que a maior chave do reservatório.
+            chunk = chunk[chunk[_KEY] < reservoir[_KEY].max()]
+        pool = chunk if reservoir is None else pd.concat([reservoir, chunk], ignore_index=True)
+        reservoir = pool.nsmallest(size, _KEY)
+    return _finish(reservoir, columns), read
+
+
+def stratified_sample(chunks: Iterable["pd.DataFrame"], size: int, seed: int = DEFAULT_SEED,
+                      per_class_cap: Optional[int] = None,
+                      column: str = STRATIFY_COLUMN) -> Tuple["pd.DataFrame", int]:
+    """Sample of ``size`` rows balanced across ``column``, at most ``per_class_cap`` per class."""
+
+    cap = size if per_class_cap is None else min(per_class_cap, size)
+    pool = None
+    columns = None
+    read = 0
+    for chunk in _keyed_chunks(chunks, seed):
+        if column not in chunk.columns:
+            raise ValueError(f"Coluna de estratificação ausente: {column}")
+        read += len(chunk)
+        columns = chunk.columns.drop([_KEY, _POSITION])
+        if pool is not None:
+            # Classes já cheias só aceitam chaves menores que a maior que guardam.
+            keys = pool.groupby(column, sort=False)[_KEY].agg(["max", "size"])
+            thresholds = keys["max"].where(keys["size"] >= cap, np.inf)
+            chunk = chunk[chunk[_KEY] < chunk[column].map(thresholds).fillna(np.inf)]
+        combined = chunk if pool is None else pd.concat([pool, chunk], ignore_index=True)
+        combined = combined.sort_values(_KEY, kind="stable")
+        # Por classe ficam as ``cap`` menores chaves: memória limitada a cap x classes.
+        pool = combined[combined.groupby(column, dropna=False, sort=False).cumcount() < cap]
+
+    if pool is None:
+        return _finish(None, columns), read
+    # Distribuição igual: primeiro a menor chave de cada classe, depois a segunda...
+    ranked = pool.assign(**{_RANK: pool.groupby(column, dropna=False, sort=False).cumcount()})
+    sample = ranked.sort_values([_RANK, _KEY]).head(size).drop(columns=_RANK)
+    return _finish(sample, columns), read
+
+
+def head_sample(chunks: Iterable["pd.DataFrame"], size: int) -> Tuple["pd.DataFrame", int]:
+    """The first ``size`` rows; stops consuming ``chunks`` once they are collected."""
+
+    taken = []
+    read = 0
+    for chunk in chunks:
+        taken.append(chunk.head(size - read))
+        read += len(taken[-1])
+        if read >= size:
+            break
+    if not taken:
+        return pd.DataFrame(), 0
+    return pd.concat(taken, ignore_index=True), read
+
+
+def draw_sample(chunks: Iterable["pd.DataFrame"], mode: str, size: int, seed: int = DEFAULT_SEED,
+                per_class_cap: Optional[int] = None) -> Tuple["pd.DataFrame", int]:
+    if mode not in SAMPLING_MODES:
+        raise ValueError(f"Modo de amostragem desconhecido: {mode!r}. Use um de: {', '.join(SAMPLING_MODES)}.")
+    if size <= 0:
+        raise ValueError("O número de registros da amostra deve ser maior que zero.")
+    if mode == "reservoir":
+        return reservoir_sample(chunks, size, seed)
+    if mode == "stratified":
+        return stratified_sample(chunks, size, seed, per_class_cap)
+    return head_sample(chunks, size)
 
 
 def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Cria o subconjunto reduzido da base Pantheon limpa.")
+    parser.add_argument("--mode", choices=SAMPLING_MODES, default="reservoir", help="Modo de amostragem.")
+    parser.add_argument("--records", type=int, default=MAX_RECORDS, help="Registros na amostra.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Semente do sorteio.")
+    parser.add_argument(
+        "--per-class-cap",
+        type=int,
+        default=None,
+        help="Máximo de registros por ocupação no modo stratified (padrão: sem limite além de --records).",
+    )
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE, help="Linhas do CSV lidas por bloco.")
+    args = parser.parse_args()
+
     if pd is None:
         logging.warning(
             "Pandas não está disponível. Copiando subconjunto de amostra para %s.", OUTPUT_FILE
@@ -32,19 +180,25 @@ def main() -> None:
         shutil.copyfile(SAMPLE_FILE, OUTPUT_FILE)
         return
 
+    def sample_csv(path: Path):
+        with pd.read_csv(path, chunksize=args.chunksize) as reader:
+            return draw_sample(reader, args.mode, args.records, args.seed, args.per_class_cap)
+
     if INPUT_FILE.exists():
         logging.info("Carregando dados limpos de %s", INPUT_FILE)
-        df = pd.read_csv(INPUT_FILE)
+        df_reduced, read = sample_csv(INPUT_FILE)
     else:
         try:
             client = AstroDatabaseClient()
-            records = client.fetch_cleaned_people(limit=MAX_RECORDS)
-            if not records:
+            # Só o modo head pode parar cedo; os sorteios percorrem a tabela inteira.
+            limit = args.records if args.mode == "head" else None
+            pages = client.iter_cleaned_people(limit=limit, as_frames=True, fields=REDUCED_FIELDS)
+            df_reduced, read = draw_sample(pages, args.mode, args.records, args.seed, args.per_class_cap)
+            if not read:
                 raise AstroDatabaseError("O banco astrológico não retornou registros limpos.")
-            df = pd.DataFrame(records)
             logging.info(
                 "Dados limpos carregados diretamente do banco astrológico (%s registros).",
-                len(df),
+                read,
             )
         except AstroDatabaseError as exc:
             logging.warning(
@@ -53,13 +207,31 @@ def main() -> None:
             logging.warning(
                 "Arquivo %s não encontrado. Utilizando amostra em %s.", INPUT_FILE.name, SAMPLE_FILE
             )
-            df = pd.read_csv(SAMPLE_FILE)
+            df_reduced, read = sample_csv(SAMPLE_FILE)
 
-    df_reduced = df.head(MAX_RECORDS)
     df_reduced.to_csv(OUTPUT_FILE, index=False)
     logging.info(
-        "Subconjunto com até %s registros salvo em %s", MAX_RECORDS, OUTPUT_FILE
+        "Amostra %s com %s de %s registros lidos (semente %s) salva em %s",
+        args.mode,
+        len(df_reduced),
+        read,
+        args.seed,
+        OUTPUT_FILE,
     )
+    if args.mode == "stratified" and STRATIFY_COLUMN in df_reduced.columns:
+        logging.info(
+            "Registros por ocupação:\n%s", df_reduced[STRATIFY_COLUMN].value_counts(dropna=False).to_string()
+        )
+
+
+__all__ = [
+    "DEFAULT_SEED",
+    "SAMPLING_MODES",
+    "draw_sample",
+    "head_sample",
+    "reservoir_sample",
+    "stratified_sample",
+]
 
 
 if __name__ == "__main__":
@@ -1,23 +1,54 @@
+import itertools
 import json
 import logging
+import re
+import tempfile
+import time
 import traceback
 from pathlib import Path
 import pickle
 
 from astro_database_client import AstroDatabaseClient, AstroDatabaseError
+from error_analysis import analyze_model, save_error_analysis
+from incremental_training import (
+    DriftThresholds,
+    build_training_profile,
+    load_training_profile,
+    save_training_profile,
+    update_model,
+)
+from model_compaction import SERIALIZATION_FORMATS, CompactionOptions, compact_model, save_model
+from prepared_dataset import apply_compact_dtypes, log_memory_report, memory_report, read_prepared_csv
 
 try:  # pragma: no cover - dependências opcionais
     import joblib
+    import numpy as np
     import pandas as pd
-    from sklearn.ensemble import RandomForestClassifier
+    import sklearn
+    from scipy import sparse
+    from sklearn.ensemble import HistGradientBoostingClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
     from sklearn.metrics import accuracy_score, classification_report
-    from sklearn.model_selection import train_test_split
+    from sklearn.model_selection import StratifiedKFold, train_test_split
+    from sklearn.neighbors import KNeighborsClassifier
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import FunctionTransformer, MaxAbsScaler
 except ImportError:  # pragma: no cover - dependências opcionais
     joblib = None
+    np = None
     pd = None
+    sparse = None
+    sklearn = None
+    HistGradientBoostingClassifier = None
+    LogisticRegression = None
+    KNeighborsClassifier = None
+    make_pipeline = None
+    FunctionTransformer = None
+    MaxAbsScaler = None
     RandomForestClassifier = None
     accuracy_score = None
     classification_report = None
+    StratifiedKFold = None
     train_test_split = None
 
 
@@ -33,6 +64,24 @@ SAMPLE_MAPPING_FILE = DATA_DIR / "sample_occupation_label_mapping.json"
 MODEL_OUTPUT_FILE = BASE_DIR / "random_forest_model.pkl"
 SAMPLE_MODEL_REPORT = DATA_DIR / "sample_model_report.txt"
 SAMPLE_MODEL_METRICS = DATA_DIR / "sample_model_metrics.json"
+SEARCH_LEADERBOARD_FILE = BASE_DIR / "model_search_leaderboard.csv"
+ZOO_BENCHMARK_FILE = BASE_DIR / "model_zoo_benchmark.csv"
+COMPACTION_REPORT_FILE = BASE_DIR / "model_compaction_report.csv"
+TRAINING_PROFILE_FILE = BASE_DIR / "model_training_profile.json"
+ERROR_ANALYSIS_FILE = BASE_DIR / "model_error_analysis.npz"
+
+# Espaço de busca do modo --search (grade completa, avaliada com validação cruzada estratificada)
+SEARCH_SPACE = {
+    "n_estimators": [100, 300],
+    "max_depth": [None, 12, 24],
+    "max_features": ["sqrt", "log2", 0.3],
+    "class_weight": ["balanced", "balanced_subsample", None],
+}
+DEFAULT_MODEL_PARAMS = {"n_estimators": 100, "class_weight": "balanced"}
+LATENCY_REPEATS = 50
+# scikit-learn 1.8 descontinuou ``penalty`` (removido no 1.10): L1 passa a ser ``l1_ratio=1``.
+SKLEARN_L1_RATIO_VERSION = (1, 8)
+ZOO_BATCH_SIZES = (1, 1000)
 
 
 def _load_prepared_dataframe():
@@ -41,19 +90,22 @@ def _load_prepared_dataframe():
 
     if INPUT_FILE.exists():
         logging.info("Dados preparados carregados do arquivo: %s", INPUT_FILE)
-        return pd.read_csv(INPUT_FILE)
+        return read_prepared_csv(INPUT_FILE, report=True)
 
     try:
         client = AstroDatabaseClient()
-        records = client.fetch_prepared_ml_dataset()
-        if not records:
+        # Páginas lidas em streaming direto para colunas tipadas.
+        frames = list(client.iter_prepared_ml_dataset(as_frames=True))
+        if not frames:
             raise AstroDatabaseError("O banco astrológico não retornou dados preparados.")
-        df_remote = pd.DataFrame(records)
+        df_remote = pd.concat(frames, ignore_index=True)
         logging.info(
             "Dados preparados carregados diretamente do banco astrológico (%s registros).",
             len(df_remote),
         )
-        return df_remote
+        df_compact = apply_compact_dtypes(df_remote)
+        log_memory_report(memory_report(df_compact, baseline=df_remote))
+        return df_compact
     except AstroDatabaseError as exc:
         logging.warning("Falha ao consultar o banco astrológico: %s", exc)
 
@@ -62,10 +114,201 @@ def _load_prepared_dataframe():
         INPUT_FILE.name,
         SAMPLE_INPUT_FILE,
     )
-    return pd.read_csv(SAMPLE_INPUT_FILE)
+    return read_prepared_csv(SAMPLE_INPUT_FILE, report=True)
 
 
-def develop_model():
+def _candidate_grid(space=None):
+    space = space or SEARCH_SPACE
+    keys = list(space)
+    return [dict(zip(keys, values)) for values in itertools.product(*(space[key] for key in keys))]
+
+
+def _evaluate_fold(params, X_path, y_path, train_idx, test_idx):
+    """Train one candidate on one CV fold (runs inside a worker process).
+
+    The feature matrix is opened with ``mmap_mode='r'`` so every worker reads the
+    same pages from the OS cache instead of receiving a pickled copy.
+    """
+
+    X = np.load(X_path, mmap_mode="r")
+    y = np.load(y_path, mmap_mode="r")
+
+    model = RandomForestClassifier(random_state=42, n_jobs=1, **params)
+    start = time.perf_counter()
+    model.fit(X[train_idx], y[train_idx])
+    fit_seconds = time.perf_counter() - start
+
+    accuracy = accuracy_score(y[test_idx], model.predict(X[test_idx]))
+
+    single_row = np.ascontiguousarray(X[test_idx[:1]])
+    timings = []
+    for _ in range(LATENCY_REPEATS):
+        start = time.perf_counter()
+        model.predict_proba(single_row)
+        timings.append(time.perf_counter() - start)
+
+    return {
+        "accuracy": accuracy,
+        "fit_seconds": fit_seconds,
+        "model_bytes": len(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)),
+        "latency_ms": float(np.median(timings) * 1000),
+    }
+
+
+def search_hyperparameters(X, y, *, folds=5, jobs=-1, space=None):
+    """Evaluate the search grid with stratified CV across worker processes.
+
+    Returns the leaderboard sorted by mean accuracy (best first) with training
+    time, pickled model size and single-row ``predict_proba`` latency.
+    """
+
+    candidates = _candidate_grid(space)
+    y_array = np.asarray(y)
+    min_class_count = int(pd.Series(y_array).value_counts().min())
+    n_splits = max(2, min(folds, min_class_count))
+    if n_splits != folds:
+        logging.info("Usando %s dobras (a menor classe tem %s exemplos).", n_splits, min_class_count)
+    splits = list(StratifiedKFold(n_splits=n_splits, shuffle=True, random_state=42).split(X, y_array))
+
+    logging.info(
+        "Busca de hiperparâmetros: %s candidatos x %s dobras = %s treinamentos.",
+        len(candidates),
+        n_splits,
+        len(candidates) * n_splits,
+    )
+
+    with tempfile.TemporaryDirectory(prefix="astro_search_") as tmp_dir:
+        # Matriz compartilhada via memory-mapping: gravada uma vez, lida por todos os workers.
+        X_path = Path(tmp_dir) / "X.npy"
+        y_path = Path(tmp_dir) / "y.npy"
+        np.save(X_path, np.ascontiguousarray(X, dtype=np.float32))
+        np.save(y_path, y_array)
+
+        tasks = [(index, fold) for index in range(len(candidates)) for fold in range(n_splits)]
+        start = time.perf_counter()
+        fold_results = joblib.Parallel(n_jobs=jobs, backend="loky")(
+            joblib.delayed(_evaluate_fold)(candidates[index], str(X_path), str(y_path), *splits[fold])
+            for index, fold in tasks
+        )
+        logging.info("Busca concluída em %.2fs.", time.perf_counter() - start)
+
+    by_candidate = {index: [] for index in range(len(candidates))}
+    for (index, _), result in zip(tasks, fold_results):
+        by_candidate[index].append(result)
+
+    rows = []
+    for index, params in enumerate(candidates):
+        results = by_candidate[index]
+        rows.append(
+            {
+                "candidate": index,
+                **{key: ("None" if value is None else value) for key, value in params.items()},
+                "cv_accuracy_mean": float(np.mean([res["accuracy"] for res in results])),
+                "cv_accuracy_std": float(np.std([res["accuracy"] for res in results])),
+                "fit_seconds_mean": float(np.mean([res["fit_seconds"] for res in results])),
+                "model_bytes_mean": int(np.mean([res["model_bytes"] for res in results])),
+                "latency_ms_p50": float(np.median([res["latency_ms"] for res in results])),
+            }
+        )
+
+    # Empates de acurácia são decididos pela menor latência de inferência.
+    leaderboard = pd.DataFrame(rows).sort_values(
+        ["cv_accuracy_mean", "latency_ms_p50"], ascending=[False, True]
+    ).reset_index(drop=True)
+    leaderboard.insert(0, "rank", range(1, len(leaderboard) + 1))
+    best_params = candidates[int(leaderboard.loc[0, "candidate"])]
+    return leaderboard, best_params
+
+
+def _l1_logistic_regression():
+    major, minor = (int(part) for part in re.match(r"(\d+)\.(\d+)", sklearn.__version__).groups())
+    if (major, minor) >= SKLEARN_L1_RATIO_VERSION:
+        return LogisticRegression(l1_ratio=1.0, solver="saga", C=1.0, max_iter=2000)
+    return LogisticRegression(penalty="l1", solver="saga", C=1.0, max_iter=2000)
+
+
+def _build_model(name, *, n_train, jobs=-1, params=None):
+    """Instantiate one of the classifiers of :data:`MODEL_ZOO`."""
+
+    if name == "random_forest":
+        return RandomForestClassifier(random_state=42, n_jobs=jobs, **(params or DEFAULT_MODEL_PARAMS))
+    if name == "hist_gradient_boosting":
+        return HistGradientBoostingClassifier(random_state=42, class_weight="balanced")
+    if name == "logistic_regression_l1":
+        # Entrada esparsa (CSR): quase todas as colunas são one-hot com zeros.
+        return make_pipeline(
+            FunctionTransformer(sparse.csr_matrix, validate=True, accept_sparse=True),
+            MaxAbsScaler(),
+            _l1_logistic_regression(),
+        )
+    if name == "knn":
+        return make_pipeline(
+            MaxAbsScaler(), KNeighborsClassifier(n_neighbors=max(1, min(5, n_train)), n_jobs=1)
+        )
+    raise ValueError(f"Modelo desconhecido: {name}. Opções: {list(MODEL_ZOO)}")
+
+
+MODEL_ZOO = ("random_forest", "hist_gradient_boosting", "logistic_regression_l1", "knn")
+
+
+def _latency_percentiles(model, X_batch, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        model.predict_proba(X_batch)
+        timings.append(time.perf_counter() - start)
+    p50, p99 = np.percentile(timings, [50, 99]) * 1000
+    return float(p50), float(p99)
+
+
+def benchmark_model_zoo(X_train, y_train, X_test, y_test, *, names=MODEL_ZOO, repeats=LATENCY_REPEATS, jobs=-1):
+    """Train every model of the zoo on the same split and measure its serving cost.
+
+    For each model the table reports hold-out accuracy, training time, size of
+    the ``joblib`` artifact on disk, load time and p50/p99 ``predict_proba``
+    latency for batches of 1 and 1,000 rows (the second one resampled from the
+    test set).
+    """
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="astro_zoo_") as tmp_dir:
+        for name in names:
+            model = _build_model(name, n_train=len(X_train), jobs=jobs)
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_seconds = time.perf_counter() - start
+            if name == "random_forest":
+                model.set_params(n_jobs=1)
+
+            accuracy = accuracy_score(y_test, model.predict(X_test))
+
+            artifact = Path(tmp_dir) / f"{name}.joblib"
+            joblib.dump(model, artifact)
+            load_times = []
+            for _ in range(3):
+                start = time.perf_counter()
+                model = joblib.load(artifact)
+                load_times.append(time.perf_counter() - start)
+
+            row = {
+                "model": name,
+                "accuracy": float(accuracy),
+                "fit_seconds": fit_seconds,
+                "disk_bytes": artifact.stat().st_size,
+                "load_ms": float(np.median(load_times) * 1000),
+            }
+            for batch_size in ZOO_BATCH_SIZES:
+                X_batch = X_test.sample(n=batch_size, replace=True, random_state=42)
+                p50, p99 = _latency_percentiles(model, X_batch, repeats)
+                row[f"p50_ms_batch_{batch_size}"] = p50
+                row[f"p99_ms_batch_{batch_size}"] = p99
+            rows.append(row)
+            logging.info("Modelo %s avaliado: acurácia %.4f", name, accuracy)
+
+    return pd.DataFrame(rows).sort_values("accuracy", ascending=False).reset_index(drop=True)
+
+
+def develop_model(search=False, folds=5, jobs=-1, model_name="random_forest", zoo=False, compaction=None):
     if None in (pd, RandomForestClassifier, accuracy_score, classification_report, train_test_split, joblib):
         logging.warning(
             "Dependências de machine learning ausentes. Gerando modelo fictício com métricas de amostra."
@@ -120,14 +363,53 @@ def develop_model():
         X_train, X_test, y_train, y_test = train_test_split(X_filtered, y_filtered, test_size=0.2, random_state=42, stratify=y_filtered)
         logging.info(f"Dados divididos: Treino={X_train.shape}, Teste={X_test.shape}")
 
-        # Inicializar e treinar o modelo RandomForestClassifier
-        model = RandomForestClassifier(n_estimators=100, random_state=42, class_weight='balanced')
-        logging.info("Iniciando treinamento do modelo RandomForestClassifier...")
+        if zoo:
+            benchmark = benchmark_model_zoo(X_train, y_train, X_test, y_test, jobs=jobs)
+            benchmark.to_csv(ZOO_BENCHMARK_FILE, index=False)
+            logging.info(
+                "Benchmark de modelos salvo em %s:\n%s",
+                ZOO_BENCHMARK_FILE,
+                benchmark.to_string(index=False),
+            )
+
+        model_params = dict(DEFAULT_MODEL_PARAMS)
+        if search and model_name != "random_forest":
+            logging.warning("A busca de hiperparâmetros só cobre random_forest; ignorando --search.")
+        elif search:
+            leaderboard, model_params = search_hyperparameters(X_train, y_train, folds=folds, jobs=jobs)
+            leaderboard.to_csv(SEARCH_LEADERBOARD_FILE, index=False)
+            logging.info(
+                "Leaderboard salvo em %s:\n%s",
+                SEARCH_LEADERBOARD_FILE,
+                leaderboard.head(10).to_string(index=False),
+            )
+            logging.info("Melhores hiperparâmetros: %s", model_params)
+
+        # Inicializar e treinar o modelo escolhido (RandomForestClassifier por padrão, todos os núcleos)
+        model = _build_model(model_name, n_train=len(X_train), jobs=jobs, params=model_params)
+        logging.info("Iniciando treinamento do modelo %s...", model_name)
         model.fit(X_train, y_train)
         logging.info("Treinamento do modelo concluído.")
 
-        # Salvar o modelo treinado
-        joblib.dump(model, MODEL_OUTPUT_FILE)
+        if compaction is not None and model_name != "random_forest":
+            logging.warning("A compactação só cobre random_forest; salvando o modelo sem compactar.")
+        elif compaction is not None:
+            model, compaction_report = compact_model(model, X_train, y_train, X_test, y_test, compaction)
+            compaction_report.to_csv(COMPACTION_REPORT_FILE, index=False)
+            logging.info(
+                "Relatório de compactação salvo em %s:\n%s",
+                COMPACTION_REPORT_FILE,
+                compaction_report.to_string(index=False),
+            )
+
+        # Salvar o modelo treinado; a API prevê uma linha por requisição, onde
+        # paralelismo entre threads só adiciona overhead
+        if model_name == "random_forest":
+            model.set_params(n_jobs=1)
+        if compaction is not None and model_name == "random_forest":
+            save_model(model, MODEL_OUTPUT_FILE, compaction.serialization)
+        else:
+            joblib.dump(model, MODEL_OUTPUT_FILE)
         logging.info(f"Modelo salvo em {MODEL_OUTPUT_FILE}")
 
         # Fazer previsões no conjunto de teste
@@ -137,6 +419,9 @@ def develop_model():
         accuracy = accuracy_score(y_test, y_pred)
         logging.info(f"Acurácia do modelo: {accuracy:.4f}")
 
+        # Perfil de referência para o modo incremental (verificação de drift)
+        save_training_profile(build_training_profile(y_train, accuracy), TRAINING_PROFILE_FILE)
+
         # Carregar o mapeamento de profissões completo
         mapping_file = (
             OCCUPATION_MAPPING_FILE if OCCUPATION_MAPPING_FILE.exists() else SAMPLE_MAPPING_FILE
@@ -152,6 +437,16 @@ def develop_model():
         report = classification_report(y_test, y_pred, labels=unique_test_labels, target_names=target_names_for_report, zero_division=0)
         logging.info("Relatório de Classificação:\n" + report)
 
+        # Análise de erros por classe sobre todo o predict_proba (renderizada por report_error_analysis.py)
+        if hasattr(model, "predict_proba"):
+            error_analysis = analyze_model(model, X_test, y_test, labels=full_occupation_labels)
+            save_error_analysis(error_analysis, ERROR_ANALYSIS_FILE)
+            logging.info(
+                "Análise de erros salva em %s (top-k: %s).",
+                ERROR_ANALYSIS_FILE,
+                ", ".join(f"top-{k}={value:.4f}" for k, value in error_analysis.topk_accuracy().items()),
+            )
+
         return model, accuracy, report
 
     except FileNotFoundError:
@@ -164,5 +459,157 @@ def develop_model():
         logging.error(traceback.format_exc())
         return None, None, None
 
+def update_model_incrementally(new_data_file, *, n_new_trees=20, max_trees=None, auto_retrain=False, jobs=-1):
+    """Warm-start the saved model with a batch of new prepared rows.
+
+    Falls back to a full retrain (``develop_model``) when the drift check
+    requires it and ``auto_retrain`` is set; otherwise only reports why the
+    batch cannot be absorbed incrementally.
+    """
+
+    if None in (pd, joblib, RandomForestClassifier):
+        logging.error("Dependências de machine learning ausentes; modo incremental indisponível.")
+        return None
+
+    if not MODEL_OUTPUT_FILE.exists():
+        logging.warning("Modelo %s inexistente; executando treino completo.", MODEL_OUTPUT_FILE)
+        return develop_model(jobs=jobs)
+
+    model = joblib.load(MODEL_OUTPUT_FILE)
+    mapping_file = OCCUPATION_MAPPING_FILE if OCCUPATION_MAPPING_FILE.exists() else SAMPLE_MAPPING_FILE
+    occupation_labels = json.loads(Path(mapping_file).read_text(encoding="utf-8"))
+    profile = load_training_profile(TRAINING_PROFILE_FILE)
+
+    df_new = read_prepared_csv(new_data_file)
+    logging.info("Lote novo carregado de %s: %s linhas.", new_data_file, len(df_new))
+
+    try:
+        report, profile = update_model(
+            model,
+            profile,
+            df_new,
+            occupation_labels,
+            n_new_trees=n_new_trees,
+            max_trees=max_trees,
+            thresholds=DriftThresholds(),
+        )
+    except TypeError as exc:
+        logging.error("Atualização incremental indisponível para este modelo: %s", exc)
+        report = None
+
+    if report is None or report.needs_full_retrain:
+        reasons = report.reasons if report else ["modelo não suportado"]
+        logging.warning("Treino completo necessário: %s", "; ".join(reasons))
+        if auto_retrain:
+            return develop_model(jobs=jobs)
+        return None
+
+    logging.info("Métricas de drift: %s", report.metrics)
+    model.set_params(n_jobs=1)
+    joblib.dump(model, MODEL_OUTPUT_FILE)
+    save_training_profile(profile, TRAINING_PROFILE_FILE)
+    logging.info("Modelo incrementado salvo em %s", MODEL_OUTPUT_FILE)
+    return model
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Treina o classificador de profissões.")
+    parser.add_argument(
+        "--search",
+        action="store_true",
+        help="Executa a busca de hiperparâmetros com validação cruzada antes do treino final.",
+    )
+    parser.add_argument("--cv-folds", type=int, default=5, help="Dobras da validação cruzada estratificada.")
+    parser.add_argument("--jobs", type=int, default=-1, help="Processos usados na busca e no treino (-1 = todos).")
+    parser.add_argument(
+        "--model",
+        choices=MODEL_ZOO,
+        default="random_forest",
+        help="Classificador treinado e salvo para a API.",
+    )
+    parser.add_argument(
+        "--zoo",
+        action="store_true",
+        help="Compara todos os classificadores (acurácia, tamanho, carga e latência) antes do treino final.",
+    )
+    compact_group = parser.add_argument_group("compactação do artefato (random_forest)")
+    compact_group.add_argument(
+        "--compact",
+        action="store_true",
+        help="Retreina a floresta com limites, quantiza para float32 e serializa de forma compacta.",
+    )
+    compact_group.add_argument("--compact-max-depth", type=int, default=CompactionOptions.max_depth)
+    compact_group.add_argument("--compact-min-samples-leaf", type=int, default=CompactionOptions.min_samples_leaf)
+    compact_group.add_argument("--compact-max-leaf-nodes", type=int, default=CompactionOptions.max_leaf_nodes)
+    compact_group.add_argument(
+        "--ccp-alpha",
+        type=float,
+        default=CompactionOptions.ccp_alpha,
+        help="Poda por custo-complexidade (0 desativa).",
+    )
+    compact_group.add_argument(
+        "--no-float32",
+        action="store_true",
+        help="Mantém limiares e valores das folhas em precisão float64.",
+    )
+    compact_group.add_argument(
+        "--compact-format",
+        choices=sorted(SERIALIZATION_FORMATS),
+        default=CompactionOptions.serialization,
+        help="zlib/lzma comprimem; mmap grava sem compressão (carregável com mmap_mode='r').",
+    )
+    incremental_group = parser.add_argument_group("atualização incremental")
+    incremental_group.add_argument(
+        "--incremental",
+        metavar="CSV",
+        help="Atualiza o modelo salvo apenas com as linhas novas (CSV no formato de prepared_ml_data.csv).",
+    )
+    incremental_group.add_argument("--incremental-trees", type=int, default=20, help="Árvores novas por lote.")
+    incremental_group.add_argument(
+        "--max-trees",
+        type=int,
+        default=None,
+        help="Limite de árvores; as mais antigas são descartadas ao ultrapassá-lo.",
+    )
+    incremental_group.add_argument(
+        "--auto-retrain",
+        action="store_true",
+        help="Executa o treino completo quando a verificação de drift o exigir.",
+    )
+    args = parser.parse_args()
+
+    if args.incremental:
+        update_model_incrementally(
+            args.incremental,
+            n_new_trees=args.incremental_trees,
+            max_trees=args.max_trees,
+            auto_retrain=args.auto_retrain,
+            jobs=args.jobs,
+        )
+        return
+
+    compaction = None
+    if args.compact:
+        compaction = CompactionOptions(
+            max_depth=args.compact_max_depth,
+            min_samples_leaf=args.compact_min_samples_leaf,
+            max_leaf_nodes=args.compact_max_leaf_nodes,
+            ccp_alpha=args.ccp_alpha,
+            float32=not args.no_float32,
+            serialization=args.compact_format,
+        )
+
+    develop_model(
+        search=args.search,
+        folds=args.cv_folds,
+        jobs=args.jobs,
+        model_name=args.model,
+        zoo=args.zoo,
+        compaction=compaction,
+    )
+
+
 if __name__ == '__main__':
-    develop_model()
+    main()
@@ -0,0 +1,364 @@
+"""Per-class error analysis of the occupation classifier.
+
+``classification_report`` only prints precision/recall per class.  This module
+summarises the full ``predict_proba`` output instead:
+
+- the confusion matrix (which occupations are mistaken for which);
+- top-k accuracy, global and per class (ties ranked as in scikit-learn's
+  ``top_k_accuracy_score``);
+- per-class (one-vs-rest) calibration: reliability bins, expected calibration
+  error (ECE) and Brier score, plus the reliability of the top-1 confidence.
+
+Everything is computed with vectorized NumPy over row chunks, so the working
+memory is bounded by ``memory_budget`` regardless of the number of predictions;
+only the accumulators (``n_labels²`` confusion counts and
+``n_classes × n_bins`` calibration sums) grow with the number of classes.
+1M predictions × 500 classes can be streamed from a ``np.memmap``.
+
+Results are stored as an uncompressed ``.npz`` file (:func:`save_error_analysis`)
+that ``report_error_analysis.py`` renders.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple
+
+try:  # pragma: no cover - dependências opcionais
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependências opcionais
+    np = None
+    pd = None
+
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 1
+DEFAULT_TOP_K = (1, 3, 5)
+DEFAULT_BINS = 10
+# Memória de trabalho por bloco de linhas (probabilidades + índices temporários).
+DEFAULT_MEMORY_BUDGET = 64 * 2**20
+# Bytes temporários por célula de probabilidade em um bloco: a cópia float32,
+# as três máscaras booleanas do ranking, os índices int32 dos bins e os pesos
+# float64 que o ``np.bincount`` cria a partir das probabilidades.
+_BYTES_PER_CELL = 27
+
+
+def chunk_rows_for(n_classes: int, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> int:
+    """Rows per chunk so that one chunk of ``n_classes`` columns fits the budget."""
+
+    return max(1, int(memory_budget // (max(n_classes, 1) * _BYTES_PER_CELL)))
+
+
+class ErrorAnalysisAccumulator:
+    """Streaming accumulator over ``(y_true, proba)`` chunks.
+
+    ``classes`` are the label ids of the ``proba`` columns (``model.classes_``)
+    and ``n_labels`` the size of the full label space (the occupation
+    mapping); true labels the model never saw count as misses.
+    """
+
+    def __init__(self, classes: Sequence[int], n_labels: int, *, top_k: Sequence[int] = DEFAULT_TOP_K,
+                 n_bins: int = DEFAULT_BINS):
+        self.classes = np.asarray(classes, dtype=np.int64)
+        self.n_labels = int(n_labels)
+        self.top_k = tuple(sorted(set(int(k) for k in top_k)))
+        self.n_bins = int(n_bins)
+
+        n_classes = len(self.classes)
+        # Posição de cada rótulo nas colunas de proba (-1 quando o modelo não conhece o rótulo).
+        self._column_of_label = np.full(self.n_labels, -1, dtype=np.int64)
+        self._column_of_label[self.classes] = np.arange(n_classes)
+
+        self.rows = 0
+        self.confusion = np.zeros((self.n_labels, self.n_labels), dtype=np.int64)
+        self.topk_hits = np.zeros((len(self.top_k), self.n_labels), dtype=np.int64)
+        self.bin_count = np.zeros((n_classes, self.n_bins), dtype=np.int64)
+        self.bin_confidence = np.zeros((n_classes, self.n_bins), dtype=np.float64)
+        self.bin_positives = np.zeros((n_classes, self.n_bins), dtype=np.int64)
+        self.brier_sum = np.zeros(n_classes, dtype=np.float64)
+        self.top1_bin_count = np.zeros(self.n_bins, dtype=np.int64)
+        self.top1_bin_confidence = np.zeros(self.n_bins, dtype=np.float64)
+        self.top1_bin_correct = np.zeros(self.n_bins, dtype=np.int64)
+
+    def _bins(self, probabilities):
+        bins = (probabilities * self.n_bins).astype(np.int32)
+        np.minimum(bins, self.n_bins - 1, out=bins)
+        return bins
+
+    def update(self, y_true, proba) -> None:
+        """Add one chunk: ``y_true`` label ids and the matching ``proba`` rows."""
+
+        y_true = np.asarray(y_true, dtype=np.int64)
+        proba = np.asarray(proba, dtype=np.float32)
+        n_rows, n_classes = proba.shape
+        if n_rows == 0:
+            return
+        if n_classes != len(self.classes):
+            raise ValueError(f"proba tem {n_classes} colunas; esperado {len(self.classes)}.")
+
+        rows = np.arange(n_rows)
+        columns = self._column_of_label[y_true]
+        known = columns >= 0
+        true_proba = np.where(known, proba[rows, np.maximum(columns, 0)], -1.0).astype(np.float32)
+
+        # Matriz de confusão: um único bincount sobre pares (verdadeiro, previsto).
+        predicted_columns = proba.argmax(axis=1)
+        predicted = self.classes[predicted_columns]
+        self.confusion += np.bincount(
+            y_true * self.n_labels + predicted, minlength=self.n_labels**2
+        ).reshape(self.n_labels, self.n_labels)
+
+        # Top-k: posição do rótulo verdadeiro = classes com probabilidade maior, mais os
+        # empates em colunas posteriores (a mesma ordem do ``top_k_accuracy_score`` do
+        # scikit-learn); um empate nunca favorece o rótulo verdadeiro só por ser verdadeiro.
+        later = np.arange(n_classes) > columns[:, None]
+        rank = ((proba > true_proba[:, None]) | ((proba == true_proba[:, None]) & later)).sum(axis=1)
+        for index, k in enumerate(self.top_k):
+            hit = known & (rank < k)
+            self.topk_hits[index] += np.bincount(y_true[hit], minlength=self.n_labels)
+
+        # Calibração um-contra-todos: bins de cada célula de proba.
+        bins = self._bins(proba)
+        flat = (np.arange(n_classes, dtype=np.int32) * self.n_bins + bins).ravel()
+        size = n_classes * self.n_bins
+        self.bin_count += np.bincount(flat, minlength=size).reshape(n_classes, self.n_bins)
+        self.bin_confidence += np.bincount(flat, weights=proba.ravel(), minlength=size).reshape(
+            n_classes, self.n_bins
+        )
+        positive_cells = columns[known] * self.n_bins + bins[rows[known], columns[known]]
+        self.bin_positives += np.bincount(positive_cells, minlength=size).reshape(n_classes, self.n_bins)
+
+        # Brier por classe: soma de p² em todas as linhas + (1 - 2p) nas linhas positivas.
+        self.brier_sum += np.einsum("ij,ij->j", proba, proba, dtype=np.float64)
+        self.brier_sum += np.bincount(
+            columns[known], weights=1.0 - 2.0 * true_proba[known].astype(np.float64), minlength=n_classes
+        )
+
+        # Confiabilidade da confiança top-1.
+        confidence = proba[rows, predicted_columns]
+        top1_bins = self._bins(confidence)
+        self.top1_bin_count += np.bincount(top1_bins, minlength=self.n_bins)
+        self.top1_bin_confidence += np.bincount(top1_bins, weights=confidence, minlength=self.n_bins)
+        self.top1_bin_correct += np.bincount(top1_bins, weights=predicted == y_true, minlength=self.n_bins).astype(
+            np.int64
+        )
+
+        self.rows += n_rows
+
+    def result(self, labels: Optional[Sequence[str]] = None) -> "ErrorAnalysis":
+        return ErrorAnalysis(
+            labels=list(labels) if labels is not None else [str(i) for i in range(self.n_labels)],
+            classes=self.classes,
+            top_k=self.top_k,
+            rows=self.rows,
+            confusion=self.confusion,
+            topk_hits=self.topk_hits,
+            bin_count=self.bin_count,
+            bin_confidence=self.bin_confidence,
+            bin_positives=self.bin_positives,
+            brier_sum=self.brier_sum,
+            top1_bin_count=self.top1_bin_count,
+            top1_bin_confidence=self.top1_bin_confidence,
+            top1_bin_correct=self.top1_bin_correct,
+        )
+
+
+@dataclass
+class ErrorAnalysis:
+    """Accumulated counts; every derived metric is computed on demand."""
+
+    labels: list
+    classes: "np.ndarray"
+    top_k: Tuple[int, ...]
+    rows: int
+    confusion: "np.ndarray"
+    topk_hits: "np.ndarray"
+    bin_count: "np.ndarray"
+    bin_confidence: "np.ndarray"
+    bin_positives: "np.ndarray"
+    brier_sum: "np.ndarray"
+    top1_bin_count: "np.ndarray"
+    top1_bin_confidence: "np.ndarray"
+    top1_bin_correct: "np.ndarray"
+
+    @property
+    def support(self):
+        return self.confusion.sum(axis=1)
+
+    def topk_accuracy(self) -> Dict[int, float]:
+        return {k: float(hits.sum() / max(self.rows, 1)) for k, hits in zip(self.top_k, self.topk_hits)}
+
+    def top1_ece(self) -> float:
+        """Expected calibration error of the top-1 confidence."""
+
+        counts = self.top1_bin_count
+        gap = np.abs(self.top1_bin_confidence - self.top1_bin_correct)
+        return float(gap.sum() / max(counts.sum(), 1))
+
+    def per_class(self) -> "pd.DataFrame":
+        """One row per label seen in the test set or known by the model."""
+
+        support = self.support
+        predicted = self.confusion.sum(axis=0)
+        true_positive = np.diag(self.confusion)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            precision = np.where(predicted > 0, true_positive / predicted, 0.0)
+            recall = np.where(support > 0, true_positive / support, 0.0)
+            f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+
+        frame = pd.DataFrame(
+            {
+                "label": np.arange(len(self.labels)),
+                "occupation": self.labels,
+                "support": support,
+                "predicted": predicted,
+                "precision": precision,
+                "recall": recall,
+                "f1": f1,
+            }
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            for k, hits in zip(self.top_k, self.topk_hits):
+                frame[f"top{k}_recall"] = np.where(support > 0, hits / support, np.nan)
+
+        # Métricas de calibração existem apenas para as classes do modelo.
+        ece = np.abs(self.bin_confidence - self.bin_positives).sum(axis=1) / max(self.rows, 1)
+        frame["ece"] = np.nan
+        frame["brier"] = np.nan
+        frame.loc[self.classes, "ece"] = ece
+        frame.loc[self.classes, "brier"] = self.brier_sum / max(self.rows, 1)
+
+        seen = (support > 0) | np.isin(frame["label"], self.classes)
+        return frame[seen].reset_index(drop=True)
+
+    def top_confusions(self, limit: int = 20) -> "pd.DataFrame":
+        """Largest off-diagonal cells of the confusion matrix."""
+
+        off_diagonal = self.confusion.copy()
+        np.fill_diagonal(off_diagonal, 0)
+        flat = off_diagonal.ravel()
+        limit = min(limit, int((flat > 0).sum()))
+        if limit == 0:
+            return pd.DataFrame(columns=["true", "predicted", "count", "share_of_true"])
+        top = np.argpartition(flat, -limit)[-limit:]
+        top = top[np.argsort(flat[top])[::-1]]
+        true_labels, predicted_labels = np.divmod(top, self.confusion.shape[1])
+        support = self.support
+        return pd.DataFrame(
+            {
+                "true": [self.labels[i] for i in true_labels],
+                "predicted": [self.labels[i] for i in predicted_labels],
+                "count": flat[top],
+                "share_of_true": flat[top] / np.maximum(support[true_labels], 1),
+            }
+        )
+
+    def reliability(self, label: Optional[int] = None) -> "pd.DataFrame":
+        """Reliability table of one class (one-vs-rest) or, by default, of the top-1 confidence."""
+
+        if label is None:
+            counts, confidence, positives = self.top1_bin_count, self.top1_bin_confidence, self.top1_bin_correct
+        else:
+            column = int(np.searchsorted(self.classes, label))
+            if column >= len(self.classes) or self.classes[column] != label:
+                raise KeyError(f"O modelo não conhece o rótulo {label}.")
+            counts, confidence, positives = (
+                self.bin_count[column],
+                self.bin_confidence[column],
+                self.bin_positives[column],
+            )
+        n_bins = len(counts)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return pd.DataFrame(
+                {
+                    "bin_start": np.arange(n_bins) / n_bins,
+                    "bin_end": np.arange(1, n_bins + 1) / n_bins,
+                    "count": counts,
+                    "mean_confidence": np.where(counts > 0, confidence / counts, np.nan),
+                    "observed_rate": np.where(counts > 0, positives / counts, np.nan),
+                }
+            )
+
+
+def analyze_predictions(y_true, proba, classes: Sequence[int], n_labels: int, *,
+                        labels: Optional[Sequence[str]] = None, top_k: Sequence[int] = DEFAULT_TOP_K,
+                        n_bins: int = DEFAULT_BINS, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> ErrorAnalysis:
+    """Analyse precomputed probabilities (arrays or ``np.memmap``) chunk by chunk."""
+
+    accumulator = ErrorAnalysisAccumulator(classes, n_labels, top_k=top_k, n_bins=n_bins)
+    step = chunk_rows_for(len(classes), memory_budget)
+    for start in range(0, len(y_true), step):
+        accumulator.update(y_true[start:start + step], proba[start:start + step])
+    return accumulator.result(labels)
+
+
+def analyze_model(model, X, y_true, *, labels: Sequence[str], top_k: Sequence[int] = DEFAULT_TOP_K,
+                  n_bins: int = DEFAULT_BINS, memory_budget: int = DEFAULT_MEMORY_BUDGET) -> ErrorAnalysis:
+    """Run ``model.predict_proba`` over ``X`` in row chunks and analyse the output."""
+
+    accumulator = ErrorAnalysisAccumulator(model.classes_, len(labels), top_k=top_k, n_bins=n_bins)
+    step = chunk_rows_for(len(model.classes_), memory_budget)
+    y_true = np.asarray(y_true)
+    for start in range(0, len(y_true), step):
+        rows = X.iloc[start:start + step] if hasattr(X, "iloc") else X[start:start + step]
+        accumulator.update(y_true[start:start + step], model.predict_proba(rows))
+    return accumulator.result(labels)
+
+
+_ARRAY_FIELDS = (
+    "classes",
+    "confusion",
+    "topk_hits",
+    "bin_count",
+    "bin_confidence",
+    "bin_positives",
+    "brier_sum",
+    "top1_bin_count",
+    "top1_bin_confidence",
+    "top1_bin_correct",
+)
+
+
+def save_error_analysis(analysis: ErrorAnalysis, path: Path) -> Path:
+    """Write ``analysis`` as an uncompressed ``.npz`` file."""
+
+    meta = {"version": FORMAT_VERSION, "rows": analysis.rows, "top_k": list(analysis.top_k)}
+    with open(path, "wb") as handle:
+        np.savez(
+            handle,
+            meta=np.frombuffer(json.dumps(meta).encode("utf-8"), dtype=np.uint8),
+            labels=np.asarray(analysis.labels, dtype=str),
+            **{name: getattr(analysis, name) for name in _ARRAY_FIELDS},
+        )
+    return Path(path)
+
+
+def load_error_analysis(path: Path) -> ErrorAnalysis:
+    """Read a file written by :func:`save_error_analysis`."""
+
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(data["meta"].tobytes().decode("utf-8"))
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Versão de análise de erros não suportada: {meta.get('version')}")
+        return ErrorAnalysis(
+            labels=data["labels"].tolist(),
+            top_k=tuple(meta["top_k"]),
+            rows=int(meta["rows"]),
+            **{name: data[name] for name in _ARRAY_FIELDS},
+        )
+
+
+__all__ = [
+    "ErrorAnalysis",
+    "ErrorAnalysisAccumulator",
+    "analyze_model",
+    "analyze_predictions",
+    "chunk_rows_for",
+    "load_error_analysis",
+    "save_error_analysis",
+]
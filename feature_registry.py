@@ -0,0 +1,230 @@
+"""Declarative registry of the astrological features used by the ML pipeline.
+
+Every feature that flows from ``generate_astro_features.py`` through
+``prepare_ml_data.py`` into the model (and into the API in ``astro.py``) is
+declared here exactly once, together with:
+
+``kind``
+    Value type produced by the generator (``categorical``, ``integer``,
+    ``float`` or ``list``).
+``source``
+    Where the value comes from: ``chart`` (read from the natal chart object),
+    ``derived`` (looked up from another feature, e.g. the dispositor of a sign)
+    or ``aggregate`` (counted over all bodies).
+``encoding``
+    How ``prepare_data`` turns the raw value into model columns: ``onehot``
+    (missing values become ``"Unknown"``), ``fill`` (numeric, missing values
+    become ``fill_value``) or ``aspect_count`` (JSON list reduced to its length
+    in ``<name>_count``).
+
+The column lists below are computed once at import time, so the scripts no
+longer classify columns by scanning their names on every run.  Columns that
+are not registered (such as the free-text temperament professions and
+challenges) are neither generated nor prepared.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+
+CATEGORICAL = "categorical"
+INTEGER = "integer"
+FLOAT = "float"
+LIST = "list"
+
+SOURCE_CHART = "chart"
+SOURCE_DERIVED = "derived"
+SOURCE_AGGREGATE = "aggregate"
+
+ONE_HOT = "onehot"
+FILL = "fill"
+ASPECT_COUNT = "aspect_count"
+
+UNKNOWN = "Unknown"
+
+BODIES: Tuple[str, ...] = (
+    "Sun",
+    "Moon",
+    "Mercury",
+    "Venus",
+    "Mars",
+    "Jupiter",
+    "Saturn",
+    "Uranus",
+    "Neptune",
+    "Pluto",
+)
+ANGLES: Tuple[str, ...] = ("ascendant", "mc")
+TEMPERAMENTS: Tuple[str, ...] = ("Choleric", "Sanguine", "Melancholic", "Phlegmatic")
+ELEMENT_SEQUENCE: Tuple[str, ...] = ("fire", "earth", "air", "water")
+
+METADATA_COLUMNS: Tuple[str, ...] = ("name", "occupation")
+
+
+@dataclass(frozen=True)
+class FeatureSpec:
+    """Declaration of a single generated feature."""
+
+    name: str
+    kind: str
+    source: str
+    encoding: str
+    fill_value: Any = None
+    dtype: Optional[str] = None
+    body: Optional[str] = None
+
+    @property
+    def prepared_name(self) -> str:
+        """Name of the column written to ``prepared_ml_data.csv`` (non one-hot)."""
+
+        if self.encoding == ASPECT_COUNT:
+            return f"{self.name}_count"
+        return self.name
+
+
+# (atributo, tipo, origem, codificação, valor de preenchimento, dtype preparado)
+_BODY_ATTRIBUTES = (
+    ("sign", CATEGORICAL, SOURCE_CHART, ONE_HOT, UNKNOWN, None),
+    ("house", INTEGER, SOURCE_CHART, FILL, 0, "int8"),
+    ("element", CATEGORICAL, SOURCE_CHART, ONE_HOT, UNKNOWN, None),
+    ("modality", CATEGORICAL, SOURCE_CHART, ONE_HOT, UNKNOWN, None),
+    ("aspects", LIST, SOURCE_CHART, ASPECT_COUNT, 0, "uint8"),
+    ("degree", FLOAT, SOURCE_CHART, FILL, -1, "float32"),
+    ("dispositor_traditional", CATEGORICAL, SOURCE_DERIVED, ONE_HOT, UNKNOWN, None),
+    ("dispositor_modern", CATEGORICAL, SOURCE_DERIVED, ONE_HOT, UNKNOWN, None),
+    ("temperament", CATEGORICAL, SOURCE_DERIVED, ONE_HOT, UNKNOWN, None),
+    ("dispositor_traditional_temperament", CATEGORICAL, SOURCE_DERIVED, ONE_HOT, UNKNOWN, None),
+    ("dispositor_modern_temperament", CATEGORICAL, SOURCE_DERIVED, ONE_HOT, UNKNOWN, None),
+    ("dispositor_traditional_element", CATEGORICAL, SOURCE_DERIVED, ONE_HOT, UNKNOWN, None),
+    ("dispositor_modern_element", CATEGORICAL, SOURCE_DERIVED, ONE_HOT, UNKNOWN, None),
+)
+
+_ANGLE_ATTRIBUTES = (
+    ("sign", CATEGORICAL, SOURCE_CHART, ONE_HOT, UNKNOWN, None),
+    ("house", INTEGER, SOURCE_CHART, FILL, 0, "int8"),
+)
+
+
+def _count(name: str) -> FeatureSpec:
+    return FeatureSpec(name, INTEGER, SOURCE_AGGREGATE, FILL, 0, "uint8")
+
+
+def _build_registry() -> Tuple[FeatureSpec, ...]:
+    specs: List[FeatureSpec] = []
+
+    for body in BODIES:
+        prefix = body.lower()
+        for attribute, kind, source, encoding, fill_value, dtype in _BODY_ATTRIBUTES:
+            specs.append(
+                FeatureSpec(f"{prefix}_{attribute}", kind, source, encoding, fill_value, dtype, body)
+            )
+
+    for temperament in TEMPERAMENTS:
+        key = temperament.lower()
+        specs.append(_count(f"temperament_{key}_count"))
+        specs.append(_count(f"temperament_traditional_dispositor_{key}_count"))
+        specs.append(_count(f"temperament_modern_dispositor_{key}_count"))
+
+    for element in ELEMENT_SEQUENCE:
+        specs.append(_count(f"element_traditional_dispositor_{element}_count"))
+        specs.append(_count(f"element_modern_dispositor_{element}_count"))
+
+    specs.append(
+        FeatureSpec("element_traditional_dispositor_dominant", CATEGORICAL, SOURCE_AGGREGATE, ONE_HOT, UNKNOWN)
+    )
+    specs.append(
+        FeatureSpec("element_modern_dispositor_dominant", CATEGORICAL, SOURCE_AGGREGATE, ONE_HOT, UNKNOWN)
+    )
+    specs.append(
+        FeatureSpec("temperament_profile_primary", CATEGORICAL, SOURCE_AGGREGATE, ONE_HOT, UNKNOWN)
+    )
+
+    for angle in ANGLES:
+        for attribute, kind, source, encoding, fill_value, dtype in _ANGLE_ATTRIBUTES:
+            specs.append(FeatureSpec(f"{angle}_{attribute}", kind, source, encoding, fill_value, dtype))
+
+    return tuple(specs)
+
+
+FEATURES: Tuple[FeatureSpec, ...] = _build_registry()
+FEATURES_BY_NAME: Dict[str, FeatureSpec] = {spec.name: spec for spec in FEATURES}
+
+GENERATED_COLUMNS: Tuple[str, ...] = METADATA_COLUMNS + tuple(spec.name for spec in FEATURES)
+ONE_HOT_FEATURES: Tuple[str, ...] = tuple(spec.name for spec in FEATURES if spec.encoding == ONE_HOT)
+FILL_FEATURES: Tuple[str, ...] = tuple(spec.name for spec in FEATURES if spec.encoding == FILL)
+ASPECT_COUNT_FEATURES: Tuple[str, ...] = tuple(
+    spec.name for spec in FEATURES if spec.encoding == ASPECT_COUNT
+)
+
+# Tipos compactos das colunas numéricas em ``prepared_ml_data.csv``.
+PREPARED_DTYPES: Dict[str, str] = {
+    spec.prepared_name: spec.dtype for spec in FEATURES if spec.dtype is not None
+}
+
+
+def is_registered(name: str) -> bool:
+    """Return ``True`` when ``name`` is a registered feature."""
+
+    return name in FEATURES_BY_NAME
+
+
+def features(
+    *, kind: Optional[str] = None, source: Optional[str] = None, encoding: Optional[str] = None
+) -> List[FeatureSpec]:
+    """Return the registered specs matching every given filter, in registry order."""
+
+    return [
+        spec
+        for spec in FEATURES
+        if (kind is None or spec.kind == kind)
+        and (source is None or spec.source == source)
+        and (encoding is None or spec.encoding == encoding)
+    ]
+
+
+def present(names: Iterable[str], columns: Iterable[str]) -> List[str]:
+    """Return the registered ``names`` that exist in ``columns`` (order preserved)."""
+
+    available = set(columns)
+    return [name for name in names if name in available]
+
+
+def unregistered(columns: Iterable[str]) -> List[str]:
+    """Return the columns that are neither metadata nor registered features."""
+
+    return [col for col in columns if col not in METADATA_COLUMNS and col not in FEATURES_BY_NAME]
+
+
+def select_generated(values: Mapping[str, Any]) -> Dict[str, Any]:
+    """Project a generator output onto the registered columns, in registry order."""
+
+    return {column: values.get(column) for column in GENERATED_COLUMNS}
+
+
+__all__ = [
+    "ANGLES",
+    "ASPECT_COUNT",
+    "ASPECT_COUNT_FEATURES",
+    "BODIES",
+    "CATEGORICAL",
+    "ELEMENT_SEQUENCE",
+    "FEATURES",
+    "FEATURES_BY_NAME",
+    "FILL",
+    "FILL_FEATURES",
+    "FeatureSpec",
+    "GENERATED_COLUMNS",
+    "METADATA_COLUMNS",
+    "ONE_HOT",
+    "ONE_HOT_FEATURES",
+    "PREPARED_DTYPES",
+    "TEMPERAMENTS",
+    "UNKNOWN",
+    "features",
+    "is_registered",
+    "present",
+    "select_generated",
+    "unregistered",
+]
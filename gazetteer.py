@@ -0,0 +1,273 @@
+"""Offline place-name index for geocoding birthplaces without coordinates.
+
+Names come from the Pantheon birthplaces (``pantheon_places.csv`` written by
+``process_pantheon_data.py``, or the ``bplace_*`` columns of a cleaned CSV)
+and from the small bundled gazetteer in ``data/gazetteer.csv``.  Places that
+normalize to the same name are merged and ranked by how many Pantheon rows
+were born there.
+
+Names are normalized (case-folded, accents and punctuation removed), so
+``"sao paulo"`` finds ``"São Paulo, Brazil"``:
+
+- :meth:`Gazetteer.complete` - prefix search over a sorted array of every
+  word suffix of every name (``"ital"`` matches ``"Pisa, Italy"``), located with
+  :func:`bisect.bisect_left`;
+- :meth:`Gazetteer.fuzzy` - trigram postings scored with the Dice coefficient
+  (``"Warsaw Polnd"`` still finds ``"Warsaw, Poland"``);
+- :meth:`Gazetteer.geocode` - exact name, else the best fuzzy match above
+  :data:`MIN_FUZZY_SCORE`.  Prefixes (``"ital"``) and bare country/region
+  names (``"Italy"``) are not geocoded: they would pick an arbitrary place.
+
+Every query costs a binary search plus a few NumPy operations on the matched
+slice, well under a millisecond for tens of thousands of places.
+"""
+
+from __future__ import annotations
+
+import csv
+import logging
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:  # pragma: no cover - dependências opcionais
+    import numpy as np
+except ImportError:  # pragma: no cover - dependências opcionais
+    np = None
+
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+BUNDLED_GAZETTEER = BASE_DIR / "data" / "gazetteer.csv"
+DEFAULT_SOURCES = (
+    BASE_DIR / "pantheon_places.csv",
+    BASE_DIR / "pantheon_cleaned_data.csv",
+    BASE_DIR / "data" / "sample_pantheon_cleaned_data.csv",
+)
+
+DEFAULT_LIMIT = 10
+MIN_FUZZY_SCORE = 0.5
+# Maior caractere possível: ``prefixo + _PREFIX_END`` limita a faixa de chaves.
+_PREFIX_END = "\U0010ffff"
+_NON_WORD = re.compile(r"[\W_]+")
+
+
+def normalize_name(text: str) -> str:
+    """Case-folded name without accents or punctuation (``"São Paulo, Brazil"`` -> ``"sao paulo brazil"``)."""
+
+    decomposed = unicodedata.normalize("NFKD", str(text))
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return " ".join(_NON_WORD.sub(" ", stripped.casefold()).split())
+
+
+def _trigrams(key: str) -> List[str]:
+    padded = f"  {key} "
+    return sorted({padded[index:index + 3] for index in range(len(padded) - 2)})
+
+
+@dataclass
+class PlaceMatch:
+    name: str
+    latitude: float
+    longitude: float
+    score: float
+    weight: int = 0
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "name": self.name,
+            "latitude": self.latitude,
+            "longitude": self.longitude,
+            "score": round(self.score, 4),
+        }
+
+
+class Gazetteer:
+    """In-memory prefix and fuzzy index over ``(name, latitude, longitude, weight)`` places."""
+
+    def __init__(self, places: Iterable[Tuple[str, float, float, int]]) -> None:
+        merged: Dict[str, Tuple[str, float, float, int]] = {}
+        for name, latitude, longitude, weight in places:
+            key = normalize_name(name)
+            if not key:
+                continue
+            current = merged.get(key)
+            if current is None:
+                merged[key] = (name, float(latitude), float(longitude), int(weight))
+            else:
+                # Mesmo nome normalizado: fica a grafia/coordenada mais frequente e os pesos somam.
+                best = current if current[3] >= weight else (name, float(latitude), float(longitude), weight)
+                merged[key] = (*best[:3], current[3] + int(weight))
+
+        self.keys = list(merged)
+        self.names = [merged[key][0] for key in self.keys]
+        self.latitudes = np.array([merged[key][1] for key in self.keys], dtype=float)
+        self.longitudes = np.array([merged[key][2] for key in self.keys], dtype=float)
+        self.weights = np.array([merged[key][3] for key in self.keys], dtype=np.int64)
+        self._by_key = {key: position for position, key in enumerate(self.keys)}
+        # Últimas partes de "Cidade, País" que não são elas mesmas uma cidade (Singapura).
+        parts = [name.split(",") for name in self.names]
+        self._regions = {normalize_name(part[-1]) for part in parts if len(part) > 1} - {
+            normalize_name(part[0]) for part in parts
+        }
+
+        # Índice de prefixos: todo sufixo que começa numa palavra, ordenado.
+        suffixes = []
+        for position, key in enumerate(self.keys):
+            suffixes.append((key, position, 1))
+            for match in re.finditer(r" (?=\S)", key):
+                suffixes.append((key[match.end():], position, 0))
+        suffixes.sort()
+        self._suffixes = [suffix for suffix, _, _ in suffixes]
+        self._suffix_place = np.array([position for _, position, _ in suffixes], dtype=np.int64)
+        self._suffix_whole = np.array([whole for _, _, whole in suffixes], dtype=bool)
+        # Ranking: nomes que começam com o prefixo antes dos que só têm uma palavra com ele; depois o peso.
+        self._suffix_rank = (self._suffix_whole.astype(np.int64) << 40) + self.weights[self._suffix_place]
+
+        postings = defaultdict(list)
+        for position, key in enumerate(self.keys):
+            for gram in _trigrams(key):
+                postings[gram].append(position)
+        self._postings = {gram: np.array(items, dtype=np.int64) for gram, items in postings.items()}
+        self._gram_counts = np.array([len(_trigrams(key)) for key in self.keys], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def _match(self, position: int, score: float) -> PlaceMatch:
+        return PlaceMatch(
+            self.names[position],
+            float(self.latitudes[position]),
+            float(self.longitudes[position]),
+            float(score),
+            int(self.weights[position]),
+        )
+
+    def complete(self, prefix: str, limit: int = DEFAULT_LIMIT) -> List[PlaceMatch]:
+        """Places with a word starting with ``prefix``; whole-name prefixes and frequent places first."""
+
+        query = normalize_name(prefix)
+        if not query or limit <= 0:
+            return []
+        start = bisect_left(self._suffixes, query)
+        stop = bisect_left(self._suffixes, query + _PREFIX_END, lo=start)
+        if start == stop:
+            return []
+        ranks = self._suffix_rank[start:stop]
+        size = min(len(ranks), 4 * limit)
+        while True:
+            # Só as ``size`` melhores entradas são ordenadas; um lugar pode aparecer
+            # uma vez por palavra, então a janela cresce se faltarem lugares distintos.
+            top = np.argpartition(-ranks, size - 1)[:size] if size < len(ranks) else np.arange(len(ranks))
+            top = top[np.argsort(-ranks[top], kind="stable")]
+            places = self._suffix_place[start + top]
+            _, first = np.unique(places, return_index=True)
+            if len(first) >= limit or size == len(ranks):
+                break
+            size = min(len(ranks), 2 * size)
+        first = np.sort(first)[:limit]
+        return [
+            self._match(position, 1.0 if whole else 0.9)
+            for position, whole in zip(places[first], self._suffix_whole[start + top[first]])
+        ]
+
+    def fuzzy(self, text: str, limit: int = DEFAULT_LIMIT, min_score: float = 0.0) -> List[PlaceMatch]:
+        """Places ranked by trigram similarity (Dice coefficient) to ``text``."""
+
+        query = normalize_name(text)
+        if not query or limit <= 0 or not len(self):
+            return []
+        grams = _trigrams(query)
+        hits = [self._postings[gram] for gram in grams if gram in self._postings]
+        if not hits:
+            return []
+        shared = np.bincount(np.concatenate(hits), minlength=len(self))
+        scores = 2.0 * shared / (len(grams) + self._gram_counts)
+        candidates = np.flatnonzero(scores > min_score) if min_score > 0 else np.flatnonzero(shared)
+        if len(candidates) > limit:
+            candidates = candidates[np.argpartition(-scores[candidates], limit - 1)[:limit]]
+        order = np.lexsort((-self.weights[candidates], -scores[candidates]))
+        return [self._match(position, scores[position]) for position in candidates[order]]
+
+    def search(self, text: str, limit: int = DEFAULT_LIMIT) -> List[PlaceMatch]:
+        """Autocomplete: prefix matches, topped up with fuzzy matches when there are few."""
+
+        results = self.complete(text, limit)
+        if len(results) < limit:
+            seen = {match.name for match in results}
+            for match in self.fuzzy(text, limit, MIN_FUZZY_SCORE):
+                if match.name not in seen and len(results) < limit:
+                    results.append(match)
+        return results
+
+    def geocode(self, text: str) -> Optional[PlaceMatch]:
+        """Best single place for ``text`` (``None`` when nothing is close enough).
+
+        Only exact names and fuzzy matches above :data:`MIN_FUZZY_SCORE` are
+        accepted; partial names and bare countries are left to :meth:`search`.
+        """
+
+        query = normalize_name(text)
+        position = self._by_key.get(query)
+        if position is not None:
+            return self._match(position, 1.0)
+        if query in self._regions:
+            return None
+        for match in self.fuzzy(text, 1, MIN_FUZZY_SCORE):
+            return match
+        return None
+
+
+def read_places(path: Path) -> List[Tuple[str, float, float, int]]:
+    """``(name, lat, lon, weight)`` rows of a place table, cleaned CSV or gazetteer file.
+
+    Place tables carry ``rows`` as the weight; every row of a cleaned CSV or of
+    the gazetteer counts once.
+    """
+
+    places = []
+    with open(path, newline="", encoding="utf-8") as handle:
+        for row in csv.DictReader(handle):
+            try:
+                latitude = float(row["bplace_lat"])
+                longitude = float(row["bplace_lon"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            name = row.get("bplace_name") or ""
+            weight = row.get("rows") or 1
+            places.append((name, latitude, longitude, int(float(weight))))
+    return places
+
+
+def load_gazetteer(sources: Optional[Sequence[Path]] = None, bundled: Optional[Path] = BUNDLED_GAZETTEER) -> Gazetteer:
+    """Index the first existing file of ``sources`` plus the bundled gazetteer."""
+
+    places: List[Tuple[str, float, float, int]] = []
+    for path in sources if sources is not None else DEFAULT_SOURCES:
+        path = Path(path)
+        if path.exists():
+            places += read_places(path)
+            logger.info("Lugares de nascimento carregados de %s", path)
+            break
+    if bundled is not None and Path(bundled).exists():
+        # Entradas do gazetteer só desempatam: peso zero frente às contagens do Pantheon.
+        places += [(name, lat, lon, 0) for name, lat, lon, _ in read_places(Path(bundled))]
+    gazetteer = Gazetteer(places)
+    logger.info("Índice de lugares com %s nomes.", len(gazetteer))
+    return gazetteer
+
+
+__all__ = [
+    "BUNDLED_GAZETTEER",
+    "Gazetteer",
+    "MIN_FUZZY_SCORE",
+    "PlaceMatch",
+    "load_gazetteer",
+    "normalize_name",
+    "read_places",
+]
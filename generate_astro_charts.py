@@ -1,41 +1,87 @@
-import pandas as pd
-from kerykeion import AstrologicalSubject
-from timezonefinder import TimezoneFinder
-import pytz
-import swisseph as swe
+"""Generate kerykeion charts for the cleaned Pantheon rows, in parallel batches.
+
+Rows ``--start`` to ``--stop`` of the cleaned CSV are read in batches of
+``--batch-size`` (without loading the rest of the file) and charted by
+``--workers`` processes; each worker writes its batch to
+``<batch-dir>/astrological_features_with_professions_batch_N.csv`` and the
+throughput of every batch is logged as it finishes.  A final streaming merge
+writes one output file with the union of the batch columns (a batch where
+some point was never found still lines up), in row order, and removes the
+batch files unless ``--keep-batches`` is given.
+
+Usage::
+
+    python generate_astro_charts.py --workers 8 --stop 50000
+    python generate_astro_charts.py --start 50000 --stop 100000 --output charts_50k_100k.csv
+"""
+
+import csv
+import logging
 import os
-import json
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from historical_dates import gregorian_date, parse_dates
+
+try:  # pragma: no cover - dependências opcionais
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependências opcionais
+    pd = None
+
+try:  # pragma: no cover - dependências opcionais
+    from kerykeion import AstrologicalSubject
+    from timezonefinder import TimezoneFinder
+    import swisseph as swe
+except ImportError:  # pragma: no cover - dependências opcionais
+    AstrologicalSubject = None
+    TimezoneFinder = None
+    swe = None
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+BASE_DIR = Path(__file__).resolve().parent
+INPUT_FILE = BASE_DIR / "pantheon_cleaned_data.csv"
+OUTPUT_FILE = BASE_DIR / "astrological_features_with_professions.csv"
+BATCH_DIR = BASE_DIR / "chart_batches"
+BATCH_PREFIX = "astrological_features_with_professions_batch_"
 
 # Set the path to the Swiss Ephemeris files
-kerykeion_sweph_path = "/usr/local/lib/python3.11/dist-packages/kerykeion/sweph/"
-if os.path.exists(kerykeion_sweph_path):
-    # Ensure pyswisseph uses the available ephemeris file
-    # The error 'seas_12.se1' not found suggests it's looking for a specific file.
-    # We'll try to explicitly set the path and hope it picks up 'seas_18.se1'.
-    # If not, a deeper fix in pyswisseph configuration might be needed.
-    swe.set_ephe_path(kerykeion_sweph_path)
-    print(f"Swiss Ephemeris path set to: {kerykeion_sweph_path}")
-else:
-    print("Kerykeion sweph path not found. Please ensure pyswisseph is correctly installed.")
+KERYKEION_SWEPH_PATH = "/usr/local/lib/python3.11/dist-packages/kerykeion/sweph/"
+
+DEFAULT_STOP = 1000
+DEFAULT_BATCH_SIZE = 100
+INPUT_COLUMNS = ["name", "occupation", "birthdate", "birth_jdn", "bplace_lat", "bplace_lon", "place_id"]
+PLANETS = ["sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn", "uranus", "neptune", "pluto", "chiron"]
+
+# Estado de cada processo de trabalho: o TimezoneFinder é caro de criar e os
+# fusos são consultados uma vez por lugar (place_id de process_pantheon_data.py).
+_timezone_finder = None
+_timezones_by_place: Dict[object, str] = {}
 
-# Load the cleaned Pantheon data
-df = pd.read_csv("pantheon_cleaned_data.csv")
 
-# Limit to the first 1000 records for MVP
-df = df.head(1000)
+def _configure_ephemeris() -> None:
+    if os.path.exists(KERYKEION_SWEPH_PATH):
+        # Ensure pyswisseph uses the ephemeris files shipped with kerykeion
+        swe.set_ephe_path(KERYKEION_SWEPH_PATH)
+        logging.info("Swiss Ephemeris path set to: %s", KERYKEION_SWEPH_PATH)
+    else:
+        logging.warning("Kerykeion sweph path not found. Please ensure pyswisseph is correctly installed.")
 
-# Initialize TimezoneFinder
-tf = TimezoneFinder()
 
-# Initialize a list to store astrological data and professions
-astro_data_list = []
+def _init_worker() -> None:
+    global _timezone_finder
+    _configure_ephemeris()
+    _timezone_finder = TimezoneFinder()
+
 
 # Function to extract astrological points from a Kerykeion AstrologicalSubject object
 def extract_astro_points(chart):
     points = {}
     # Planets and other points
-    for planet_name in ["sun", "moon", "mercury", "venus", "mars", "jupiter", "saturn", 
-                        "uranus", "neptune", "pluto", "chiron"]:
+    for planet_name in PLANETS:
         planet = getattr(chart, planet_name, None)
         if planet:
             points[f"{planet_name}_sign"] = getattr(planet, 'sign', None)
@@ -64,70 +110,259 @@ def extract_astro_points(chart):
         else:
             points[f"house_{i}_sign"] = None
             points[f"house_{i}_degree"] = None
-    
+
     # Ascendant and Midheaven
     points["ascendant_sign"] = getattr(chart.ascendant, 'sign', None)
-    points[f"ascendant_degree"] = getattr(chart.ascendant, 'degree', None)
+    points["ascendant_degree"] = getattr(chart.ascendant, 'degree', None)
     points["mc_sign"] = getattr(chart.mc, 'sign', None)
-    points[f"mc_degree"] = getattr(chart.mc, 'degree', None)
+    points["mc_degree"] = getattr(chart.mc, 'degree', None)
 
     return points
 
-# Batch processing configuration
-batch_size = 100 # Smaller batch size for MVP
-output_file_prefix = "astrological_features_with_professions_batch_"
-
-# Iterate through each row of the DataFrame
-for index, row in df.iterrows():
-    name = row["name"]
-    occupation = row["occupation"]
-    birth_date = pd.to_datetime(row["birthdate"])
-    birth_place_lat = row["bplace_lat"]
-    birth_place_lon = row["bplace_lon"]
-
-    # Use 12:00 PM as default time if not available (as per user’s choice)
-    birth_hour = 12
-    birth_minute = 0
-
-    # Ensure latitude and longitude are valid numbers
-    if pd.isna(birth_place_lat) or pd.isna(birth_place_lon):
-        print(f"Skipping {name} due to invalid latitude/longitude: {birth_place_lat}, {birth_place_lon}")
-        continue
-
-    # Get timezone string from coordinates
-    timezone_str = tf.timezone_at(lng=birth_place_lon, lat=birth_place_lat)
+
+def _timezone(row: Dict[str, object]) -> str:
+    place_key = row.get("place_id")
+    if place_key is None:
+        place_key = (row["bplace_lat"], row["bplace_lon"])
+    timezone_str = _timezones_by_place.get(place_key)
     if timezone_str is None:
-        timezone_str = 'UTC' # Fallback to UTC if no timezone is found
+        timezone_str = _timezone_finder.timezone_at(lng=row["bplace_lon"], lat=row["bplace_lat"])
+        if timezone_str is None:
+            timezone_str = 'UTC'  # Fallback to UTC if no timezone is found
+        _timezones_by_place[place_key] = timezone_str
+    return timezone_str
+
+
+def _birth_jdns(rows: Sequence[Dict[str, object]]) -> List[Optional[int]]:
+    """Julian Day Number of each row: ``birth_jdn`` (cleaned data) or the parsed ``birthdate``.
+
+    ``birth_jdn`` already accounts for the calendar chosen when cleaning;
+    only rows without it are parsed, as proleptic Gregorian.
+    """
+
+    jdns: List[Optional[int]] = [None if pd.isna(row.get("birth_jdn")) else int(row["birth_jdn"]) for row in rows]
+    missing = [position for position, jdn in enumerate(jdns) if jdn is None]
+    if missing:
+        parsed = parse_dates([rows[position]["birthdate"] for position in missing])
+        for index, position in enumerate(missing):
+            if parsed.valid[index]:
+                jdns[position] = int(parsed.jdn[index])
+    return jdns
+
+
+def chart_rows(rows: Sequence[Dict[str, object]]) -> Tuple[List[Dict[str, object]], int]:
+    """Kerykeion points of ``rows`` and the number of rows that failed."""
+
+    jdns = _birth_jdns(rows)
+    charts, errors = [], 0
+    for position, row in enumerate(rows):
+        name = row["name"]
+        # Ensure latitude, longitude and birthdate are valid
+        if pd.isna(row["bplace_lat"]) or pd.isna(row["bplace_lon"]) or jdns[position] is None:
+            logging.warning("Linha ignorada (%s): data ou coordenadas inválidas.", name)
+            errors += 1
+            continue
+        try:
+            birth_date = gregorian_date(jdns[position])
+        except ValueError as exc:
+            logging.warning("Linha ignorada (%s): %s", name, exc)
+            errors += 1
+            continue
+        try:
+            # Use 12:00 PM as default time if not available (as per user's choice)
+            chart = AstrologicalSubject(
+                name=name,
+                year=birth_date.year,
+                month=birth_date.month,
+                day=birth_date.day,
+                hour=12,
+                minute=0,
+                lat=row["bplace_lat"],
+                lng=row["bplace_lon"],
+                tz_str=_timezone(row),
+                geonames_username=None,  # Explicitly set to None to avoid warnings
+            )
+            astro_points = {"name": name, **extract_astro_points(chart), "occupation": row["occupation"]}
+            charts.append(astro_points)
+        except Exception as exc:
+            logging.error("Erro ao gerar o mapa de %s: %s", name, exc)
+            errors += 1
+    return charts, errors
+
 
+def _run_batch(index: int, rows: List[Dict[str, object]], batch_dir: Path) -> Dict[str, object]:
+    start = time.perf_counter()
+    charts, errors = chart_rows(rows)
+    path = batch_dir / f"{BATCH_PREFIX}{index}.csv"
+    pd.DataFrame(charts).to_csv(path, index=False)
+    return {
+        "index": index,
+        "path": path,
+        "rows": len(rows),
+        "charts": len(charts),
+        "errors": errors,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+def iter_row_batches(path: Path, start: int, stop: Optional[int], batch_size: int):
+    """Rows ``start``-``stop`` of ``path`` as lists of dictionaries, ``batch_size`` at a time."""
+
+    header = pd.read_csv(path, nrows=0).columns
+    columns = [column for column in INPUT_COLUMNS if column in header]
+    reader = pd.read_csv(
+        path,
+        usecols=columns,
+        dtype={"name": str, "occupation": str, "birthdate": str},
+        skiprows=range(1, start + 1),
+        nrows=None if stop is None else max(stop - start, 0),
+        chunksize=batch_size,
+    )
+    with reader:
+        for chunk in reader:
+            yield chunk.to_dict("records")
+
+
+def merge_batches(paths: Sequence[Path], output: Path) -> int:
+    """Stream ``paths`` into ``output`` under the union of their columns; returns rows written."""
+
+    columns: Dict[str, None] = {}
+    for path in paths:
+        with open(path, newline="", encoding="utf-8") as handle:
+            columns.update(dict.fromkeys(next(csv.reader(handle), [])))
+
+    written = 0
+    tmp_path = output.with_name(f".{output.name}.tmp")
     try:
-        # Create AstrologicalSubject object using explicit lat, lng, and tz_str
-        chart = AstrologicalSubject(
-            name=name,
-            year=birth_date.year,
-            month=birth_date.month,
-            day=birth_date.day,
-            hour=birth_hour,
-            minute=birth_minute,
-            lat=birth_place_lat,
-            lng=birth_place_lon, 
-            tz_str=timezone_str,
-            geonames_username=None # Explicitly set to None to avoid warnings
-        )
-
-        # Extract astrological points
-        astro_points = extract_astro_points(chart)
-        astro_points["occupation"] = occupation
-        astro_data_list.append(astro_points)
-
-    except Exception as e:
-        print(f"Error generating chart for {name}: {e}")
-
-    if (index + 1) % batch_size == 0 or (index + 1) == len(df):
-        # Save current batch to CSV
-        batch_df = pd.DataFrame(astro_data_list)
-        batch_file_name = f"{output_file_prefix}{index // batch_size}.csv"
-        batch_df.to_csv(batch_file_name, index=False)
-        print(f"Processed and saved batch {index // batch_size} to {batch_file_name}")
-        astro_data_list = [] # Clear list for next batch
-
-print("Astrological features and professions generation complete.")
+        with open(tmp_path, "w", newline="", encoding="utf-8") as target:
+            writer = csv.DictWriter(target, fieldnames=list(columns), restval="")
+            writer.writeheader()
+            for path in paths:
+                with open(path, newline="", encoding="utf-8") as handle:
+                    for row in csv.DictReader(handle):
+                        writer.writerow(row)
+                        written += 1
+        os.replace(tmp_path, output)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return written
+
+
+def _log_batch(result: Dict[str, object]) -> None:
+    seconds = result["seconds"]
+    logging.info(
+        "Lote %s: %s mapas de %s linhas em %.2fs (%.1f mapas/s), %s erros",
+        result["index"],
+        result["charts"],
+        result["rows"],
+        seconds,
+        result["charts"] / seconds if seconds else float("inf"),
+        result["errors"],
+    )
+
+
+def generate_charts(
+    input_path: Path = INPUT_FILE,
+    output: Path = OUTPUT_FILE,
+    *,
+    start: int = 0,
+    stop: Optional[int] = DEFAULT_STOP,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    batch_dir: Path = BATCH_DIR,
+    keep_batches: bool = False,
+) -> Dict[str, float]:
+    """Chart rows ``start``-``stop`` of ``input_path`` into ``output``; returns the totals."""
+
+    batch_dir.mkdir(parents=True, exist_ok=True)
+    batches = enumerate(iter_row_batches(input_path, start, stop, batch_size))
+    results: List[Dict[str, object]] = []
+    began = time.perf_counter()
+
+    if workers <= 1:
+        _init_worker()
+        for index, rows in batches:
+            results.append(_run_batch(index, rows, batch_dir))
+            _log_batch(results[-1])
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+            # No máximo 2 lotes por processo em voo: a entrada é lida conforme os lotes terminam.
+            pending = set()
+            for index, rows in batches:
+                pending.add(executor.submit(_run_batch, index, rows, batch_dir))
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        results.append(future.result())
+                        _log_batch(results[-1])
+            for future in wait(pending).done:
+                results.append(future.result())
+                _log_batch(results[-1])
+
+    paths = [result["path"] for result in sorted(results, key=lambda result: result["index"])]
+    written = merge_batches(paths, output)
+    if not keep_batches:
+        for path in paths:
+            path.unlink(missing_ok=True)
+
+    elapsed = time.perf_counter() - began
+    totals = {
+        "batches": len(results),
+        "rows": sum(result["rows"] for result in results),
+        "charts": written,
+        "errors": sum(result["errors"] for result in results),
+        "seconds": elapsed,
+    }
+    logging.info(
+        "%s mapas de %s linhas em %s lotes com %s processos: %.2fs (%.1f mapas/s), %s erros. Saída: %s",
+        totals["charts"],
+        totals["rows"],
+        totals["batches"],
+        max(workers, 1),
+        elapsed,
+        written / elapsed if elapsed else float("inf"),
+        totals["errors"],
+        output,
+    )
+    return totals
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Gera mapas kerykeion da base Pantheon limpa em lotes paralelos.")
+    parser.add_argument("--input", type=Path, default=INPUT_FILE, help="CSV limpo de entrada.")
+    parser.add_argument("--output", type=Path, default=OUTPUT_FILE, help="CSV único com todos os lotes.")
+    parser.add_argument("--start", type=int, default=0, help="Primeira linha (0 = primeira linha de dados).")
+    parser.add_argument(
+        "--stop",
+        type=int,
+        default=DEFAULT_STOP,
+        help="Linha final, exclusiva (padrão: 1000; 0 processa até o fim do arquivo).",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Linhas por lote.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos em paralelo.")
+    parser.add_argument("--batch-dir", type=Path, default=BATCH_DIR, help="Pasta dos arquivos de lote.")
+    parser.add_argument("--keep-batches", action="store_true", help="Mantém os arquivos de lote após a junção.")
+    args = parser.parse_args()
+
+    if pd is None or AstrologicalSubject is None:
+        raise SystemExit("pandas, kerykeion, timezonefinder e pyswisseph são necessários para gerar os mapas.")
+    if args.start < 0 or args.batch_size <= 0:
+        parser.error("--start deve ser >= 0 e --batch-size > 0.")
+
+    generate_charts(
+        args.input,
+        args.output,
+        start=args.start,
+        stop=args.stop or None,
+        batch_size=args.batch_size,
+        workers=args.workers,
+        batch_dir=args.batch_dir,
+        keep_batches=args.keep_batches,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,13 @@ import shutil
 import json
 import logging
 import math
+import os
 import traceback
 
 from astro_database_client import AstroDatabaseClient, AstroDatabaseError
+import feature_registry
+from feature_registry import BODIES, ELEMENT_SEQUENCE
+from historical_dates import gregorian_date, parse_dates
 
 try:  # pragma: no cover - dependência opcional
     import pandas as pd
@@ -35,6 +39,8 @@ INPUT_FILE = BASE_DIR / "pantheon_reduced_1000.csv"
 SAMPLE_INPUT_FILE = DATA_DIR / "sample_pantheon_reduced_1000.csv"
 OUTPUT_FILE = BASE_DIR / "astrological_features.csv"
 SAMPLE_OUTPUT_FILE = DATA_DIR / "sample_astrological_features.csv"
+# Colunas lidas por get_astrological_data.
+INPUT_FIELDS = ["name", "occupation", "birthdate", "birth_jdn", "bplace_lat", "bplace_lon"]
 
 SIGN_RULERS_TRADITIONAL = {
     "aries": "Mars",
@@ -125,9 +131,6 @@ TEMPERAMENT_PROFILES = {
 }
 
 
-ELEMENT_SEQUENCE = ["fire", "earth", "air", "water"]
-
-
 def _normalize_degree(value: float | int | None) -> float | None:
     if value is None:
         return None
@@ -183,16 +186,82 @@ def _resolve_dispositor_element(body: str | None, found_objects: dict[str, objec
     return None
 
 
+def _birth_datetime(row) -> datetime:
+    """Noon of the birth day, from ``birth_jdn`` (cleaned data) or the raw ``birthdate``.
+
+    The Julian Day Number written by ``process_pantheon_data.py`` already
+    accounts for the calendar and BCE years; ``ValueError`` when the date is
+    invalid or outside the years 1-9999 that ``datetime`` can hold.
+    """
+
+    jdn = row.get('birth_jdn')
+    if jdn is None or pd.isna(jdn):
+        parsed = parse_dates([row['birthdate']])
+        if not parsed.valid[0]:
+            raise ValueError(f"Data de nascimento inválida: {row['birthdate']!r}")
+        jdn = parsed.jdn[0]
+    birth_date = gregorian_date(jdn)
+    return datetime(birth_date.year, birth_date.month, birth_date.day, 12)
+
+
+def _registered_for_bodies(attribute: str) -> bool:
+    return any(feature_registry.is_registered(f"{body.lower()}_{attribute}") for body in BODIES)
+
+
+def _registered_with_prefix(*prefixes: str) -> bool:
+    return any(name.startswith(prefixes) for name in feature_registry.FEATURES_BY_NAME)
+
+
+# Famílias de features calculadas por get_astrological_data.  O registro decide,
+# uma vez, o que é preciso: uma família só é calculada se alguma feature
+# registrada depende dela (direta ou indiretamente, via contagens e dominantes).
+NEED_TEMPERAMENT_COUNTS = _registered_with_prefix(
+    *(f"temperament_{name.lower()}_count" for name in TEMPERAMENT_PROFILES)
+) or feature_registry.is_registered("temperament_profile_primary")
+NEED_DISPOSITOR_TEMPERAMENT_COUNTS = _registered_with_prefix(
+    "temperament_traditional_dispositor_", "temperament_modern_dispositor_"
+)
+NEED_DISPOSITOR_ELEMENT_COUNTS = _registered_with_prefix(
+    "element_traditional_dispositor_", "element_modern_dispositor_"
+)
+NEED_TEMPERAMENT = NEED_TEMPERAMENT_COUNTS or _registered_for_bodies("temperament")
+NEED_DISPOSITOR_TEMPERAMENTS = (
+    NEED_DISPOSITOR_TEMPERAMENT_COUNTS
+    or _registered_for_bodies("dispositor_traditional_temperament")
+    or _registered_for_bodies("dispositor_modern_temperament")
+)
+NEED_DISPOSITOR_ELEMENTS = (
+    NEED_DISPOSITOR_ELEMENT_COUNTS
+    or _registered_for_bodies("dispositor_traditional_element")
+    or _registered_for_bodies("dispositor_modern_element")
+)
+NEED_DISPOSITORS = (
+    NEED_DISPOSITOR_TEMPERAMENTS
+    or NEED_DISPOSITOR_ELEMENTS
+    or _registered_for_bodies("dispositor_traditional")
+    or _registered_for_bodies("dispositor_modern")
+)
+NEED_SIGN = NEED_DISPOSITORS or _registered_for_bodies("sign")
+NEED_ELEMENT = NEED_TEMPERAMENT or _registered_for_bodies("element")
+NEED_HOUSE = _registered_for_bodies("house")
+NEED_MODALITY = _registered_for_bodies("modality")
+NEED_ASPECTS = _registered_for_bodies("aspects")
+NEED_DEGREE = _registered_for_bodies("degree")
+NEED_ASCENDANT = _registered_with_prefix("ascendant_")
+NEED_MC = _registered_with_prefix("mc_")
+
+
 def get_astrological_data(row):
     features = {
         'name': row['name'],
         'occupation': row['occupation'],
     }
     try:
-        birth_date_str = row['birthdate']
-        birth_datetime_str = f"{birth_date_str} 12:00:00"
-        birth_datetime = datetime.strptime(birth_datetime_str, '%Y-%m-%d %H:%M:%S')
-        
+        birth_datetime = _birth_datetime(row)
+    except ValueError as exc:
+        logging.warning("Registro %s ignorado: %s", row['name'], exc)
+        return None
+    try:
         latitude = row['bplace_lat']
         longitude = row['bplace_lon']
 
@@ -205,7 +274,7 @@ def get_astrological_data(row):
         natal = charts.Natal(native)
         # logging.debug(f"Natal chart created for {row['name']}. Objects keys: {natal.objects.keys()}")
 
-        celestial_objects = ["Sun", "Moon", "Mercury", "Venus", "Mars", "Jupiter", "Saturn", "Uranus", "Neptune", "Pluto"]
+        celestial_objects = BODIES
 
         temperament_counts = {name: 0 for name in TEMPERAMENT_PROFILES.keys()}
         trad_dispositor_counts = {name: 0 for name in TEMPERAMENT_PROFILES.keys()}
@@ -230,22 +299,34 @@ def get_astrological_data(row):
                         found_obj = obj_data
                         break
             
-            if found_obj:
-                found_objects[obj_prefix] = found_obj
-                sign_value = found_obj.sign.name if hasattr(found_obj, 'sign') and found_obj.sign else None
-                features[f'{obj_prefix}_sign'] = sign_value
+            found_objects[obj_prefix] = found_obj
+            if not found_obj:
+                # Sem o objeto, as colunas dele ficam vazias (select_generated preenche com None).
+                continue
+
+            sign = found_obj.sign if hasattr(found_obj, 'sign') and found_obj.sign else None
+            if NEED_SIGN:
+                features[f'{obj_prefix}_sign'] = sign.name if sign else None
+            if NEED_HOUSE:
                 features[f'{obj_prefix}_house'] = found_obj.house.number if hasattr(found_obj, 'house') and found_obj.house else None
-                features[f'{obj_prefix}_element'] = found_obj.sign.element if hasattr(found_obj, 'sign') and found_obj.sign and hasattr(found_obj.sign, 'element') else None
-                features[f'{obj_prefix}_modality'] = found_obj.sign.modality if hasattr(found_obj, 'sign') and found_obj.sign and hasattr(found_obj.sign, 'modality') else None
+            if NEED_ELEMENT:
+                features[f'{obj_prefix}_element'] = sign.element if sign and hasattr(sign, 'element') else None
+            if NEED_MODALITY:
+                features[f'{obj_prefix}_modality'] = sign.modality if sign and hasattr(sign, 'modality') else None
+            if NEED_ASPECTS:
                 features[f'{obj_prefix}_aspects'] = json.dumps([str(a) for a in found_obj.aspects]) if hasattr(found_obj, 'aspects') and found_obj.aspects else None
+            if NEED_DEGREE:
                 features[f'{obj_prefix}_degree'] = _resolve_degree(found_obj)
-                trad_ruler, modern_ruler = _resolve_dispositors(sign_value)
-                features[f'{obj_prefix}_dispositor_traditional'] = trad_ruler
-                features[f'{obj_prefix}_dispositor_modern'] = modern_ruler
+            if NEED_TEMPERAMENT:
                 temperament = _resolve_temperament_from_element(features[f'{obj_prefix}_element'])
                 features[f'{obj_prefix}_temperament'] = temperament
                 if temperament:
                     temperament_counts[temperament] += 1
+            if NEED_DISPOSITORS:
+                trad_ruler, modern_ruler = _resolve_dispositors(features[f'{obj_prefix}_sign'])
+                features[f'{obj_prefix}_dispositor_traditional'] = trad_ruler
+                features[f'{obj_prefix}_dispositor_modern'] = modern_ruler
+            if NEED_DISPOSITOR_TEMPERAMENTS:
                 trad_temperament = _resolve_temperament_from_body(trad_ruler)
                 modern_temperament = _resolve_temperament_from_body(modern_ruler)
                 features[f'{obj_prefix}_dispositor_traditional_temperament'] = trad_temperament
@@ -254,111 +335,85 @@ def get_astrological_data(row):
                     trad_dispositor_counts[trad_temperament] += 1
                 if modern_temperament:
                     modern_dispositor_counts[modern_temperament] += 1
-                # logging.debug(f"  Extracted {obj_name_expected}: Sign={features[f'{obj_prefix}_sign']}, House={features[f'{obj_prefix}_house']}")
-            else:
-                found_objects[obj_prefix] = None
-                features[f'{obj_prefix}_sign'] = None
-                features[f'{obj_prefix}_house'] = None
-                features[f'{obj_prefix}_element'] = None
-                features[f'{obj_prefix}_modality'] = None
-                features[f'{obj_prefix}_aspects'] = None
-                features[f'{obj_prefix}_degree'] = None
-                features[f'{obj_prefix}_dispositor_traditional'] = None
-                features[f'{obj_prefix}_dispositor_modern'] = None
-                features[f'{obj_prefix}_temperament'] = None
-                features[f'{obj_prefix}_dispositor_traditional_temperament'] = None
-                features[f'{obj_prefix}_dispositor_modern_temperament'] = None
-                # logging.debug(f"  {obj_name_expected} not found.")
+            # logging.debug(f"  Extracted {obj_name_expected}: Sign={features.get(f'{obj_prefix}_sign')}, House={features.get(f'{obj_prefix}_house')}")
 
-        for obj_name_expected in celestial_objects:
-            obj_prefix = obj_name_expected.lower()
-            trad_dispositor = features.get(f'{obj_prefix}_dispositor_traditional')
-            modern_dispositor = features.get(f'{obj_prefix}_dispositor_modern')
+        if NEED_DISPOSITOR_ELEMENTS:
+            for obj_name_expected in celestial_objects:
+                obj_prefix = obj_name_expected.lower()
+                trad_dispositor = features.get(f'{obj_prefix}_dispositor_traditional')
+                modern_dispositor = features.get(f'{obj_prefix}_dispositor_modern')
 
-            trad_element = _resolve_dispositor_element(trad_dispositor, found_objects)
-            modern_element = _resolve_dispositor_element(modern_dispositor, found_objects)
+                trad_element = _resolve_dispositor_element(trad_dispositor, found_objects)
+                modern_element = _resolve_dispositor_element(modern_dispositor, found_objects)
 
-            features[f'{obj_prefix}_dispositor_traditional_element'] = trad_element
-            features[f'{obj_prefix}_dispositor_modern_element'] = modern_element
+                features[f'{obj_prefix}_dispositor_traditional_element'] = trad_element
+                features[f'{obj_prefix}_dispositor_modern_element'] = modern_element
 
-            trad_element_key = trad_element.lower() if isinstance(trad_element, str) else None
-            modern_element_key = modern_element.lower() if isinstance(modern_element, str) else None
+                trad_element_key = trad_element.lower() if isinstance(trad_element, str) else None
+                modern_element_key = modern_element.lower() if isinstance(modern_element, str) else None
 
-            if trad_element_key in trad_dispositor_element_counts:
-                trad_dispositor_element_counts[trad_element_key] += 1
-            if modern_element_key in modern_dispositor_element_counts:
-                modern_dispositor_element_counts[modern_element_key] += 1
+                if trad_element_key in trad_dispositor_element_counts:
+                    trad_dispositor_element_counts[trad_element_key] += 1
+                if modern_element_key in modern_dispositor_element_counts:
+                    modern_dispositor_element_counts[modern_element_key] += 1
 
         for temperament_name in TEMPERAMENT_PROFILES.keys():
-            features[f'temperament_{temperament_name.lower()}_count'] = temperament_counts[temperament_name]
-            features[f'temperament_traditional_dispositor_{temperament_name.lower()}_count'] = trad_dispositor_counts[temperament_name]
-            features[f'temperament_modern_dispositor_{temperament_name.lower()}_count'] = modern_dispositor_counts[temperament_name]
-
-        for element in ELEMENT_SEQUENCE:
-            features[f'element_traditional_dispositor_{element}_count'] = trad_dispositor_element_counts[element]
-            features[f'element_modern_dispositor_{element}_count'] = modern_dispositor_element_counts[element]
-
-        dominant_trad_element = max(
-            trad_dispositor_element_counts.items(),
-            key=lambda item: item[1],
-        ) if trad_dispositor_element_counts else None
-
-        dominant_modern_element = max(
-            modern_dispositor_element_counts.items(),
-            key=lambda item: item[1],
-        ) if modern_dispositor_element_counts else None
-
-        features['element_traditional_dispositor_dominant'] = (
-            dominant_trad_element[0]
-            if dominant_trad_element and dominant_trad_element[1] > 0
-            else None
-        )
-        features['element_modern_dispositor_dominant'] = (
-            dominant_modern_element[0]
-            if dominant_modern_element and dominant_modern_element[1] > 0
-            else None
-        )
+            if NEED_TEMPERAMENT_COUNTS:
+                features[f'temperament_{temperament_name.lower()}_count'] = temperament_counts[temperament_name]
+            if NEED_DISPOSITOR_TEMPERAMENT_COUNTS:
+                features[f'temperament_traditional_dispositor_{temperament_name.lower()}_count'] = trad_dispositor_counts[temperament_name]
+                features[f'temperament_modern_dispositor_{temperament_name.lower()}_count'] = modern_dispositor_counts[temperament_name]
+
+        if NEED_DISPOSITOR_ELEMENT_COUNTS:
+            for element in ELEMENT_SEQUENCE:
+                features[f'element_traditional_dispositor_{element}_count'] = trad_dispositor_element_counts[element]
+                features[f'element_modern_dispositor_{element}_count'] = modern_dispositor_element_counts[element]
+
+            dominant_trad_element = max(
+                trad_dispositor_element_counts.items(),
+                key=lambda item: item[1],
+            ) if trad_dispositor_element_counts else None
 
-        dominant_temperament = None
-        if temperament_counts:
-            dominant_temperament = max(
-                temperament_counts.items(),
+            dominant_modern_element = max(
+                modern_dispositor_element_counts.items(),
                 key=lambda item: item[1],
+            ) if modern_dispositor_element_counts else None
+
+            features['element_traditional_dispositor_dominant'] = (
+                dominant_trad_element[0]
+                if dominant_trad_element and dominant_trad_element[1] > 0
+                else None
+            )
+            features['element_modern_dispositor_dominant'] = (
+                dominant_modern_element[0]
+                if dominant_modern_element and dominant_modern_element[1] > 0
+                else None
             )
-            dominant_temperament = dominant_temperament[0] if dominant_temperament[1] > 0 else None
 
-        if dominant_temperament:
-            profile = TEMPERAMENT_PROFILES[dominant_temperament]
+        if NEED_TEMPERAMENT_COUNTS:
+            dominant_temperament = None
+            if temperament_counts:
+                dominant_temperament = max(
+                    temperament_counts.items(),
+                    key=lambda item: item[1],
+                )
+                dominant_temperament = dominant_temperament[0] if dominant_temperament[1] > 0 else None
             features['temperament_profile_primary'] = dominant_temperament
-            features['temperament_profile_primary_professions'] = "; ".join(profile['professions'])
-            features['temperament_profile_primary_challenges'] = profile['challenges']
-        else:
-            features['temperament_profile_primary'] = None
-            features['temperament_profile_primary_professions'] = None
-            features['temperament_profile_primary_challenges'] = None
 
         # Tratar Ascendente e Meio do Céu de forma mais robusta
-        ascendant_obj = getattr(natal, 'ascendant', None)
+        ascendant_obj = getattr(natal, 'ascendant', None) if NEED_ASCENDANT else None
         if ascendant_obj:
             features['ascendant_sign'] = ascendant_obj.sign.name if hasattr(ascendant_obj, 'sign') and ascendant_obj.sign else None
             features['ascendant_house'] = ascendant_obj.house.number if hasattr(ascendant_obj, 'house') and ascendant_obj.house else None
             # logging.debug(f"  Ascendant: Sign={features['ascendant_sign']}, House={features['ascendant_house']}")
-        else:
-            features['ascendant_sign'] = None
-            features['ascendant_house'] = None
-            # logging.debug("  Ascendant not found or is None.")
 
-        mc_obj = getattr(natal, 'mc', None)
+        mc_obj = getattr(natal, 'mc', None) if NEED_MC else None
         if mc_obj:
             features['mc_sign'] = mc_obj.sign.name if hasattr(mc_obj, 'sign') and mc_obj.sign else None
             features['mc_house'] = mc_obj.house.number if hasattr(mc_obj, 'house') and mc_obj.house else None
             # logging.debug(f"  MC: Sign={features['mc_sign']}, House={features['mc_house']}")
-        else:
-            features['mc_sign'] = None
-            features['mc_house'] = None
-            # logging.debug("  MC not found or is None.")
 
-        return features
+        return feature_registry.select_generated(features)
     except swe.Error as se:  # type: ignore[attr-defined]
         logging.warning(f"Erro swisseph ao processar {row['name']}: {se}. Ignorando este registro.")
         return None
@@ -378,7 +433,7 @@ def _load_reduced_dataframe() -> "DataFrame":
 
     try:
         client = AstroDatabaseClient()
-        records = client.fetch_reduced_people()
+        records = client.fetch_reduced_people(fields=INPUT_FIELDS)
         if not records:
             raise AstroDatabaseError("Nenhum registro reduzido retornado pelo banco astrológico.")
         df_remote = pd.DataFrame(records)
@@ -398,6 +453,24 @@ def _load_reduced_dataframe() -> "DataFrame":
     return pd.read_csv(SAMPLE_INPUT_FILE)
 
 
+def _publish_features(features_df: "DataFrame") -> None:
+    """Send the generated features to the database when ASTRO_DB_PUBLISH_FEATURES is set."""
+
+    if os.getenv("ASTRO_DB_PUBLISH_FEATURES", "").lower() not in ("1", "true", "yes"):
+        return
+    try:
+        report = AstroDatabaseClient().upload_astrological_features(features_df)
+    except AstroDatabaseError as exc:
+        logging.warning("Não foi possível publicar as características no banco astrológico: %s", exc)
+        return
+    if not report.ok:
+        logging.warning(
+            "Publicação parcial: %s de %s registros rejeitados pelo banco astrológico.",
+            report.failed,
+            report.records,
+        )
+
+
 def _copy_sample_output() -> None:
     logging.info("Carregando características astrológicas de amostra em %s", OUTPUT_FILE)
     if pd is not None:
@@ -427,6 +500,7 @@ def main() -> None:
         astro_features_df = pd.DataFrame(astro_data_list)
         astro_features_df.to_csv(OUTPUT_FILE, index=False)
         logging.info("Características astrológicas geradas e salvas em %s", OUTPUT_FILE)
+        _publish_features(astro_features_df)
     else:
         logging.warning("Nenhuma característica astrológica foi gerada; carregando dados de amostra.")
         _copy_sample_output()
@@ -1,5 +1,138 @@
-from kerykeion import AstrologicalSubject
+"""Export full kerykeion charts for a list of people as JSON Lines.
+
+Subjects come from a CSV file (or ``-`` for stdin) with one person per row:
+
+- ``name``;
+- the date as ``year``/``month``/``day`` or as ``birthdate`` (any format
+  accepted by :func:`historical_dates.parse_dates`, so the cleaned Pantheon
+  CSV works as is);
+- ``hour``/``minute`` (12:00 when missing);
+- coordinates as ``lat``/``lng``, ``latitude``/``longitude`` or
+  ``bplace_lat``/``bplace_lon``;
+- optionally ``tz_str`` (looked up with timezonefinder once per place
+  otherwise), ``city``/``bplace_name`` and ``nation``.
+
+Rows are read ``--batch-size`` at a time and charted by ``--workers``
+processes.  Each worker serializes its charts (orjson when installed), so the
+parent only writes bytes, in input order, with at most two batches per
+process in flight: memory stays flat for hundreds of thousands of subjects.
+Every chart is one compact JSON object per line with the same fields as
+:func:`chart_to_dict`.  The output (``-`` for stdout) is compressed with gzip
+or zstd when ``--compress`` asks for it or the name ends in ``.gz``/``.zst``;
+files are written to a temporary name and renamed when complete.
+
+Without ``--input`` the script keeps its original behaviour and writes the
+John Lennon example to ``john_lennon_chart.json``.
+
+Usage::
+
+    python generate_chart.py --input pantheon_cleaned_data.csv --output charts.jsonl.gz --workers 8
+    cat people.csv | python generate_chart.py --input - --output - --compress zstd > charts.jsonl.zst
+"""
+
+import csv
+import gzip
+import io
 import json
+import logging
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from historical_dates import parse_dates
+
+try:  # pragma: no cover - dependências opcionais
+    from kerykeion import AstrologicalSubject
+except ImportError:  # pragma: no cover - dependências opcionais
+    AstrologicalSubject = None
+
+try:  # pragma: no cover - dependências opcionais
+    from timezonefinder import TimezoneFinder
+except ImportError:  # pragma: no cover - dependências opcionais
+    TimezoneFinder = None
+
+try:  # pragma: no cover - dependências opcionais
+    import orjson
+except ImportError:  # pragma: no cover - dependências opcionais
+    orjson = None
+
+try:  # pragma: no cover - dependências opcionais
+    import zstandard
+except ImportError:  # pragma: no cover - dependências opcionais
+    zstandard = None
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+BASE_DIR = Path(__file__).resolve().parent
+EXAMPLE_OUTPUT = BASE_DIR / "john_lennon_chart.json"
+EXAMPLE_SUBJECT = {
+    "name": "John Lennon",
+    "year": 1940,
+    "month": 10,
+    "day": 9,
+    "hour": 18,
+    "minute": 30,
+    "city": "Liverpool",
+    "nation": "GB",
+    "lng": -2.983333,
+    "lat": 53.400002,
+    "tz_str": "Europe/London",
+}
+
+DEFAULT_BATCH_SIZE = 200
+COMPRESSIONS = ("auto", "none", "gzip", "zstd")
+COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+DEFAULT_LEVELS = {"gzip": 6, "zstd": 3}
+PROGRESS_SECONDS = 10.0
+
+LAT_COLUMNS = ("lat", "latitude", "bplace_lat")
+LNG_COLUMNS = ("lng", "lon", "longitude", "bplace_lon")
+CITY_COLUMNS = ("city", "bplace_name")
+POINTS = {
+    "sun": "sun",
+    "moon": "moon",
+    "mercury": "mercury",
+    "venus": "venus",
+    "mars": "mars",
+    "jupiter": "jupiter",
+    "saturn": "saturn",
+    "uranus": "uranus",
+    "neptune": "neptune",
+    "pluto": "pluto",
+    "chiron": "chiron",
+    "lilith": "mean_lilith",
+    "north_node": "true_node",
+    "south_node": "true_south_node",
+    "ascendant": "ascendant",
+    "mc": "medium_coeli",
+}
+HOUSES = [
+    "first_house",
+    "second_house",
+    "third_house",
+    "fourth_house",
+    "fifth_house",
+    "sixth_house",
+    "seventh_house",
+    "eighth_house",
+    "ninth_house",
+    "tenth_house",
+    "eleventh_house",
+    "twelfth_house",
+]
+
+# Estado de cada processo de trabalho: o TimezoneFinder é caro de criar e os
+# fusos são consultados uma vez por par de coordenadas.
+_timezone_finder = None
+_timezones_by_place: Dict[Tuple[float, float], str] = {}
+
 
 def point_to_dict(point):
     return {
@@ -33,52 +166,312 @@ def house_to_dict(house):
         "retrograde": house.retrograde
     }
 
-john = AstrologicalSubject("John Lennon", 1940, 10, 9, 18, 30, "Liverpool", "GB", lng=-2.983333, lat=53.400002, tz_str="Europe/London")
-
-chart_data = {
-    "name": john.name,
-    "year": john.year,
-    "month": john.month,
-    "day": john.day,
-    "hour": john.hour,
-    "minutes": john.minute,
-    "city": john.city,
-    "nation": john.nation,
-    "longitude": john.lng,
-    "latitude": john.lat,
-    "tz_str": john.tz_str,
-    "sun": point_to_dict(john.sun),
-    "moon": point_to_dict(john.moon),
-    "mercury": point_to_dict(john.mercury),
-    "venus": point_to_dict(john.venus),
-    "mars": point_to_dict(john.mars),
-    "jupiter": point_to_dict(john.jupiter),
-    "saturn": point_to_dict(john.saturn),
-    "uranus": point_to_dict(john.uranus),
-    "neptune": point_to_dict(john.neptune),
-    "pluto": point_to_dict(john.pluto),
-    "chiron": point_to_dict(john.chiron),
-    "lilith": point_to_dict(john.mean_lilith),
-    "north_node": point_to_dict(john.true_node),
-    "south_node": point_to_dict(john.true_south_node),
-    "ascendant": point_to_dict(john.ascendant),
-    "mc": point_to_dict(john.medium_coeli),
-    "houses": [
-        house_to_dict(john.first_house),
-        house_to_dict(john.second_house),
-        house_to_dict(john.third_house),
-        house_to_dict(john.fourth_house),
-        house_to_dict(john.fifth_house),
-        house_to_dict(john.sixth_house),
-        house_to_dict(john.seventh_house),
-        house_to_dict(john.eighth_house),
-        house_to_dict(john.ninth_house),
-        house_to_dict(john.tenth_house),
-        house_to_dict(john.eleventh_house),
-        house_to_dict(john.twelfth_house)
-    ]
-}
 
-with open("john_lennon_chart.json", "w") as f:
-    f.write(json.dumps(chart_data, indent=4))
+def chart_to_dict(subject) -> Dict[str, object]:
+    """Birth data, points and houses of a kerykeion ``AstrologicalSubject``."""
+
+    chart_data = {
+        "name": subject.name,
+        "year": subject.year,
+        "month": subject.month,
+        "day": subject.day,
+        "hour": subject.hour,
+        "minutes": subject.minute,
+        "city": subject.city,
+        "nation": subject.nation,
+        "longitude": subject.lng,
+        "latitude": subject.lat,
+        "tz_str": subject.tz_str,
+    }
+    for key, attribute in POINTS.items():
+        chart_data[key] = point_to_dict(getattr(subject, attribute))
+    chart_data["houses"] = [house_to_dict(getattr(subject, attribute)) for attribute in HOUSES]
+    return chart_data
+
+
+def dumps_line(obj: Dict[str, object]) -> bytes:
+    """``obj`` as one compact UTF-8 JSON line (orjson when installed)."""
+
+    if orjson is not None:
+        return orjson.dumps(obj, default=str, option=orjson.OPT_APPEND_NEWLINE)
+    return (json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def _first(row: Dict[str, object], columns: Iterable[str]) -> Optional[object]:
+    for column in columns:
+        value = row.get(column)
+        if value not in (None, ""):
+            return value
+    return None
+
+
+def _timezone(lat: float, lng: float) -> str:
+    global _timezone_finder
+    timezone_str = _timezones_by_place.get((lat, lng))
+    if timezone_str is None:
+        if _timezone_finder is None:
+            if TimezoneFinder is None:
+                raise ValueError("sem tz_str e timezonefinder não está instalado")
+            _timezone_finder = TimezoneFinder()
+        timezone_str = _timezone_finder.timezone_at(lng=lng, lat=lat) or "UTC"
+        _timezones_by_place[(lat, lng)] = timezone_str
+    return timezone_str
+
+
+def subject_kwargs(row: Dict[str, object], date: Optional[Tuple[int, int, int]]) -> Dict[str, object]:
+    """``AstrologicalSubject`` arguments for a CSV row; ``date`` comes from ``birthdate`` when parsed."""
+
+    if row.get("year") not in (None, ""):
+        date = tuple(int(float(row[column])) for column in ("year", "month", "day"))
+    if date is None:
+        raise ValueError("data de nascimento ausente ou inválida")
+    lat, lng = _first(row, LAT_COLUMNS), _first(row, LNG_COLUMNS)
+    if lat is None or lng is None:
+        raise ValueError("coordenadas ausentes")
+    lat, lng = float(lat), float(lng)
+    year, month, day = date
+    return {
+        "name": str(row.get("name") or ""),
+        "year": year,
+        "month": month,
+        "day": day,
+        "hour": int(float(_first(row, ("hour",)) or 12)),
+        "minute": int(float(_first(row, ("minute", "minutes")) or 0)),
+        "city": str(_first(row, CITY_COLUMNS) or ""),
+        "nation": str(row.get("nation") or ""),
+        "lat": lat,
+        "lng": lng,
+        "tz_str": str(row.get("tz_str") or _timezone(lat, lng)),
+    }
+
+
+def export_rows(rows: List[Dict[str, object]]) -> Tuple[List[bytes], int]:
+    """JSON lines of the charts of ``rows`` and the number of rows that failed."""
+
+    dated = [position for position, row in enumerate(rows) if row.get("year") in (None, "")]
+    dates: Dict[int, Tuple[int, int, int]] = {}
+    if dated:
+        # Só as linhas sem year/month/day passam pelo parser de datas, todas de uma vez.
+        parsed = parse_dates([rows[position].get("birthdate") for position in dated])
+        for offset, position in enumerate(dated):
+            if parsed.valid[offset]:
+                dates[position] = (int(parsed.year[offset]), int(parsed.month[offset]), int(parsed.day[offset]))
+
+    lines, errors = [], 0
+    for position, row in enumerate(rows):
+        try:
+            subject = AstrologicalSubject(**subject_kwargs(row, dates.get(position)), geonames_username=None)
+            lines.append(dumps_line(chart_to_dict(subject)))
+        except Exception as exc:
+            logging.warning("Mapa de %s ignorado: %s", row.get("name"), exc)
+            errors += 1
+    return lines, errors
+
+
+def _run_batch(index: int, rows: List[Dict[str, object]]) -> Dict[str, object]:
+    start = time.perf_counter()
+    lines, errors = export_rows(rows)
+    return {
+        "index": index,
+        "payload": b"".join(lines),
+        "rows": len(rows),
+        "charts": len(lines),
+        "errors": errors,
+        "seconds": time.perf_counter() - start,
+    }
+
+
+@contextmanager
+def _open_input(source: str) -> Iterator[io.TextIOBase]:
+    if source == "-":
+        yield io.TextIOWrapper(sys.stdin.buffer, encoding="utf-8", newline="")
+    else:
+        with open(source, newline="", encoding="utf-8") as handle:
+            yield handle
+
+
+def iter_subject_batches(handle: io.TextIOBase, batch_size: int) -> Iterator[List[Dict[str, object]]]:
+    """CSV rows of ``handle`` as lists of dictionaries, ``batch_size`` at a time."""
+
+    reader = csv.DictReader(handle)
+    while True:
+        batch = list(islice(reader, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def resolve_compression(output: str, compression: str = "auto") -> str:
+    """``"none"``, ``"gzip"`` or ``"zstd"``; ``"auto"`` follows the output suffix."""
+
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Compressão desconhecida: {compression}")
+    if compression == "auto":
+        compression = COMPRESSION_SUFFIXES.get(Path(output).suffix, "none") if output != "-" else "none"
+    if compression == "zstd" and zstandard is None:
+        raise ValueError("A compressão zstd precisa do pacote zstandard.")
+    return compression
+
+
+@contextmanager
+def open_output(output: str, compression: str = "none", level: Optional[int] = None):
+    """Binary writer for ``output`` (``-`` = stdout); files only appear once complete."""
+
+    level = DEFAULT_LEVELS.get(compression) if level is None else level
+    tmp_path = None
+    if output == "-":
+        raw = sys.stdout.buffer
+    else:
+        path = Path(output)
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        raw = open(tmp_path, "wb")
+    try:
+        if compression == "gzip":
+            writer = gzip.GzipFile(filename="", mode="wb", fileobj=raw, compresslevel=level, mtime=0)
+        elif compression == "zstd":
+            writer = zstandard.ZstdCompressor(level=level).stream_writer(raw, closefd=False)
+        else:
+            writer = raw
+        yield writer
+        if writer is not raw:
+            writer.close()
+        raw.flush()
+        if tmp_path is not None:
+            raw.close()
+            os.replace(tmp_path, output)
+    except BaseException:
+        if tmp_path is not None:
+            raw.close()
+            tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def export_charts(
+    source: str,
+    output: str,
+    *,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: int = 1,
+    compression: str = "auto",
+    level: Optional[int] = None,
+) -> Dict[str, float]:
+    """Chart every subject of ``source`` into the JSON Lines ``output``; returns the totals."""
+
+    compression = resolve_compression(output, compression)
+    totals = {"batches": 0, "rows": 0, "charts": 0, "errors": 0, "bytes": 0}
+    began = last_log = time.perf_counter()
+
+    with _open_input(source) as handle, open_output(output, compression, level) as writer:
+
+        def write(result: Dict[str, object]) -> None:
+            nonlocal last_log
+            writer.write(result["payload"])
+            totals["batches"] += 1
+            totals["bytes"] += len(result["payload"])
+            for key in ("rows", "charts", "errors"):
+                totals[key] += result[key]
+            now = time.perf_counter()
+            if now - last_log >= PROGRESS_SECONDS:
+                last_log = now
+                logging.info(
+                    "%s mapas de %s linhas (%.1f mapas/s), %s erros",
+                    totals["charts"],
+                    totals["rows"],
+                    totals["charts"] / (now - began),
+                    totals["errors"],
+                )
+
+        batches = enumerate(iter_subject_batches(handle, batch_size))
+        if workers <= 1:
+            for index, rows in batches:
+                write(_run_batch(index, rows))
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                # Lotes gravados na ordem de entrada; no máximo 2 por processo em voo.
+                pending = deque()
+                for index, rows in batches:
+                    pending.append(executor.submit(_run_batch, index, rows))
+                    if len(pending) >= 2 * workers:
+                        write(pending.popleft().result())
+                while pending:
+                    write(pending.popleft().result())
+
+    elapsed = time.perf_counter() - began
+    totals["seconds"] = elapsed
+    logging.info(
+        "%s mapas de %s linhas com %s processos: %.2fs (%.1f mapas/s), %s erros, %.1f MB de JSON (%s). Saída: %s",
+        totals["charts"],
+        totals["rows"],
+        max(workers, 1),
+        elapsed,
+        totals["charts"] / elapsed if elapsed else float("inf"),
+        totals["errors"],
+        totals["bytes"] / 1e6,
+        compression,
+        "stdout" if output == "-" else output,
+    )
+    return totals
+
+
+def write_example(path: Path = EXAMPLE_OUTPUT) -> None:
+    """The original single-chart example, indented for reading."""
+
+    subject = AstrologicalSubject(**EXAMPLE_SUBJECT)
+    with open(path, "w") as f:
+        f.write(json.dumps(chart_to_dict(subject), indent=4))
+
+
+__all__ = [
+    "COMPRESSIONS",
+    "chart_to_dict",
+    "dumps_line",
+    "export_charts",
+    "export_rows",
+    "house_to_dict",
+    "iter_subject_batches",
+    "open_output",
+    "point_to_dict",
+    "resolve_compression",
+    "subject_kwargs",
+]
+
+
+def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Exporta mapas kerykeion completos em JSON Lines.")
+    parser.add_argument("--input", help="CSV de pessoas ('-' lê da entrada padrão). Sem ele, gera o exemplo de John Lennon.")
+    parser.add_argument("--output", default="-", help="Arquivo JSON Lines ('-' escreve na saída padrão).")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help="Linhas por lote.")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Processos em paralelo.")
+    parser.add_argument(
+        "--compress",
+        choices=COMPRESSIONS,
+        default="auto",
+        help="Compressão da saída (auto: pela extensão .gz/.zst).",
+    )
+    parser.add_argument("--level", type=int, help="Nível de compressão (padrão: gzip 6, zstd 3).")
+    args = parser.parse_args()
+
+    if AstrologicalSubject is None:
+        raise SystemExit("kerykeion é necessário para gerar os mapas.")
+    if args.input is None:
+        write_example()
+        return
+    if args.batch_size <= 0:
+        parser.error("--batch-size deve ser > 0.")
+    try:
+        export_charts(
+            args.input,
+            args.output,
+            batch_size=args.batch_size,
+            workers=args.workers,
+            compression=args.compress,
+            level=args.level,
+        )
+    except ValueError as exc:
+        parser.error(str(exc))
+
 
+if __name__ == "__main__":
+    main()
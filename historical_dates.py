@@ -0,0 +1,300 @@
+"""Vectorized parser for historical birthdates.
+
+``pd.to_datetime`` guesses the format row by row and can only represent
+1677-09-21 … 2262-04-11 as a ``Timestamp``: with ``errors="coerce"`` everyone
+born in antiquity or the Middle Ages silently became ``NaT`` and was dropped
+by the cleaning step.  :func:`parse_dates` keeps dates as integer components
+and Julian Day Numbers instead:
+
+- fast path: ``YYYY-MM-DD`` and ``-YYYY-MM-DD`` (optionally followed by a
+  ``T``/space and ``HH:MM`` or ``HH:MM:SS``) are decoded with NumPy arithmetic on the UCS-4 code
+  points of the whole column, without a Python call per row;
+- fallback path: a regular expression per row for year-only and year-month
+  values, years with more than four digits and explicit eras (``470 BC``,
+  ``1066 AD``, ``44 a.C.``); missing months/days default to 1;
+- every parsed date is validated against the month lengths of its calendar.
+
+Years are astronomical (year 0 is 1 BCE).  A leading minus sign follows
+ISO 8601 by default (``-0469`` is 470 BCE); ``negative_years="historical"``
+reads it as a BCE year instead (``-469`` is 469 BCE).  Explicit ``BC``/``BCE``
+suffixes are always historical.  ``calendar`` selects how the components are
+interpreted: ``"gregorian"`` (proleptic, the default and what ``pd.to_datetime``
+assumed), ``"julian"``, or ``"auto"`` (Julian before 1582-10-15, Gregorian from
+then on).
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict
+
+try:  # pragma: no cover - dependências opcionais
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependências opcionais
+    np = None
+    pd = None
+
+
+CALENDARS = ("gregorian", "julian", "auto")
+NEGATIVE_YEAR_CONVENTIONS = ("astronomical", "historical")
+# Primeiro dia do calendário gregoriano (15/10/1582), usado por ``calendar="auto"``.
+GREGORIAN_REFORM = (1582, 10, 15)
+
+# Dia juliano de 31/12/0000 gregoriano: ``date.fromordinal(jdn - _ORDINAL_OFFSET)``.
+_ORDINAL_OFFSET = 1721425
+
+PATH_FAST = "fast"
+PATH_FALLBACK = "fallback"
+PATH_INVALID = "invalid"
+PATH_MISSING = "missing"
+# ``ParsedDates.path`` guarda o índice do caminho nesta tupla.
+PATHS = (PATH_FAST, PATH_FALLBACK, PATH_INVALID, PATH_MISSING)
+
+_DIGIT_POSITIONS = (0, 1, 2, 3, 5, 6, 8, 9)
+# ``THH:MM:SS`` depois da data: posições dos dígitos e dos dois-pontos.
+_TIME_DIGIT_POSITIONS = (11, 12, 14, 15, 17, 18)
+_TIME_COLONS = (13, 16)
+# Largura lida por linha: a data, a hora e um caractere para confirmar o fim.
+_BLOCK_WIDTH = 20
+_FALLBACK_PATTERN = re.compile(
+    r"""^\s*
+    (?P<sign>[-+])?(?P<year>\d{1,6})
+    (?:-(?P<month>\d{1,2})(?:-(?P<day>\d{1,2}))?)?
+    (?:[T\s]\d{1,2}:\d{2}(?::\d{2}(?:\.\d+)?)?(?:Z|[+-]\d{2}:?\d{2})?)?
+    \s*(?P<era>B\.?\s?C\.?(?:E\.?)?|A\.?\s?D\.?|C\.?E\.?|a\.\s?C\.?|d\.\s?C\.?)?
+    \s*$""",
+    re.VERBOSE | re.IGNORECASE,
+)
+_BCE_ERAS = ("BC", "BCE", "AC")
+
+
+@dataclass
+class ParsedDates:
+    """Components, Julian Day Numbers and per-row parse path of a date column.
+
+    ``year`` is astronomical; rows that could not be parsed have ``valid``
+    ``False`` and zeros in the numeric arrays.  ``path`` holds indices into
+    :data:`PATHS` and ``counts`` the number of rows per path.
+    """
+
+    year: "np.ndarray"
+    month: "np.ndarray"
+    day: "np.ndarray"
+    jdn: "np.ndarray"
+    valid: "np.ndarray"
+    path: "np.ndarray"
+    calendar: str
+    counts: Dict[str, int] = field(default_factory=dict)
+
+    def __len__(self) -> int:
+        return len(self.valid)
+
+    def iso(self) -> "np.ndarray":
+        """ISO 8601 strings (``-0469-01-01`` for 470 BCE); ``None`` where invalid."""
+
+        out = np.full(len(self), None, dtype=object)
+        for index in np.flatnonzero(self.valid):
+            year = int(self.year[index])
+            sign = "-" if year < 0 else ""
+            out[index] = f"{sign}{abs(year):04d}-{int(self.month[index]):02d}-{int(self.day[index]):02d}"
+        return out
+
+    def to_frame(self, prefix: str = "birth") -> "pd.DataFrame":
+        """``<prefix>_year/_month/_day/_jdn`` nullable integer columns."""
+
+        columns = {"year": self.year, "month": self.month, "day": self.day, "jdn": self.jdn}
+        return pd.DataFrame(
+            {
+                f"{prefix}_{name}": pd.arrays.IntegerArray(values.astype(np.int64), ~self.valid)
+                for name, values in columns.items()
+            }
+        )
+
+
+def _is_leap(year: "np.ndarray", julian: "np.ndarray") -> "np.ndarray":
+    gregorian_leap = (year % 4 == 0) & ((year % 100 != 0) | (year % 400 == 0))
+    return np.where(julian, year % 4 == 0, gregorian_leap)
+
+
+_MONTH_DAYS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31]) if np is not None else None
+
+
+def _days_in_month(year: "np.ndarray", month: "np.ndarray", julian: "np.ndarray") -> "np.ndarray":
+    days = _MONTH_DAYS[np.clip(month, 0, 12)]
+    return days + ((month == 2) & _is_leap(year, julian))
+
+
+def julian_day_number(year, month, day, julian) -> "np.ndarray":
+    """Julian Day Number at noon of astronomical ``year``-``month``-``day`` (vectorized)."""
+
+    year = np.asarray(year, dtype=np.int64)
+    month = np.asarray(month, dtype=np.int64)
+    day = np.asarray(day, dtype=np.int64)
+    a = (14 - month) // 12
+    y = year + 4800 - a
+    m = month + 12 * a - 3
+    base = day + (153 * m + 2) // 5 + 365 * y + y // 4
+    return np.where(julian, base - 32083, base - y // 100 + y // 400 - 32045)
+
+
+def gregorian_date(jdn: int) -> date:
+    """Proleptic Gregorian ``date`` of a Julian Day Number (what ``datetime`` and the chart libraries expect)."""
+
+    jdn = int(jdn)
+    try:
+        return date.fromordinal(jdn - _ORDINAL_OFFSET)
+    except (OverflowError, ValueError):
+        raise ValueError(f"Dia juliano {jdn} fora dos anos 1-9999 representáveis em datetime.") from None
+
+
+def _uses_julian(year, month, day, calendar: str) -> "np.ndarray":
+    if calendar == "julian":
+        return np.ones(len(year), dtype=bool)
+    if calendar == "gregorian":
+        return np.zeros(len(year), dtype=bool)
+    reform_year, reform_month, reform_day = GREGORIAN_REFORM
+    return (year * 10000 + month * 100 + day) < (reform_year * 10000 + reform_month * 100 + reform_day)
+
+
+def _decode_block(block: "np.ndarray"):
+    """``YYYY-MM-DD[(T| )HH:MM[:SS]]`` at the start of each row of ``block``.
+
+    Rows with anything else after the date (time zones, fractions, text) are
+    left to the fallback regular expression.
+    """
+
+    # Em uint32, caracteres abaixo de "0" dão a volta e também ficam > 9.
+    digits = block[:, _DIGIT_POSITIONS] - np.uint32(ord("0"))
+    ok = (digits <= 9).all(axis=1)
+    ok &= (block[:, 4] == ord("-")) & (block[:, 7] == ord("-"))
+    digits = digits.astype(np.int32)
+    if block.shape[1] > 10:
+        ok &= _time_tail_ok(block)
+    year = digits[:, :4] @ np.array([1000, 100, 10, 1], dtype=np.int32)
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    return ok, year, month, day
+
+
+def _time_tail_ok(block: "np.ndarray") -> "np.ndarray":
+    """Whether nothing, ``HH:MM`` or ``HH:MM:SS`` follows the date of each row."""
+
+    if block.shape[1] < _BLOCK_WIDTH:
+        # Colunas além do fim do texto valem 0, como o preenchimento do NumPy.
+        block = np.pad(block, ((0, 0), (0, _BLOCK_WIDTH - block.shape[1])))
+    separator = block[:, 10]
+    time_digits = (block[:, _TIME_DIGIT_POSITIONS] - np.uint32(ord("0"))) <= 9
+    hours_minutes = (
+        ((separator == ord("T")) | (separator == ord(" ")))
+        & time_digits[:, :4].all(axis=1)
+        & (block[:, _TIME_COLONS[0]] == ord(":"))
+    )
+    seconds = time_digits[:, 4:].all(axis=1) & (block[:, _TIME_COLONS[1]] == ord(":"))
+    return (separator == 0) | (hours_minutes & ((block[:, 16] == 0) | (seconds & (block[:, 19] == 0))))
+
+
+def _fast_path(text: "np.ndarray", year, month, day, parsed) -> None:
+    """Decode ``[-]YYYY-MM-DD[(T| )HH:MM[:SS]]`` rows of ``text`` in place (NumPy only)."""
+
+    width = text.dtype.itemsize // 4
+    if not len(text) or width < 10:
+        return
+    codes = text.view(np.uint32).reshape(len(text), width)
+    negative = codes[:, 0] == ord("-")
+
+    ok, block_year, block_month, block_day = _decode_block(codes[:, :_BLOCK_WIDTH])
+    ok &= ~negative
+    year[ok], month[ok], day[ok] = block_year[ok], block_month[ok], block_day[ok]
+    parsed |= ok
+
+    rows = np.flatnonzero(negative)
+    if len(rows) and width >= 11:
+        # Anos negativos são raros: só essas linhas são decodificadas de novo, deslocadas.
+        ok, block_year, block_month, block_day = _decode_block(codes[rows, 1:_BLOCK_WIDTH + 1])
+        rows = rows[ok]
+        year[rows], month[rows], day[rows] = -block_year[ok], block_month[ok], block_day[ok]
+        parsed[rows] = True
+
+
+def _fallback(value: str, negative_years: str):
+    match = _FALLBACK_PATTERN.match(value)
+    if match is None:
+        return None
+    year = int(match.group("year"))
+    era = re.sub(r"[\s.]", "", match.group("era") or "").upper()
+    if era:
+        if match.group("sign") == "-" or year == 0:
+            return None
+        if era in _BCE_ERAS:
+            year = 1 - year
+    elif match.group("sign") == "-":
+        year = -year if negative_years == "astronomical" else 1 - year
+    month = int(match.group("month") or 1)
+    day = int(match.group("day") or 1)
+    return year, month, day
+
+
+def parse_dates(values: Any, *, calendar: str = "gregorian", negative_years: str = "astronomical") -> ParsedDates:
+    """Parse a column of date strings; see the module docstring for the formats."""
+
+    if calendar not in CALENDARS:
+        raise ValueError(f"Calendário desconhecido: {calendar!r}. Use um de: {', '.join(CALENDARS)}.")
+    if negative_years not in NEGATIVE_YEAR_CONVENTIONS:
+        raise ValueError(
+            f"Convenção de anos negativos desconhecida: {negative_years!r}. "
+            f"Use um de: {', '.join(NEGATIVE_YEAR_CONVENTIONS)}."
+        )
+
+    # Uma única conversão para texto de largura fixa; ausentes viram "".
+    objects = pd.Series(values, copy=False).to_numpy(dtype=object, na_value="")
+    text = objects.astype(str)
+    size = len(text)
+    missing = text == ""
+    year = np.zeros(size, dtype=np.int64)
+    month = np.zeros(size, dtype=np.int64)
+    day = np.zeros(size, dtype=np.int64)
+    fast = np.zeros(size, dtype=bool)
+    _fast_path(text, year, month, day, fast)
+    if negative_years == "historical":
+        # ``-469`` = 469 a.C. = ano astronômico -468.
+        year = np.where(fast & (year < 0), year + 1, year)
+
+    fallback = np.zeros(size, dtype=bool)
+    for row in np.flatnonzero(~fast & ~missing):
+        components = _fallback(text[row], negative_years)
+        if components is not None:
+            year[row], month[row], day[row] = components
+            fallback[row] = True
+
+    julian = _uses_julian(year, month, day, calendar)
+    parsed = fast | fallback
+    valid = parsed & (month >= 1) & (month <= 12) & (day >= 1)
+    valid &= day <= _days_in_month(year, month, julian)
+    # Limite da fórmula do número do dia juliano (4801 a.C.).
+    valid &= year > -4800
+    # Os 10 dias suprimidos na reforma (5 a 14/10/1582) não existem em ``auto``.
+    if calendar == "auto":
+        valid &= ~((year == 1582) & (month == 10) & (day > 4) & (day < 15))
+
+    jdn = np.where(valid, julian_day_number(year, month, day, julian), 0)
+    path = np.full(size, PATHS.index(PATH_INVALID), dtype=np.uint8)
+    path[missing] = PATHS.index(PATH_MISSING)
+    path[fast & valid] = PATHS.index(PATH_FAST)
+    path[fallback & valid] = PATHS.index(PATH_FALLBACK)
+    counts = dict(zip(PATHS, np.bincount(path, minlength=len(PATHS)).tolist()))
+    return ParsedDates(year, month, day, jdn, valid, path, calendar, counts)
+
+
+__all__ = [
+    "CALENDARS",
+    "GREGORIAN_REFORM",
+    "NEGATIVE_YEAR_CONVENTIONS",
+    "PATHS",
+    "ParsedDates",
+    "gregorian_date",
+    "julian_day_number",
+    "parse_dates",
+]
@@ -0,0 +1,313 @@
+"""Incremental updates of the served random forest as new people arrive.
+
+A full retrain in ``develop_ml_model.py`` rebuilds every tree from the whole
+prepared dataset.  For routine refreshes this module instead *warm-starts* the
+existing forest: a handful of extra trees (``ExtraTreesClassifier``, cheap to
+grow) are trained on the new rows only and appended to ``estimators_``.  The
+leaf values of the new trees are re-indexed to the classes of the existing
+forest, so ``predict_proba`` keeps one column per known occupation.  With
+``max_trees`` the oldest trees are retired, which keeps the artifact size
+bounded and lets the model follow recent data.
+
+Before updating, :func:`check_drift` compares the new batch with the training
+profile saved by the last full retrain (``model_training_profile.json``) and
+decides whether an incremental update is still appropriate.  A full retrain is
+required when:
+
+- the batch contains occupations the forest has never seen;
+- a significant share of rows activates one-hot columns unknown to the model;
+- the accuracy of the current model on the new rows dropped too much;
+- the occupation distribution shifted (population stability index);
+- the rows added incrementally since the last retrain exceed a share of the
+  original training set.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+try:  # pragma: no cover - dependências opcionais
+    import numpy as np
+    import pandas as pd
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+    from sklearn.tree._tree import Tree
+except ImportError:  # pragma: no cover - dependências opcionais
+    np = None
+    pd = None
+    ExtraTreesClassifier = None
+    RandomForestClassifier = None
+    accuracy_score = None
+    Tree = None
+
+
+logger = logging.getLogger(__name__)
+
+PROFILE_VERSION = 1
+
+
+@dataclass
+class DriftThresholds:
+    """Limits above which an incremental update is refused."""
+
+    max_unknown_feature_rows: float = 0.05
+    max_accuracy_drop: float = 0.10
+    max_label_psi: float = 0.25
+    max_incremental_share: float = 0.5
+
+
+@dataclass
+class DriftReport:
+    needs_full_retrain: bool
+    reasons: List[str] = field(default_factory=list)
+    metrics: Dict[str, float] = field(default_factory=dict)
+
+
+# ----------------------------------------------------------------------
+# Training profile
+# ----------------------------------------------------------------------
+def build_training_profile(y_train, accuracy: Optional[float]) -> dict:
+    """Summarise a full training run for later drift checks."""
+
+    counts = pd.Series(np.asarray(y_train)).value_counts(normalize=True).sort_index()
+    return {
+        "version": PROFILE_VERSION,
+        "trained_at": datetime.now(timezone.utc).isoformat(),
+        "train_rows": int(len(y_train)),
+        "accuracy": None if accuracy is None else float(accuracy),
+        "label_distribution": {str(int(label)): float(share) for label, share in counts.items()},
+        "incremental_rows": 0,
+        "updates": [],
+    }
+
+
+def save_training_profile(profile: dict, path: Path) -> None:
+    path.write_text(json.dumps(profile, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+
+def load_training_profile(path: Path) -> Optional[dict]:
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError as exc:
+        logger.warning("Perfil de treinamento inválido em %s: %s", path, exc)
+        return None
+
+
+# ----------------------------------------------------------------------
+# Batch alignment and drift
+# ----------------------------------------------------------------------
+def encode_labels(occupations: Sequence[str], occupation_labels: Sequence[str]):
+    """Map occupation names to the indices of ``occupation_labels`` (-1 when unknown)."""
+
+    index = {label: position for position, label in enumerate(occupation_labels)}
+    return np.array([index.get(occupation, -1) for occupation in occupations], dtype=np.int64)
+
+
+def align_features(df_new: "pd.DataFrame", feature_names: Sequence[str]):
+    """Reindex the new batch to the model columns.
+
+    Returns the aligned matrix and the share of rows that activate columns the
+    model does not know (new one-hot categories, which are dropped).
+    """
+
+    extra = [col for col in df_new.columns if col not in set(feature_names)]
+    unknown_rows = 0.0
+    if extra and len(df_new):
+        unknown_rows = float((df_new[extra].fillna(0) != 0).any(axis=1).mean())
+    aligned = df_new.reindex(columns=list(feature_names), fill_value=0).fillna(0)
+    return aligned, unknown_rows, extra
+
+
+def _psi(expected: Dict[str, float], actual: Dict[str, float], floor: float = 1e-4) -> float:
+    labels = set(expected) | set(actual)
+    total = 0.0
+    for label in labels:
+        e = max(expected.get(label, 0.0), floor)
+        a = max(actual.get(label, 0.0), floor)
+        total += (a - e) * np.log(a / e)
+    return float(total)
+
+
+def check_drift(model, profile: Optional[dict], X_new, y_new, unknown_feature_rows: float,
+                thresholds: DriftThresholds, occupations: Optional[Sequence[str]] = None) -> DriftReport:
+    """Decide whether the new batch can be absorbed incrementally.
+
+    ``occupations`` (the raw names of ``y_new``) is only used to name unseen
+    occupations in the report.
+    """
+
+    reasons: List[str] = []
+    metrics: Dict[str, float] = {"unknown_feature_rows": unknown_feature_rows}
+
+    if profile is None:
+        reasons.append("perfil de treinamento ausente (rode um treino completo primeiro)")
+
+    unseen_mask = ~np.isin(y_new, model.classes_)
+    unseen = sorted(set(np.asarray(occupations if occupations is not None else y_new)[unseen_mask].tolist()))
+    metrics["unseen_classes"] = float(len(unseen))
+    if unseen:
+        reasons.append(f"ocupações inéditas no lote: {unseen}")
+
+    if unknown_feature_rows > thresholds.max_unknown_feature_rows:
+        reasons.append(
+            f"{unknown_feature_rows:.1%} das linhas usam colunas desconhecidas pelo modelo"
+        )
+
+    known = np.isin(y_new, model.classes_)
+    if known.any():
+        batch_accuracy = float(accuracy_score(np.asarray(y_new)[known], model.predict(X_new[known])))
+        metrics["batch_accuracy"] = batch_accuracy
+        if profile and profile.get("accuracy") is not None:
+            drop = profile["accuracy"] - batch_accuracy
+            metrics["accuracy_drop"] = drop
+            if drop > thresholds.max_accuracy_drop:
+                reasons.append(f"acurácia caiu {drop:.3f} no lote novo")
+
+    if profile:
+        batch_distribution = (
+            pd.Series(np.asarray(y_new)).value_counts(normalize=True).rename(lambda label: str(int(label)))
+        )
+        psi = _psi(profile.get("label_distribution", {}), batch_distribution.to_dict())
+        metrics["label_psi"] = psi
+        if psi > thresholds.max_label_psi:
+            reasons.append(f"distribuição de ocupações mudou (PSI={psi:.3f})")
+
+        train_rows = max(int(profile.get("train_rows", 0)), 1)
+        share = (int(profile.get("incremental_rows", 0)) + len(y_new)) / train_rows
+        metrics["incremental_share"] = share
+        if share > thresholds.max_incremental_share:
+            reasons.append(f"linhas incrementais acumuladas = {share:.0%} do treino original")
+
+    return DriftReport(needs_full_retrain=bool(reasons), reasons=reasons, metrics=metrics)
+
+
+# ----------------------------------------------------------------------
+# Warm-start update
+# ----------------------------------------------------------------------
+def _reindex_tree_classes(estimator, positions, n_classes: int) -> None:
+    """Spread the leaf values of ``estimator`` over ``n_classes`` columns.
+
+    Trees inside a fitted forest store encoded classes ``0..k-1``; column
+    ``j`` of the new tree goes to column ``positions[j]`` of the forest.
+    """
+
+    state = estimator.tree_.__getstate__()
+    values = np.zeros((state["values"].shape[0], 1, n_classes), dtype=state["values"].dtype)
+    values[:, :, positions] = state["values"]
+    state["values"] = values
+
+    tree = Tree(estimator.n_features_in_, np.array([n_classes], dtype=np.intp), 1)
+    tree.__setstate__(state)
+    estimator.tree_ = tree
+    estimator.classes_ = np.arange(n_classes, dtype=np.float64)
+    estimator.n_classes_ = n_classes
+
+
+def warm_start_update(model, X_new, y_new, *, n_new_trees: int = 20,
+                      max_trees: Optional[int] = None, random_state: int = 42) -> int:
+    """Append ``n_new_trees`` extra trees trained on the new rows to ``model``.
+
+    Returns how many old trees were retired to respect ``max_trees``.  Labels
+    unknown to ``model`` raise ``ValueError``: they need a full retrain.
+    """
+
+    if not isinstance(model, RandomForestClassifier):
+        raise TypeError("A atualização incremental só suporta RandomForestClassifier.")
+    unseen = np.setdiff1d(np.unique(y_new), model.classes_)
+    if len(unseen):
+        raise ValueError(f"Classes inéditas exigem um treino completo: {unseen.tolist()}")
+
+    growth = ExtraTreesClassifier(
+        n_estimators=n_new_trees,
+        max_depth=model.max_depth,
+        min_samples_leaf=model.min_samples_leaf,
+        class_weight=model.class_weight,
+        random_state=random_state,
+        n_jobs=-1,
+    )
+    growth.fit(X_new, y_new)
+
+    # Posição de cada classe do lote entre as classes do modelo (o lote pode não ter todas).
+    positions = np.searchsorted(model.classes_, growth.classes_)
+    for estimator in growth.estimators_:
+        _reindex_tree_classes(estimator, positions, len(model.classes_))
+        model.estimators_.append(estimator)
+
+    retired = 0
+    if max_trees is not None and len(model.estimators_) > max_trees:
+        retired = len(model.estimators_) - max_trees
+        del model.estimators_[:retired]
+
+    model.n_estimators = len(model.estimators_)
+    return retired
+
+
+def update_model(model, profile: Optional[dict], df_new: "pd.DataFrame", occupation_labels: Sequence[str],
+                 *, n_new_trees: int = 20, max_trees: Optional[int] = None,
+                 thresholds: Optional[DriftThresholds] = None):
+    """Run the drift check and, when allowed, warm-start ``model`` with ``df_new``.
+
+    ``df_new`` is a prepared batch (same layout as ``prepared_ml_data.csv``).
+    Labels are re-encoded from the ``occupation`` column with the saved
+    mapping, because ``prepare_ml_data.py`` refits its encoder on every run.
+    Returns ``(drift_report, updated_profile)``; the model is only modified
+    when ``drift_report.needs_full_retrain`` is ``False``.
+    """
+
+    thresholds = thresholds or DriftThresholds()
+    occupations = df_new["occupation"].astype(str).tolist()
+    y_new = encode_labels(occupations, occupation_labels)
+    features = df_new.drop(columns=[c for c in ("name", "occupation", "occupation_encoded") if c in df_new])
+    X_new, unknown_rows, extra = align_features(features, model.feature_names_in_)
+    if extra:
+        logger.info("Colunas novas ignoradas pelo modelo atual: %s", extra)
+
+    report = check_drift(model, profile, X_new, y_new, unknown_rows, thresholds, occupations)
+    if report.needs_full_retrain:
+        return report, profile
+
+    start = time.perf_counter()
+    retired = warm_start_update(model, X_new, y_new, n_new_trees=n_new_trees, max_trees=max_trees)
+    elapsed = time.perf_counter() - start
+
+    profile = dict(profile)
+    profile["incremental_rows"] = int(profile.get("incremental_rows", 0)) + len(y_new)
+    profile["updates"] = list(profile.get("updates", [])) + [
+        {
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+            "rows": int(len(y_new)),
+            "new_trees": n_new_trees,
+            "retired_trees": retired,
+            "seconds": round(elapsed, 3),
+            **{key: round(value, 4) for key, value in report.metrics.items()},
+        }
+    ]
+    logger.info(
+        "Modelo atualizado com %s linhas em %.2fs (%s árvores novas, %s aposentadas, total %s).",
+        len(y_new),
+        elapsed,
+        n_new_trees,
+        retired,
+        model.n_estimators,
+    )
+    return report, profile
+
+
+__all__ = [
+    "DriftReport",
+    "DriftThresholds",
+    "build_training_profile",
+    "check_drift",
+    "load_training_profile",
+    "save_training_profile",
+    "update_model",
+    "warm_start_update",
+]
@@ -0,0 +1,189 @@
+"""Compaction of the random forest artifact served by the API.
+
+An unbounded ``RandomForestClassifier`` stored with ``joblib.dump`` is large,
+slow to load in every API worker and slow to ship in ``offline_bundle.zip``.
+The compaction step implemented here:
+
+1. refits the forest with depth/leaf limits and optional cost-complexity
+   pruning (``ccp_alpha``);
+2. quantizes split thresholds and leaf values to float32 precision.  The
+   arrays stay ``float64`` because scikit-learn's ``Tree`` requires it, but
+   the low mantissa bits become zero, which the compressors squeeze well.
+   Thresholds are rounded *down* to the nearest float32, so every sample (the
+   trees compare float32 inputs) still takes the same branch;
+3. serializes the result either compressed (``zlib``/``lzma``) or
+   uncompressed (``mmap``), the latter loadable with
+   ``joblib.load(path, mmap_mode="r")``.
+
+:func:`compact_model` returns the compacted model together with a report of
+the size, load-time and accuracy deltas against the uncompacted model.
+"""
+
+from __future__ import annotations
+
+import logging
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Tuple
+
+try:  # pragma: no cover - dependências opcionais
+    import joblib
+    import numpy as np
+    import pandas as pd
+    from sklearn.base import clone
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.metrics import accuracy_score
+except ImportError:  # pragma: no cover - dependências opcionais
+    joblib = None
+    np = None
+    pd = None
+    clone = None
+    RandomForestClassifier = None
+    accuracy_score = None
+
+
+logger = logging.getLogger(__name__)
+
+# Formatos de serialização suportados: (compressão do joblib, aceita mmap)
+SERIALIZATION_FORMATS = {
+    "mmap": (0, True),
+    "zlib": (("zlib", 3), False),
+    "lzma": (("lzma", 6), False),
+}
+
+
+@dataclass
+class CompactionOptions:
+    """Limits applied when refitting the forest and how to serialize it."""
+
+    max_depth: Optional[int] = 20
+    min_samples_leaf: int = 2
+    max_leaf_nodes: Optional[int] = None
+    ccp_alpha: float = 0.0
+    float32: bool = True
+    serialization: str = "zlib"
+
+
+def _floor_float32(values):
+    """Round ``values`` down to the nearest float32, returned as float64."""
+
+    rounded = values.astype(np.float32)
+    too_high = rounded.astype(np.float64) > values
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded.astype(np.float64)
+
+
+def quantize_forest(forest) -> None:
+    """Quantize thresholds and leaf values of every tree of ``forest`` in place."""
+
+    for estimator in forest.estimators_:
+        state = estimator.tree_.__getstate__()
+        nodes = state["nodes"].copy()
+        leaves = nodes["left_child"] == -1
+        nodes["threshold"][~leaves] = _floor_float32(nodes["threshold"][~leaves])
+        state["nodes"] = nodes
+        state["values"] = state["values"].astype(np.float32).astype(np.float64)
+        estimator.tree_.__setstate__(state)
+
+
+def save_model(model, path: Path, serialization: str = "zlib") -> Path:
+    """Serialize ``model`` to ``path`` using one of :data:`SERIALIZATION_FORMATS`."""
+
+    if serialization not in SERIALIZATION_FORMATS:
+        raise ValueError(
+            f"Formato de serialização desconhecido: {serialization}. Opções: {list(SERIALIZATION_FORMATS)}"
+        )
+    compress, _ = SERIALIZATION_FORMATS[serialization]
+    joblib.dump(model, path, compress=compress)
+    return path
+
+
+def load_model(path: Path, serialization: str = "zlib"):
+    """Load a model saved by :func:`save_model` (memory-mapped when possible)."""
+
+    _, mmap_capable = SERIALIZATION_FORMATS.get(serialization, (None, False))
+    return joblib.load(path, mmap_mode="r" if mmap_capable else None)
+
+
+def _node_count(model) -> int:
+    return int(sum(estimator.tree_.node_count for estimator in model.estimators_))
+
+
+def _measure(model, X_test, y_test, path: Path, serialization: str) -> dict:
+    save_model(model, path, serialization)
+    load_times = []
+    for _ in range(3):
+        start = time.perf_counter()
+        loaded = load_model(path, serialization)
+        load_times.append(time.perf_counter() - start)
+    return {
+        "serialization": serialization,
+        "disk_bytes": path.stat().st_size,
+        "load_ms": float(np.median(load_times) * 1000),
+        "accuracy": float(accuracy_score(y_test, loaded.predict(X_test))),
+        "nodes": _node_count(loaded),
+    }
+
+
+def compact_model(model, X_train, y_train, X_test, y_test, options: CompactionOptions) -> Tuple[object, "pd.DataFrame"]:
+    """Build the compacted version of ``model`` and compare both artifacts.
+
+    ``model`` is the trained, uncompacted forest; the compacted forest is
+    refitted from the same hyperparameters plus the limits in ``options``.
+    The report has one row per artifact and a ``delta`` row (compacted minus
+    baseline; ``disk_ratio`` is baseline size / compacted size).
+    """
+
+    if not isinstance(model, RandomForestClassifier):
+        raise TypeError("A compactação só suporta RandomForestClassifier.")
+
+    compacted = clone(model).set_params(
+        max_depth=options.max_depth,
+        min_samples_leaf=options.min_samples_leaf,
+        max_leaf_nodes=options.max_leaf_nodes,
+        ccp_alpha=options.ccp_alpha,
+    )
+    logger.info(
+        "Retreinando floresta compacta (max_depth=%s, min_samples_leaf=%s, max_leaf_nodes=%s, ccp_alpha=%s)...",
+        options.max_depth,
+        options.min_samples_leaf,
+        options.max_leaf_nodes,
+        options.ccp_alpha,
+    )
+    compacted.fit(X_train, y_train)
+    if options.float32:
+        quantize_forest(compacted)
+
+    with tempfile.TemporaryDirectory(prefix="astro_compact_") as tmp_dir:
+        baseline = _measure(model, X_test, y_test, Path(tmp_dir) / "baseline.pkl", "mmap")
+        result = _measure(compacted, X_test, y_test, Path(tmp_dir) / "compact.pkl", options.serialization)
+
+    report = pd.DataFrame(
+        [
+            {"artifact": "original", **baseline},
+            {"artifact": "compactado", **result},
+        ]
+    )
+    delta = {
+        "artifact": "delta",
+        "serialization": "",
+        "disk_bytes": result["disk_bytes"] - baseline["disk_bytes"],
+        "load_ms": result["load_ms"] - baseline["load_ms"],
+        "accuracy": result["accuracy"] - baseline["accuracy"],
+        "nodes": result["nodes"] - baseline["nodes"],
+    }
+    report = pd.concat([report, pd.DataFrame([delta])], ignore_index=True)
+    report["disk_ratio"] = [1.0, baseline["disk_bytes"] / max(result["disk_bytes"], 1), None]
+    return compacted, report
+
+
+__all__ = [
+    "CompactionOptions",
+    "SERIALIZATION_FORMATS",
+    "compact_model",
+    "load_model",
+    "quantize_forest",
+    "save_model",
+]
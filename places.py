@@ -0,0 +1,249 @@
+"""Normalized birthplace table with integer IDs and a spatial grid index.
+
+The same ``bplace_name``/``bplace_lat``/``bplace_lon`` triple repeats across
+thousands of Pantheon rows.  :class:`PlaceRegistry` gives every distinct triple
+a stable integer ``place_id`` while the cleaned data is written (chunk by chunk
+in ``--stream`` mode, so IDs stay consistent across chunks), and
+:class:`PlaceTable` holds one row per place so location-dependent work
+(timezone, geocoding) is done once per place and joined back by ID.
+
+:class:`GridIndex` buckets the places in ``cell_deg`` x ``cell_deg`` cells of
+latitude/longitude (sorted cell IDs plus ``searchsorted``, NumPy only):
+:meth:`PlaceTable.within` returns the places inside a great-circle radius and
+:meth:`PlaceTable.nearest` the closest ones, both exact (haversine distances
+on the candidate cells only).
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+try:  # pragma: no cover - dependências opcionais
+    import numpy as np
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependências opcionais
+    np = None
+    pd = None
+
+
+PLACE_COLUMNS = ["bplace_name", "bplace_lat", "bplace_lon"]
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180.0
+DEFAULT_CELL_DEG = 1.0
+
+
+def haversine_km(lat1, lon1, lat2, lon2) -> "np.ndarray":
+    """Great-circle distance in km (vectorized over any of the arguments)."""
+
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(value, dtype=float)) for value in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+@dataclass
+class GridIndex:
+    """Places bucketed by latitude/longitude cell; ``order`` lists positions by cell."""
+
+    lat: "np.ndarray"
+    lon: "np.ndarray"
+    cell_deg: float = DEFAULT_CELL_DEG
+    order: "np.ndarray" = field(init=False, repr=False)
+    cells: "np.ndarray" = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if self.cell_deg <= 0:
+            raise ValueError("O tamanho da célula da grade deve ser maior que zero.")
+        self.rows = math.ceil(180.0 / self.cell_deg)
+        self.cols = math.ceil(360.0 / self.cell_deg)
+        cells = self._cell(self.lat, self.lon)
+        self.order = np.argsort(cells, kind="stable")
+        self.cells = cells[self.order]
+
+    def _row(self, lat) -> "np.ndarray":
+        return np.clip(np.floor((np.asarray(lat) + 90.0) / self.cell_deg).astype(np.int64), 0, self.rows - 1)
+
+    def _col(self, lon) -> "np.ndarray":
+        # A longitude é reduzida antes da divisão: se 360 não for múltiplo de
+        # ``cell_deg``, a última coluna é mais estreita e ``col % cols`` erraria.
+        return np.floor(np.mod(np.asarray(lon) + 180.0, 360.0) / self.cell_deg).astype(np.int64)
+
+    def _cell(self, lat, lon) -> "np.ndarray":
+        return self._row(lat) * self.cols + self._col(lon)
+
+    def candidates(self, lat: float, lon: float, radius_km: float) -> "np.ndarray":
+        """Positions of the places in the cells that can hold points within ``radius_km``."""
+
+        radius_deg = radius_km / KM_PER_DEGREE
+        row_lo, row_hi = self._row(lat - radius_deg), self._row(lat + radius_deg)
+        rows = np.arange(row_lo, row_hi + 1)
+        widest = max(abs(lat - radius_deg), abs(lat + radius_deg))
+        if widest >= 90.0:
+            cols = np.arange(self.cols)
+        else:
+            # Os meridianos se aproximam: perto dos polos o raio cobre mais longitudes.
+            span = radius_deg / math.cos(math.radians(widest))
+            first, last = int(self._col(lon - span)), int(self._col(lon + span))
+            if 2 * span >= 360.0:
+                cols = np.arange(self.cols)
+            elif first <= last:
+                cols = np.arange(first, last + 1)
+            else:
+                # A faixa cruza o antimeridiano.
+                cols = np.concatenate([np.arange(first, self.cols), np.arange(0, last + 1)])
+        wanted = (rows[:, None] * self.cols + cols[None, :]).ravel()
+        starts = np.searchsorted(self.cells, wanted, side="left")
+        stops = np.searchsorted(self.cells, wanted, side="right")
+        hits = stops > starts
+        if not hits.any():
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([self.order[start:stop] for start, stop in zip(starts[hits], stops[hits])])
+
+    def within(self, lat: float, lon: float, radius_km: float) -> Tuple["np.ndarray", "np.ndarray"]:
+        """Positions and distances of the places within ``radius_km``, nearest first."""
+
+        positions = self.candidates(lat, lon, radius_km)
+        distances = haversine_km(lat, lon, self.lat[positions], self.lon[positions])
+        keep = distances <= radius_km
+        positions, distances = positions[keep], distances[keep]
+        ranking = np.argsort(distances, kind="stable")
+        return positions[ranking], distances[ranking]
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> Tuple["np.ndarray", "np.ndarray"]:
+        """The ``k`` closest places: the search radius doubles until ``k`` are found."""
+
+        k = min(k, len(self.lat))
+        radius_km = self.cell_deg * KM_PER_DEGREE
+        while True:
+            positions, distances = self.within(lat, lon, radius_km)
+            if len(positions) >= k or radius_km >= math.pi * EARTH_RADIUS_KM:
+                return positions[:k], distances[:k]
+            radius_km *= 2
+
+
+@dataclass
+class PlaceTable:
+    """One row per distinct birthplace; ``place_id`` is the position in the table."""
+
+    name: "np.ndarray"
+    lat: "np.ndarray"
+    lon: "np.ndarray"
+    rows: "np.ndarray"
+    cell_deg: float = DEFAULT_CELL_DEG
+    _index: Optional[GridIndex] = field(default=None, init=False, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.name)
+
+    @property
+    def index(self) -> GridIndex:
+        if self._index is None:
+            self._index = GridIndex(self.lat, self.lon, self.cell_deg)
+        return self._index
+
+    def to_frame(self, positions: Optional["np.ndarray"] = None) -> "pd.DataFrame":
+        """The table (or only ``positions``) as a ``DataFrame``."""
+
+        if positions is None:
+            positions = np.arange(len(self))
+        return pd.DataFrame(
+            {
+                "place_id": positions,
+                "bplace_name": self.name[positions],
+                "bplace_lat": self.lat[positions],
+                "bplace_lon": self.lon[positions],
+                "rows": self.rows[positions],
+            }
+        )
+
+    def save(self, path: Path) -> None:
+        self.to_frame().to_csv(path, index=False)
+
+    @classmethod
+    def from_frame(cls, df: "pd.DataFrame", cell_deg: float = DEFAULT_CELL_DEG) -> "PlaceTable":
+        df = df.sort_values("place_id")
+        if not (df["place_id"].to_numpy() == np.arange(len(df))).all():
+            raise ValueError("A tabela de lugares deve ter place_id contínuos a partir de 0.")
+        rows = df["rows"].to_numpy(dtype=np.int64) if "rows" in df.columns else np.zeros(len(df), dtype=np.int64)
+        return cls(
+            df["bplace_name"].to_numpy(dtype=object),
+            df["bplace_lat"].to_numpy(dtype=float),
+            df["bplace_lon"].to_numpy(dtype=float),
+            rows,
+            cell_deg,
+        )
+
+    @classmethod
+    def load(cls, path: Path, cell_deg: float = DEFAULT_CELL_DEG) -> "PlaceTable":
+        return cls.from_frame(pd.read_csv(path, dtype={"bplace_name": str}), cell_deg)
+
+    def within(self, lat: float, lon: float, radius_km: float) -> "pd.DataFrame":
+        """Places within ``radius_km`` of the point, nearest first, with ``distance_km``."""
+
+        positions, distances = self.index.within(lat, lon, radius_km)
+        return self.to_frame(positions).assign(distance_km=distances)
+
+    def nearest(self, lat: float, lon: float, k: int = 1) -> "pd.DataFrame":
+        """The ``k`` places closest to the point, with ``distance_km``."""
+
+        positions, distances = self.index.nearest(lat, lon, k)
+        return self.to_frame(positions).assign(distance_km=distances)
+
+
+class PlaceRegistry:
+    """Assigns stable integer IDs to birthplace triples across chunks."""
+
+    def __init__(self) -> None:
+        self._ids: Dict[Tuple[str, float, float], int] = {}
+        self._names: List[str] = []
+        self._lats: List[float] = []
+        self._lons: List[float] = []
+        self._rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def assign(self, df: "pd.DataFrame") -> "np.ndarray":
+        """``place_id`` of every row of ``df`` (new triples get the next IDs)."""
+
+        # Só os trios distintos do bloco passam pelo dicionário.
+        codes = df.groupby(PLACE_COLUMNS, sort=False, dropna=False).ngroup().to_numpy()
+        first = np.unique(codes, return_index=True)[1]
+        uniques = zip(*(df[column].to_numpy()[first].tolist() for column in PLACE_COLUMNS))
+        ids = np.empty(len(first), dtype=np.int64)
+        for position, key in enumerate(uniques):
+            # NaN != NaN: ausentes viram None para o trio ter o mesmo ID em todo bloco.
+            key = tuple(None if pd.isna(value) else value for value in key)
+            place_id = self._ids.get(key)
+            if place_id is None:
+                place_id = self._ids[key] = len(self._names)
+                self._names.append(key[0])
+                self._lats.append(key[1])
+                self._lons.append(key[2])
+                self._rows.append(0)
+            ids[position] = place_id
+        for place_id, count in zip(ids, np.bincount(codes, minlength=len(first))):
+            self._rows[place_id] += int(count)
+        return ids[codes]
+
+    def table(self, cell_deg: float = DEFAULT_CELL_DEG) -> PlaceTable:
+        return PlaceTable(
+            np.array(self._names, dtype=object),
+            np.array(self._lats, dtype=float),
+            np.array(self._lons, dtype=float),
+            np.array(self._rows, dtype=np.int64),
+            cell_deg,
+        )
+
+
+__all__ = [
+    "DEFAULT_CELL_DEG",
+    "EARTH_RADIUS_KM",
+    "GridIndex",
+    "PLACE_COLUMNS",
+    "PlaceRegistry",
+    "PlaceTable",
+    "haversine_km",
+]
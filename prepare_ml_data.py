@@ -5,6 +5,7 @@ from pathlib import Path
 import shutil
 
 from astro_database_client import AstroDatabaseClient, AstroDatabaseError
+import feature_registry
 
 try:  # pragma: no cover - dependências opcionais
     import pandas as pd
@@ -62,43 +63,36 @@ def prepare_data(df):
     if OneHotEncoder is None:
         raise RuntimeError("scikit-learn não está disponível para preparar os dados")
 
+    # As listas de colunas vêm do registro declarativo (feature_registry.py); colunas
+    # não registradas (ex.: textos livres de profissões/desafios) são descartadas.
+    ignored_cols = feature_registry.unregistered(df.columns)
+    if ignored_cols:
+        logging.info("Ignorando %s colunas não registradas: %s", len(ignored_cols), ignored_cols)
+        df = df.drop(columns=ignored_cols)
+
     # Preencher valores ausentes para colunas categóricas com 'Unknown'
-    categorical_cols = [
-        col
-        for col in df.columns
-        if (
-            not col.endswith('_count')
-            and (
-                'sign' in col
-                or 'element' in col
-                or 'modality' in col
-                or 'dispositor' in col
-                or 'temperament' in col
-            )
-        )
-    ]
+    categorical_cols = feature_registry.present(feature_registry.ONE_HOT_FEATURES, df.columns)
     for col in categorical_cols:
-        df[col] = df[col].fillna('Unknown')
-
-    # Preencher valores ausentes para colunas numéricas (casas) com 0 ou -1 (indicando desconhecido)
-    numeric_cols = [
-        col
-        for col in df.columns
-        if 'house' in col or 'degree' in col or col.endswith('_count')
-    ]
+        df[col] = df[col].fillna(feature_registry.UNKNOWN)
+
+    # Preencher valores ausentes para colunas numéricas com o valor declarado no registro
+    # (0 para casas e contagens, -1 para graus desconhecidos)
+    numeric_cols = feature_registry.present(feature_registry.FILL_FEATURES, df.columns)
     for col in numeric_cols:
-        fill_value = -1 if col.endswith('_degree') else 0
-        df[col] = df[col].fillna(fill_value)
+        df[col] = df[col].fillna(feature_registry.FEATURES_BY_NAME[col].fill_value)
 
-    # Processar a coluna de aspectos
-    # Para simplificar, vamos extrair o número de aspectos para cada objeto celeste
-    # Uma abordagem mais complexa envolveria one-hot encoding para cada tipo de aspecto
-    aspect_cols = [col for col in df.columns if '_aspects' in col]
+    # Processar a coluna de aspectos: o registro declara a contagem de aspectos de cada
+    # objeto celeste, salva em '<planeta>_aspects_count'
+    aspect_cols = feature_registry.present(feature_registry.ASPECT_COUNT_FEATURES, df.columns)
     for col in aspect_cols:
-        df[col] = df[col].apply(lambda x: len(json.loads(x)) if pd.notna(x) and x != 'None' else 0)
+        spec = feature_registry.FEATURES_BY_NAME[col]
+        df[spec.prepared_name] = df[col].apply(
+            lambda x: len(json.loads(x)) if pd.notna(x) and x != 'None' else spec.fill_value
+        )
 
-    # Codificação One-Hot para variáveis categóricas
-    encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False)
+    # Codificação One-Hot para variáveis categóricas (uint8 para que o CSV traga 0/1 inteiros,
+    # compatíveis com os tipos compactos de prepared_dataset.py)
+    encoder = OneHotEncoder(handle_unknown='ignore', sparse_output=False, dtype='uint8')
     encoded_features = encoder.fit_transform(df[categorical_cols])
     encoded_feature_names = encoder.get_feature_names_out(categorical_cols)
     encoded_df = pd.DataFrame(encoded_features, columns=encoded_feature_names, index=df.index)
@@ -107,9 +101,8 @@ def prepare_data(df):
     df = df.drop(columns=categorical_cols)
     df = pd.concat([df, encoded_df], axis=1)
 
-    # Remover colunas de aspectos originais, já que foram processadas
-    # Apenas remover se ainda existirem e não forem parte das colunas codificadas (o que não deveriam ser)
-    df = df.drop(columns=[col for col in aspect_cols if col in df.columns])
+    # Remover colunas de aspectos originais, já substituídas pelas contagens
+    df = df.drop(columns=aspect_cols)
 
     return df
 
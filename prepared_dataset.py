@@ -0,0 +1,244 @@
+"""Shared loader for ``prepared_ml_data.csv`` using compact dtypes.
+
+``pandas.read_csv`` infers ``int64``/``float64`` for every numeric column even
+though the prepared dataset only stores houses (0-12), degrees (0-360), small
+counts and one-hot flags.  This module declares a compact dtype for each column
+family and applies it while reading, so the training script, the analysis
+script and the API keep roughly one eighth of the memory they used before.
+
+Run ``python prepared_dataset.py [arquivo.csv]`` to print the per-column memory
+report for a prepared file.
+"""
+
+from __future__ import annotations
+
+import logging
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, Optional
+
+from feature_registry import PREPARED_DTYPES
+
+try:  # pragma: no cover - dependência opcional
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependência opcional
+    pd = None
+
+if TYPE_CHECKING:  # pragma: no cover - type hints
+    from pandas import DataFrame
+
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).resolve().parent
+DEFAULT_PREPARED_FILE = BASE_DIR / "prepared_ml_data.csv"
+
+METADATA_COLUMNS = ["name", "occupation", "occupation_encoded"]
+
+# Tipos declarados para colunas conhecidas pelo nome exato.
+COMPACT_DTYPES_BY_NAME: Dict[str, str] = {
+    "name": "object",
+    "occupation": "category",
+    "occupation_encoded": "int16",
+}
+
+# Colunas numéricas registradas usam o dtype declarado em feature_registry.py.
+# Para colunas fora do registro (arquivos antigos) valem os sufixos abaixo,
+# avaliados em ordem: casas cabem em int8, graus em float32 e contagens (no
+# máximo dez planetas) em uint8.
+COMPACT_DTYPES_BY_SUFFIX = (
+    ("_house", "int8"),
+    ("_degree", "float32"),
+    ("_count", "uint8"),
+)
+
+# Demais colunas do conjunto preparado são indicadores one-hot (0/1).
+ONE_HOT_DTYPE = "uint8"
+
+# ``read_csv`` sem tipos declarados usa 8 bytes por célula numérica.
+_DEFAULT_NUMERIC_ITEMSIZE = 8
+
+
+def compact_dtype_for(column: str) -> str:
+    """Return the declared compact dtype for ``column``."""
+
+    if column in COMPACT_DTYPES_BY_NAME:
+        return COMPACT_DTYPES_BY_NAME[column]
+    if column in PREPARED_DTYPES:
+        return PREPARED_DTYPES[column]
+    for suffix, dtype in COMPACT_DTYPES_BY_SUFFIX:
+        if column.endswith(suffix):
+            return dtype
+    return ONE_HOT_DTYPE
+
+
+def compact_dtype_map(columns: Iterable[str]) -> Dict[str, str]:
+    """Build the ``{coluna: dtype}`` mapping used by :func:`read_prepared_csv`."""
+
+    return {column: compact_dtype_for(column) for column in columns}
+
+
+def apply_compact_dtypes(df: "DataFrame") -> "DataFrame":
+    """Cast an in-memory prepared dataframe (e.g. from the API) to compact dtypes.
+
+    Columns whose values do not fit the declared dtype (nulls in integer
+    columns, out-of-range values) keep their original dtype and are logged.
+    """
+
+    if pd is None:
+        raise RuntimeError("Pandas é obrigatório para converter os dados preparados.")
+
+    converted = {}
+    for column, dtype in compact_dtype_map(df.columns).items():
+        if str(df[column].dtype) == dtype:
+            continue
+        try:
+            series = df[column]
+            if dtype.startswith(("int", "uint")):
+                if series.isna().any():
+                    raise ValueError("valores nulos")
+                target = series.astype(dtype)
+                if not (target == series).all():
+                    raise ValueError("valores fora do intervalo")
+            else:
+                target = series.astype(dtype)
+        except (TypeError, ValueError) as exc:
+            logger.warning("Coluna %s mantida como %s: %s", column, df[column].dtype, exc)
+            continue
+        converted[column] = target
+
+    if converted:
+        df = df.assign(**converted)
+    return df
+
+
+def read_prepared_csv(path: Path | str, *, report: bool = False) -> "DataFrame":
+    """Read a prepared CSV applying the compact dtype map while parsing.
+
+    The header is read first so the declared dtypes are handed to
+    ``read_csv`` and the wide ``int64``/``float64`` frame is never built.  If
+    the file does not fit the declared types (e.g. nulls left in a house
+    column) the loader falls back to the default parser followed by
+    :func:`apply_compact_dtypes`.
+    """
+
+    if pd is None:
+        raise RuntimeError("Pandas é obrigatório para carregar os dados preparados.")
+
+    columns = pd.read_csv(path, nrows=0).columns
+    try:
+        df = pd.read_csv(path, dtype=compact_dtype_map(columns))
+    except (TypeError, ValueError, OverflowError) as exc:
+        logger.warning(
+            "Tipos compactos não puderam ser aplicados na leitura de %s (%s); convertendo após a carga.",
+            path,
+            exc,
+        )
+        df = apply_compact_dtypes(pd.read_csv(path))
+
+    if report:
+        log_memory_report(memory_report(df))
+    return df
+
+
+def _default_column_bytes(series) -> int:
+    """Estimate the memory ``read_csv`` would use for ``series`` without dtypes."""
+
+    if series.dtype.kind in "biuf":
+        return len(series) * _DEFAULT_NUMERIC_ITEMSIZE
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return int(series.astype(object).memory_usage(index=False, deep=True))
+    return int(series.memory_usage(index=False, deep=True))
+
+
+def memory_report(df: "DataFrame", baseline: Optional["DataFrame"] = None) -> "DataFrame":
+    """Return per-column memory usage before and after compaction.
+
+    ``baseline`` is the frame as loaded without declared dtypes.  When it is
+    omitted the "before" figures are estimated from the default ``read_csv``
+    inference (8 bytes per numeric cell), which avoids loading the file twice.
+    """
+
+    if pd is None:
+        raise RuntimeError("Pandas é obrigatório para gerar o relatório de memória.")
+
+    rows = []
+    for column in df.columns:
+        after = int(df[column].memory_usage(index=False, deep=True))
+        if baseline is not None and column in baseline.columns:
+            before = int(baseline[column].memory_usage(index=False, deep=True))
+            before_dtype = str(baseline[column].dtype)
+        else:
+            before = _default_column_bytes(df[column])
+            before_dtype = "float64" if df[column].dtype.kind == "f" else (
+                "int64" if df[column].dtype.kind in "biu" else "object"
+            )
+        rows.append(
+            {
+                "column": column,
+                "dtype_before": before_dtype,
+                "dtype_after": str(df[column].dtype),
+                "bytes_before": before,
+                "bytes_after": after,
+            }
+        )
+
+    report = pd.DataFrame(rows)
+    report["saved_ratio"] = (
+        report["bytes_before"] / report["bytes_after"].where(report["bytes_after"] > 0)
+    ).round(2)
+    return report
+
+
+def log_memory_report(report: "DataFrame", top: int = 20) -> None:
+    """Log the largest columns of ``report`` and the before/after totals."""
+
+    total_before = int(report["bytes_before"].sum())
+    total_after = int(report["bytes_after"].sum())
+    ratio = total_before / total_after if total_after else float("nan")
+
+    logger.info(
+        "Memória dos dados preparados: %.2f MiB -> %.2f MiB (%.1fx menor, %s colunas)",
+        total_before / 2**20,
+        total_after / 2**20,
+        ratio,
+        len(report),
+    )
+    largest = report.sort_values("bytes_before", ascending=False).head(top)
+    logger.info("Colunas com maior consumo de memória:\n%s", largest.to_string(index=False))
+
+
+def main() -> None:
+    import argparse
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+    parser = argparse.ArgumentParser(
+        description="Mostra o consumo de memória dos dados preparados antes e depois dos tipos compactos."
+    )
+    parser.add_argument("path", nargs="?", default=str(DEFAULT_PREPARED_FILE))
+    parser.add_argument(
+        "--compare",
+        action="store_true",
+        help="Carrega o arquivo também sem tipos declarados para medir o 'antes' real.",
+    )
+    parser.add_argument("--top", type=int, default=20, help="Quantidade de colunas listadas.")
+    args = parser.parse_args()
+
+    df = read_prepared_csv(args.path)
+    baseline = pd.read_csv(args.path) if args.compare else None
+    log_memory_report(memory_report(df, baseline=baseline), top=args.top)
+
+
+__all__ = [
+    "METADATA_COLUMNS",
+    "apply_compact_dtypes",
+    "compact_dtype_for",
+    "compact_dtype_map",
+    "log_memory_report",
+    "memory_report",
+    "read_prepared_csv",
+]
+
+
+if __name__ == "__main__":
+    main()
@@ -4,15 +4,33 @@ This module now ships with a tiny, self-contained sample dataset so the data
 preparation steps can be executed locally without external downloads. When the
 real ``person_2025_update.csv`` file is missing we transparently fall back to
 the bundled sample allowing the rest of the pipeline to run out-of-the-box.
+
+With ``--stream`` the source is cleaned chunk by chunk (database pages or
+``--chunksize`` rows of the CSV): only :data:`SOURCE_FIELDS` are read, with
+typed columns, and each cleaned chunk is appended to the output, so memory
+stays flat for the full multi-million-row Pantheon dump.
+
+Birthdates are parsed by :func:`historical_dates.parse_dates`, so people born
+before 1677 (out of ``pd.Timestamp`` range) are kept: ``birth_date_parsed`` is
+the ISO date (astronomical years, ``-0469-01-01``) and ``birth_jdn`` its Julian
+Day Number.  ``--calendar`` chooses how the source dates are interpreted.
+
+Every distinct ``bplace_name``/``bplace_lat``/``bplace_lon`` triple gets an
+integer ``place_id`` (:class:`places.PlaceRegistry`); the cleaned rows carry the
+ID and :data:`PLACES_FILE` holds one row per place, so location-dependent work
+downstream runs once per place.
 """
 
+import os
 from pathlib import Path
 import shutil
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, Optional, Tuple
 
 import logging
 
 from astro_database_client import AstroDatabaseClient, AstroDatabaseError
+from historical_dates import CALENDARS, PATHS, parse_dates
+from places import PlaceRegistry
 
 try:  # pragma: no cover - dependência opcional
     import pandas as pd
@@ -31,6 +49,7 @@ DATA_DIR = BASE_DIR / "data"
 SOURCE_FILE = BASE_DIR / "person_2025_update.csv"
 SAMPLE_FILE = DATA_DIR / "sample_person_2025_update.csv"
 OUTPUT_FILE = BASE_DIR / "pantheon_cleaned_data.csv"
+PLACES_FILE = BASE_DIR / "pantheon_places.csv"
 
 REQUIRED_COLUMNS = [
     "name",
@@ -53,6 +72,20 @@ COLUMN_ALIASES = {
 }
 
 
+# Colunas pedidas ao banco: as obrigatórias e os nomes alternativos aceitos.
+SOURCE_FIELDS = list(dict.fromkeys(REQUIRED_COLUMNS + list(COLUMN_ALIASES)))
+
+NUMERIC_COLUMNS = ("bplace_lat", "bplace_lon")
+# Texto lido como texto (sem inferência); coordenadas ficam com o parser numérico do CSV.
+SOURCE_DTYPES = {
+    column: str for column in SOURCE_FIELDS if COLUMN_ALIASES.get(column, column) not in NUMERIC_COLUMNS
+}
+
+DEFAULT_CHUNKSIZE = 200_000
+# Colunas derivadas da data de nascimento, acrescentadas pela limpeza.
+DATE_COLUMNS = ["birth_date_parsed", "birth_jdn"]
+
+
 def _apply_aliases(df: "DataFrame") -> "DataFrame":
     for source, target in COLUMN_ALIASES.items():
         if source in df.columns and target not in df.columns:
@@ -60,6 +93,39 @@ def _apply_aliases(df: "DataFrame") -> "DataFrame":
     return df
 
 
+def _remote_chunks(client: AstroDatabaseClient) -> Iterator["DataFrame"]:
+    for chunk in client.iter_people(as_frames=True, fields=SOURCE_FIELDS):
+        chunk = _apply_aliases(chunk)
+        missing_cols = [col for col in REQUIRED_COLUMNS if col not in chunk.columns]
+        if missing_cols:
+            raise AstroDatabaseError(
+                "O banco astrológico não retornou todas as colunas necessárias: "
+                f"{missing_cols}"
+            )
+        yield chunk[REQUIRED_COLUMNS]
+
+
+def read_source_csv(path: Path, chunksize=None):
+    """Read only :data:`SOURCE_FIELDS` of ``path`` with typed columns."""
+
+    return pd.read_csv(
+        path,
+        usecols=lambda column: column in SOURCE_FIELDS,
+        dtype=SOURCE_DTYPES,
+        chunksize=chunksize,
+    )
+
+
+def _local_source() -> Path:
+    if SOURCE_FILE.exists():
+        logging.info("Carregando dados locais a partir de %s", SOURCE_FILE)
+        return SOURCE_FILE
+    logging.warning(
+        "Arquivo %s não encontrado. Utilizando amostra em %s.", SOURCE_FILE.name, SAMPLE_FILE
+    )
+    return SAMPLE_FILE
+
+
 def load_source_dataframe() -> "DataFrame":
     """Return the raw dataframe prioritising the online astrological database."""
 
@@ -68,59 +134,173 @@ def load_source_dataframe() -> "DataFrame":
 
     try:
         client = AstroDatabaseClient()
-        records = client.fetch_people()
-        if not records:
+        # A tabela de pessoas é lida página a página; de cada bloco ficam apenas
+        # as colunas usadas pela limpeza, então a lista completa de registros
+        # nunca é montada em memória.
+        chunks = list(_remote_chunks(client))
+        if not chunks:
             raise AstroDatabaseError("O banco astrológico não retornou registros.")
-        df_remote = pd.DataFrame(records)
-        df_remote = _apply_aliases(df_remote)
-
-        missing_cols = [col for col in REQUIRED_COLUMNS if col not in df_remote.columns]
-        if missing_cols:
-            raise AstroDatabaseError(
-                "O banco astrológico não retornou todas as colunas necessárias: "
-                f"{missing_cols}"
-            )
 
+        df_remote = pd.concat(chunks, ignore_index=True)
         logging.info("Dados carregados do banco astrológico online.")
         return df_remote
     except AstroDatabaseError as exc:
         logging.warning("Falha ao consultar banco astrológico: %s", exc)
 
-    if SOURCE_FILE.exists():
-        logging.info("Carregando dados locais a partir de %s", SOURCE_FILE)
-        return pd.read_csv(SOURCE_FILE)
-
-    logging.warning(
-        "Arquivo %s não encontrado. Utilizando amostra em %s.", SOURCE_FILE.name, SAMPLE_FILE
-    )
-    return pd.read_csv(SAMPLE_FILE)
+    return _apply_aliases(read_source_csv(_local_source()))
 
 
-def clean_dataset(df: "DataFrame") -> "DataFrame":
-    """Filter and clean the Pantheon dataframe to the columns used downstream."""
+def _clean_frame(
+    df: "DataFrame", calendar: str = "gregorian", places: Optional[PlaceRegistry] = None
+) -> Tuple["DataFrame", int, Dict[str, int]]:
+    """Cleaned rows of ``df``, how many survived the null filter and the date parse paths."""
 
     missing_cols = [col for col in REQUIRED_COLUMNS if col not in df.columns]
     if missing_cols:
         raise ValueError(f"Colunas obrigatórias ausentes: {missing_cols}")
 
     df_filtered = df[REQUIRED_COLUMNS].copy()
+    for column in NUMERIC_COLUMNS:
+        df_filtered[column] = pd.to_numeric(df_filtered[column], errors="coerce")
     df_filtered.dropna(inplace=True)
+    non_null = len(df_filtered)
+
+    parsed = parse_dates(df_filtered["birthdate"], calendar=calendar)
+    df_filtered["birth_date_parsed"] = parsed.iso()
+    df_filtered["birth_jdn"] = parsed.jdn
+    df_filtered = df_filtered[parsed.valid]
+    if places is not None:
+        df_filtered = df_filtered.assign(place_id=places.assign(df_filtered))
+    return df_filtered, non_null, parsed.counts
+
 
+def _save_places(places: PlaceRegistry, path: Path) -> None:
+    places.table().save(path)
+    logging.info("Tabela de %s lugares de nascimento salva em %s", len(places), path)
+
+
+def _log_date_paths(counts: Dict[str, int]) -> None:
     logging.info(
-        "Após remover valores nulos nas colunas obrigatórias: %s", df_filtered.shape
+        "Datas de nascimento: %s no formato fixo, %s por expressão regular, %s inválidas.",
+        counts["fast"],
+        counts["fallback"],
+        counts["invalid"],
     )
 
-    df_filtered["birth_date_parsed"] = pd.to_datetime(df_filtered["birthdate"], errors="coerce")
-    df_filtered.dropna(subset=["birth_date_parsed"], inplace=True)
 
+def clean_dataset(
+    df: "DataFrame", calendar: str = "gregorian", places: Optional[PlaceRegistry] = None
+) -> "DataFrame":
+    """Filter and clean the Pantheon dataframe to the columns used downstream."""
+
+    df_filtered, non_null, date_paths = _clean_frame(df, calendar, places)
+
+    logging.info(
+        "Após remover valores nulos nas colunas obrigatórias: %s", (non_null, len(REQUIRED_COLUMNS))
+    )
     logging.info(
         "Após converter datas de nascimento válidas: %s", df_filtered.shape
     )
+    _log_date_paths(date_paths)
 
     return df_filtered
 
 
+def _write_cleaned(
+    chunks: Iterable["DataFrame"], output: Path, calendar: str = "gregorian", places: Optional[PlaceRegistry] = None
+) -> Dict[str, int]:
+    """Clean ``chunks`` one at a time, appending them to ``output`` atomically."""
+
+    stats = {"chunks": 0, "read": 0, "non_null": 0, "written": 0, **dict.fromkeys(PATHS, 0)}
+    tmp_path = output.with_name(f".{output.name}.tmp")
+    try:
+        with open(tmp_path, "w", newline="", encoding="utf-8") as handle:
+            for chunk in chunks:
+                cleaned, non_null, date_paths = _clean_frame(_apply_aliases(chunk), calendar, places)
+                cleaned.to_csv(handle, index=False, header=stats["chunks"] == 0)
+                stats["chunks"] += 1
+                stats["read"] += len(chunk)
+                stats["non_null"] += non_null
+                stats["written"] += len(cleaned)
+                for path, count in date_paths.items():
+                    stats[path] += count
+            if stats["chunks"] == 0:
+                header = REQUIRED_COLUMNS + DATE_COLUMNS + (["place_id"] if places is not None else [])
+                handle.write(",".join(header) + "\n")
+        os.replace(tmp_path, output)
+    except BaseException:
+        # Uma falha no meio (p. ex. o banco caiu) não deixa saída parcial.
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return stats
+
+
+def clean_streaming(
+    output: Path = OUTPUT_FILE,
+    chunksize: int = DEFAULT_CHUNKSIZE,
+    calendar: str = "gregorian",
+    places_output: Optional[Path] = PLACES_FILE,
+) -> Dict[str, int]:
+    """Streaming version of :func:`load_source_dataframe` + :func:`clean_dataset`."""
+
+    if pd is None:
+        raise RuntimeError("Pandas é obrigatório para limpar os dados em blocos.")
+
+    stats = None
+    # Um registro novo por tentativa: a leitura remota interrompida não deixa IDs órfãos.
+    places = PlaceRegistry() if places_output is not None else None
+    try:
+        client = AstroDatabaseClient()
+        stats = _write_cleaned(_remote_chunks(client), output, calendar, places)
+        if not stats["read"]:
+            raise AstroDatabaseError("O banco astrológico não retornou registros.")
+        logging.info("Dados carregados do banco astrológico online.")
+    except AstroDatabaseError as exc:
+        logging.warning("Falha ao consultar banco astrológico: %s", exc)
+        stats = None
+
+    if stats is None:
+        places = PlaceRegistry() if places_output is not None else None
+        with read_source_csv(_local_source(), chunksize=chunksize) as reader:
+            stats = _write_cleaned(reader, output, calendar, places)
+
+    logging.info(
+        "Limpeza em blocos: %s linhas lidas em %s blocos; %s sem nulos; %s com data válida.",
+        stats["read"],
+        stats["chunks"],
+        stats["non_null"],
+        stats["written"],
+    )
+    _log_date_paths(stats)
+    if places is not None:
+        _save_places(places, places_output)
+        stats["places"] = len(places)
+    return stats
+
+
 def main() -> None:
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Limpa a base Pantheon para o pipeline.")
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Limpa em blocos e grava a saída incrementalmente (memória constante).",
+    )
+    parser.add_argument(
+        "--chunksize",
+        type=int,
+        default=DEFAULT_CHUNKSIZE,
+        help="Linhas do CSV por bloco no modo --stream.",
+    )
+    parser.add_argument(
+        "--calendar",
+        choices=CALENDARS,
+        default="gregorian",
+        help="Calendário das datas de origem (auto: juliano antes de 15/10/1582).",
+    )
+    args = parser.parse_args()
+
     if pd is None:
         logging.warning(
             "Pandas não está disponível. Copiando dados limpos de amostra para %s.", OUTPUT_FILE
@@ -128,15 +308,22 @@ def main() -> None:
         shutil.copyfile(SAMPLE_FILE, OUTPUT_FILE)
         return
 
+    if args.stream:
+        clean_streaming(OUTPUT_FILE, args.chunksize, args.calendar)
+        logging.info("Dados limpos salvos em %s", OUTPUT_FILE)
+        return
+
     df = load_source_dataframe()
     logging.info("Dataset original: %s linhas, %s colunas", *df.shape)
 
-    df_filtered = clean_dataset(df)
+    places = PlaceRegistry()
+    df_filtered = clean_dataset(df, args.calendar, places)
 
     logging.info("Exemplo de registros limpos:\n%s", df_filtered.head())
 
     df_filtered.to_csv(OUTPUT_FILE, index=False)
     logging.info("Dados limpos salvos em %s", OUTPUT_FILE)
+    _save_places(places, PLACES_FILE)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,102 @@
+'''
+Gera um relatório legível a partir da análise de erros salva por
+``develop_ml_model.py`` (``model_error_analysis.npz``): acurácia top-k,
+calibração da confiança, classes com pior desempenho e as confusões mais
+frequentes entre profissões.
+'''
+import argparse
+import logging
+from pathlib import Path
+
+from error_analysis import load_error_analysis
+
+# Configuração do logging
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+BASE_DIR = Path(__file__).resolve().parent
+ANALYSIS_FILE = BASE_DIR / "model_error_analysis.npz"
+REPORT_FILE = BASE_DIR / "model_error_report.md"
+
+
+def _markdown_table(frame, float_format="{:.4f}"):
+    header = "| " + " | ".join(str(column) for column in frame.columns) + " |"
+    separator = "| " + " | ".join("---" for _ in frame.columns) + " |"
+    lines = [header, separator]
+    for row in frame.itertuples(index=False):
+        cells = [float_format.format(value) if isinstance(value, float) else str(value) for value in row]
+        lines.append("| " + " | ".join(cells) + " |")
+    return "\n".join(lines)
+
+
+def render_report(analysis, top=20, min_support=1):
+    '''
+    Monta o relatório Markdown a partir de um ``ErrorAnalysis``.
+    '''
+    per_class = analysis.per_class()
+    evaluated = per_class[per_class["support"] >= min_support]
+    topk_columns = [f"top{k}_recall" for k in analysis.top_k]
+
+    sections = [
+        "# Análise de erros do classificador de profissões",
+        "",
+        f"Previsões analisadas: {analysis.rows}  ",
+        f"Classes no conjunto avaliado: {int((per_class['support'] > 0).sum())}  ",
+        f"Classes conhecidas pelo modelo: {len(analysis.classes)}",
+        "",
+        "## Acurácia top-k",
+        "",
+        "\n".join(f"- top-{k}: {value:.4f}" for k, value in analysis.topk_accuracy().items()),
+        "",
+        "## Calibração da confiança top-1",
+        "",
+        f"ECE (erro de calibração esperado): {analysis.top1_ece():.4f}",
+        "",
+        _markdown_table(analysis.reliability().dropna()),
+        "",
+        f"## {top} classes com menor F1 (suporte >= {min_support})",
+        "",
+        _markdown_table(
+            evaluated.sort_values(["f1", "support"], ascending=[True, False]).head(top)[
+                ["occupation", "support", "precision", "recall", "f1", *topk_columns, "ece", "brier"]
+            ]
+        ),
+        "",
+        f"## {top} classes pior calibradas (ECE um-contra-todos)",
+        "",
+        _markdown_table(
+            per_class.dropna(subset=["ece"]).sort_values("ece", ascending=False).head(top)[
+                ["occupation", "support", "predicted", "ece", "brier"]
+            ]
+        ),
+        "",
+        f"## {top} confusões mais frequentes",
+        "",
+        _markdown_table(analysis.top_confusions(top)),
+        "",
+    ]
+    return "\n".join(sections)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera o relatório da análise de erros do modelo.")
+    parser.add_argument("analysis", nargs="?", default=str(ANALYSIS_FILE), help="Arquivo .npz da análise.")
+    parser.add_argument("--output", default=str(REPORT_FILE), help="Arquivo Markdown gerado.")
+    parser.add_argument("--top", type=int, default=20, help="Linhas por tabela.")
+    parser.add_argument("--min-support", type=int, default=1, help="Suporte mínimo na tabela de piores classes.")
+    args = parser.parse_args()
+
+    try:
+        analysis = load_error_analysis(args.analysis)
+    except FileNotFoundError:
+        logging.error("Erro: O arquivo %s não foi encontrado. Rode develop_ml_model.py primeiro.", args.analysis)
+        return
+
+    report = render_report(analysis, top=args.top, min_support=args.min_support)
+    Path(args.output).write_text(report, encoding="utf-8")
+    logging.info("Relatório de erros salvo em %s", args.output)
+    for k, value in analysis.topk_accuracy().items():
+        logging.info("Acurácia top-%s: %.4f", k, value)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,441 @@
+"""Incremental runner for the offline ML pipeline.
+
+The pipeline scripts are modelled as a DAG of stages.  Before running a stage
+the runner fingerprints:
+
+- the contents of its input files (absent files are recorded as such);
+- its code version (the script plus the shared modules it imports);
+- its parameters (command-line arguments and the ``ASTRO_DB_*`` variables).
+
+When the fingerprint matches the one recorded after the last successful run
+and every output still exists unchanged, the stage is skipped.  Optional
+outputs (written only when an optional dependency such as pandas or matplotlib
+is installed) may be absent, but must not have changed since that run.  Stages
+whose dependencies are satisfied run concurrently (each one in its own Python
+process) and a per-stage timing summary is printed at the end.
+
+Usage::
+
+    python run_pipeline.py                 # roda apenas o que estiver desatualizado
+    python run_pipeline.py prepare         # "prepare" e suas dependências
+    python run_pipeline.py --force train   # força a etapa "train"
+    python run_pipeline.py --dry-run       # mostra o plano sem executar
+
+Data fetched from ``ASTRO_DB_BASE_URL`` is not part of the fingerprint (only
+the URL is); use ``--force`` to refresh stages after the remote data changes.
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+
+BASE_DIR = Path(__file__).resolve().parent
+STATE_FILE = BASE_DIR / ".pipeline_state.json"
+LOG_DIR = BASE_DIR / ".pipeline_logs"
+
+SHARED_MODULES = (
+    "astro_database_client.py",
+    "astro_database_cache.py",
+    "astro_database_resilience.py",
+    "astro_database_stream.py",
+    "astro_database_upload.py",
+    "feature_registry.py",
+    "historical_dates.py",
+    "places.py",
+    "prepared_dataset.py",
+)
+ENV_PREFIX = "ASTRO_DB_"
+# Variáveis que só ajustam o transporte (cache, paginação, envio) e não mudam os dados.
+ENV_IGNORED_PREFIXES = (
+    "ASTRO_DB_CACHE_",
+    "ASTRO_DB_PAGE_SIZE",
+    "ASTRO_DB_CONCURRENCY",
+    "ASTRO_DB_UPLOAD_",
+    "ASTRO_DB_PUBLISH_",
+)
+
+STATUS_RAN = "executada"
+STATUS_SKIPPED = "atualizada"
+STATUS_FAILED = "falhou"
+STATUS_BLOCKED = "bloqueada"
+STATUS_PLANNED = "pendente"
+
+
+@dataclass(frozen=True)
+class Stage:
+    """One node of the pipeline DAG."""
+
+    name: str
+    script: str
+    inputs: Tuple[str, ...]
+    outputs: Tuple[str, ...]
+    # Saídas que dependem de bibliotecas opcionais: podem não existir.
+    optional_outputs: Tuple[str, ...] = ()
+    depends_on: Tuple[str, ...] = ()
+    args: Tuple[str, ...] = ()
+    code: Tuple[str, ...] = SHARED_MODULES
+    default: bool = True
+
+
+STAGES: Tuple[Stage, ...] = (
+    Stage(
+        name="clean",
+        script="process_pantheon_data.py",
+        inputs=("person_2025_update.csv", "data/sample_person_2025_update.csv"),
+        outputs=("pantheon_cleaned_data.csv",),
+        optional_outputs=("pantheon_places.csv",),
+        args=("--stream",),
+    ),
+    Stage(
+        name="reduce",
+        script="create_reduced_dataset.py",
+        inputs=("pantheon_cleaned_data.csv",),
+        outputs=("pantheon_reduced_1000.csv",),
+        depends_on=("clean",),
+    ),
+    Stage(
+        name="features",
+        script="generate_astro_features.py",
+        inputs=("pantheon_reduced_1000.csv", "data/sample_astrological_features.csv"),
+        outputs=("astrological_features.csv",),
+        depends_on=("reduce",),
+    ),
+    Stage(
+        name="prepare",
+        script="prepare_ml_data.py",
+        inputs=("astrological_features.csv",),
+        outputs=("prepared_ml_data.csv", "occupation_label_mapping.json"),
+        depends_on=("features",),
+    ),
+    Stage(
+        name="train",
+        script="develop_ml_model.py",
+        inputs=("prepared_ml_data.csv", "occupation_label_mapping.json"),
+        outputs=("random_forest_model.pkl", "model_error_analysis.npz"),
+        depends_on=("prepare",),
+    ),
+    Stage(
+        name="analyze",
+        script="analyze_model_results.py",
+        inputs=("random_forest_model.pkl", "prepared_ml_data.csv"),
+        outputs=("feature_importance_report.csv", "feature_importance_report.json"),
+        optional_outputs=("feature_importance.png",),
+        depends_on=("train",),
+        default=False,
+    ),
+    Stage(
+        name="export",
+        script="export_offline_results.py",
+        inputs=(
+            "pantheon_cleaned_data.csv",
+            "pantheon_reduced_1000.csv",
+            "astrological_features.csv",
+            "prepared_ml_data.csv",
+            "occupation_label_mapping.json",
+            "random_forest_model.pkl",
+            "data/sample_model_report.txt",
+            "data/sample_model_metrics.json",
+        ),
+        outputs=("offline_results/manifest.json",),
+        depends_on=("clean", "reduce", "features", "prepare", "train"),
+    ),
+)
+
+STAGES_BY_NAME: Dict[str, Stage] = {stage.name: stage for stage in STAGES}
+
+
+@dataclass
+class StageResult:
+    stage: str
+    status: str
+    duration: float = 0.0
+    reason: str = ""
+
+
+@dataclass
+class _State:
+    stages: Dict[str, dict] = field(default_factory=dict)
+    digests: Dict[str, list] = field(default_factory=dict)
+
+    @classmethod
+    def load(cls, path: Path) -> "_State":
+        if not path.exists():
+            return cls()
+        try:
+            payload = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError) as exc:
+            logging.warning("Estado do pipeline ilegível (%s); todas as etapas serão executadas.", exc)
+            return cls()
+        return cls(stages=payload.get("stages", {}), digests=payload.get("digests", {}))
+
+    def save(self, path: Path) -> None:
+        payload = {"stages": self.stages, "digests": self.digests}
+        path.write_text(json.dumps(payload, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+
+
+# ----------------------------------------------------------------------
+# Fingerprints
+# ----------------------------------------------------------------------
+def _stat_key(path: Path) -> Optional[List[int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def _file_digest(path: Path, state: _State) -> str:
+    """Return the SHA-256 of ``path``, reusing the cached digest while size/mtime match."""
+
+    key = _stat_key(path)
+    if key is None:
+        return "absent"
+
+    cache_key = str(path.relative_to(BASE_DIR)) if path.is_relative_to(BASE_DIR) else str(path)
+    cached = state.digests.get(cache_key)
+    if cached and cached[:2] == key:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with path.open("rb") as fp:
+        for chunk in iter(lambda: fp.read(1 << 20), b""):
+            digest.update(chunk)
+    value = digest.hexdigest()
+    state.digests[cache_key] = key + [value]
+    return value
+
+
+def stage_fingerprint(stage: Stage, state: _State) -> str:
+    """Combine inputs, code version and parameters of ``stage`` into one digest."""
+
+    env = {
+        key: value
+        for key, value in sorted(os.environ.items())
+        if key.startswith(ENV_PREFIX) and not key.startswith(ENV_IGNORED_PREFIXES)
+    }
+    payload = {
+        "inputs": {name: _file_digest(BASE_DIR / name, state) for name in stage.inputs},
+        "code": {name: _file_digest(BASE_DIR / name, state) for name in (stage.script, *stage.code)},
+        "args": list(stage.args),
+        "env": env,
+        "python": sys.version_info[:2],
+    }
+    encoded = json.dumps(payload, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def _outputs_snapshot(stage: Stage) -> Dict[str, Optional[List[int]]]:
+    return {name: _stat_key(BASE_DIR / name) for name in (*stage.outputs, *stage.optional_outputs)}
+
+
+def is_up_to_date(stage: Stage, fingerprint: str, state: _State) -> Tuple[bool, str]:
+    """Return whether ``stage`` can be skipped and a short human-readable reason."""
+
+    record = state.stages.get(stage.name)
+    if not record:
+        return False, "sem execução anterior"
+    if record.get("fingerprint") != fingerprint:
+        return False, "entradas, código ou parâmetros mudaram"
+    snapshot = _outputs_snapshot(stage)
+    missing = [name for name in stage.outputs if snapshot[name] is None]
+    if missing:
+        return False, f"saídas ausentes: {', '.join(missing)}"
+    if snapshot != record.get("outputs"):
+        return False, "saídas modificadas fora do pipeline"
+    return True, "atualizada"
+
+
+# ----------------------------------------------------------------------
+# Planning and execution
+# ----------------------------------------------------------------------
+def _with_dependencies(names: Iterable[str]) -> Set[str]:
+    selected: Set[str] = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name in selected:
+            continue
+        selected.add(name)
+        stack.extend(STAGES_BY_NAME[name].depends_on)
+    return selected
+
+
+def select_stages(targets: Sequence[str], include_optional: bool = False) -> List[Stage]:
+    """Return the stages needed for ``targets`` in DAG (declaration) order."""
+
+    unknown = [name for name in targets if name not in STAGES_BY_NAME]
+    if unknown:
+        raise SystemExit(f"Etapas desconhecidas: {unknown}. Opções: {sorted(STAGES_BY_NAME)}")
+
+    if targets:
+        names = _with_dependencies(targets)
+    else:
+        names = {stage.name for stage in STAGES if stage.default or include_optional}
+    return [stage for stage in STAGES if stage.name in names]
+
+
+def _run_stage(stage: Stage) -> Tuple[int, float, Path]:
+    LOG_DIR.mkdir(parents=True, exist_ok=True)
+    log_path = LOG_DIR / f"{stage.name}.log"
+    command = [sys.executable, str(BASE_DIR / stage.script), *stage.args]
+
+    start = time.perf_counter()
+    with log_path.open("w", encoding="utf-8") as log_fp:
+        completed = subprocess.run(
+            command, cwd=BASE_DIR, stdout=log_fp, stderr=subprocess.STDOUT, check=False
+        )
+    return completed.returncode, time.perf_counter() - start, log_path
+
+
+def run_pipeline(
+    stages: Sequence[Stage],
+    *,
+    force: Iterable[str] = (),
+    jobs: int = 2,
+    dry_run: bool = False,
+    state_file: Path = STATE_FILE,
+) -> List[StageResult]:
+    """Run ``stages`` respecting dependencies, skipping the up-to-date ones."""
+
+    state = _State.load(state_file)
+    forced = set(force)
+    selected = {stage.name for stage in stages}
+    results: Dict[str, StageResult] = {}
+    pending = list(stages)
+    running: Dict[Future, Tuple[Stage, str]] = {}
+
+    def finished(name: str) -> bool:
+        return name not in selected or (
+            name in results and results[name].status in (STATUS_RAN, STATUS_SKIPPED, STATUS_PLANNED)
+        )
+
+    def broken(name: str) -> bool:
+        return name in results and results[name].status in (STATUS_FAILED, STATUS_BLOCKED)
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as executor:
+        while pending or running:
+            progressed = False
+            for stage in list(pending):
+                if any(broken(dep) for dep in stage.depends_on):
+                    pending.remove(stage)
+                    results[stage.name] = StageResult(stage.name, STATUS_BLOCKED, reason="dependência falhou")
+                    progressed = True
+                    continue
+                if not all(finished(dep) for dep in stage.depends_on):
+                    continue
+
+                pending.remove(stage)
+                progressed = True
+                fingerprint = stage_fingerprint(stage, state)
+                up_to_date, reason = is_up_to_date(stage, fingerprint, state)
+                if stage.name in forced or "all" in forced:
+                    up_to_date, reason = False, "execução forçada"
+                elif dry_run and any(
+                    dep in results and results[dep].status == STATUS_PLANNED for dep in stage.depends_on
+                ):
+                    up_to_date, reason = False, "dependência será executada"
+
+                if up_to_date:
+                    results[stage.name] = StageResult(stage.name, STATUS_SKIPPED, reason=reason)
+                    logging.info("[%s] atualizada; etapa ignorada.", stage.name)
+                elif dry_run:
+                    results[stage.name] = StageResult(stage.name, STATUS_PLANNED, reason=reason)
+                    logging.info("[%s] seria executada (%s).", stage.name, reason)
+                else:
+                    logging.info("[%s] executando %s (%s).", stage.name, stage.script, reason)
+                    running[executor.submit(_run_stage, stage)] = (stage, reason)
+
+            if running and not progressed:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage, reason = running.pop(future)
+                    returncode, duration, log_path = future.result()
+                    if returncode == 0:
+                        state.stages[stage.name] = {
+                            # Recalculado após a execução: as entradas podem ter sido
+                            # reescritas pela própria etapa.
+                            "fingerprint": stage_fingerprint(stage, state),
+                            "outputs": _outputs_snapshot(stage),
+                            "duration": round(duration, 3),
+                            "finished_at": datetime.now(timezone.utc).isoformat(),
+                        }
+                        state.save(state_file)
+                        results[stage.name] = StageResult(stage.name, STATUS_RAN, duration, reason)
+                        logging.info("[%s] concluída em %.2fs.", stage.name, duration)
+                    else:
+                        results[stage.name] = StageResult(
+                            stage.name, STATUS_FAILED, duration, f"código {returncode}; veja {log_path}"
+                        )
+                        logging.error("[%s] falhou (código %s). Log: %s", stage.name, returncode, log_path)
+
+    if not dry_run:
+        state.save(state_file)
+    return [results[stage.name] for stage in stages if stage.name in results]
+
+
+def format_summary(results: Sequence[StageResult]) -> str:
+    """Render the per-stage timing summary table."""
+
+    header = f"{'etapa':<10} {'status':<11} {'tempo (s)':>10}  motivo"
+    lines = [header, "-" * len(header)]
+    for result in results:
+        lines.append(f"{result.stage:<10} {result.status:<11} {result.duration:>10.2f}  {result.reason}")
+    total = sum(result.duration for result in results)
+    lines.append("-" * len(header))
+    lines.append(f"{'total':<10} {'':<11} {total:>10.2f}")
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Executa o pipeline offline de forma incremental.")
+    parser.add_argument(
+        "targets",
+        nargs="*",
+        help=f"Etapas alvo (com dependências). Opções: {', '.join(STAGES_BY_NAME)}.",
+    )
+    parser.add_argument(
+        "--force",
+        nargs="?",
+        const="all",
+        action="append",
+        default=[],
+        metavar="ETAPA",
+        help="Força a execução da etapa informada (ou de todas, sem argumento).",
+    )
+    parser.add_argument("--jobs", type=int, default=2, help="Etapas independentes em paralelo.")
+    parser.add_argument("--dry-run", action="store_true", help="Mostra o plano sem executar.")
+    parser.add_argument(
+        "--with-analysis",
+        action="store_true",
+        help="Inclui a etapa opcional 'analyze' (requer matplotlib e seaborn).",
+    )
+    args = parser.parse_args()
+
+    stages = select_stages(args.targets, include_optional=args.with_analysis)
+    start = time.perf_counter()
+    results = run_pipeline(stages, force=args.force, jobs=args.jobs, dry_run=args.dry_run)
+    logging.info(
+        "Resumo do pipeline (%.2fs de relógio):\n%s", time.perf_counter() - start, format_summary(results)
+    )
+
+    if any(result.status in (STATUS_FAILED, STATUS_BLOCKED) for result in results):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
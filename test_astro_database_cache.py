@@ -0,0 +1,196 @@
+"""Tests of the on-disk response cache, directly and through the client.
+
+Run with ``python -m pytest test_astro_database_cache.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import time
+
+import pytest
+
+import astro_database_cache
+from astro_database_cache import ResponseCache
+from astro_database_client import AstroDatabaseClient, AstroDatabaseError, AstroDatabaseUnavailable
+from astro_database_resilience import RetryPolicy
+from test_astro_database_client import RECORDS, MockServer
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.delenv("ASTRO_DB_CACHE_DIR", raising=False)
+    mock = MockServer()
+    yield mock
+    mock.close()
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResponseCache(tmp_path / "cache", ttl=60.0)
+
+
+@pytest.fixture
+def client(server, cache):
+    return AstroDatabaseClient(base_url=server.base_url, cache=cache, retry_policy=RetryPolicy(max_retries=0))
+
+
+def _expire(cache: ResponseCache) -> None:
+    """Age every entry past the TTL."""
+
+    for meta_path in cache.directory.glob("*.meta"):
+        meta = json.loads(meta_path.read_text(encoding="utf-8"))
+        meta["stored_at"] -= cache.ttl + 1
+        meta_path.write_text(json.dumps(meta), encoding="utf-8")
+
+
+# ----------------------------------------------------------------------
+# TTL e revalidação pelo cliente
+# ----------------------------------------------------------------------
+def test_fresh_entries_are_served_without_a_request(server, client, cache):
+    assert client.fetch_people() == RECORDS
+    assert client.fetch_people() == RECORDS
+
+    assert len(server.requests) == 1
+    assert (cache.stats["miss"], cache.stats["hit"], cache.stats["stored"]) == (1, 1, 1)
+
+
+def test_expired_entry_without_validators_is_refetched(server, client, cache):
+    client.fetch_people()
+    _expire(cache)
+
+    assert client.fetch_people() == RECORDS
+
+    assert len(server.requests) == 2
+    assert "If-None-Match" not in server.request_headers[1]
+    assert cache.stats["miss"] == 2
+
+
+@pytest.mark.parametrize(
+    "validator, request_header",
+    [("etag", "If-None-Match"), ("last_modified", "If-Modified-Since")],
+)
+def test_expired_entry_is_revalidated_and_its_ttl_restarted(server, client, cache, validator, request_header):
+    value = '"v1"' if validator == "etag" else "Wed, 21 Oct 2026 07:28:00 GMT"
+    setattr(server, validator, value)
+    client.fetch_people()
+    _expire(cache)
+
+    assert client.fetch_people() == RECORDS
+    assert server.request_headers[1][request_header] == value
+    assert cache.stats["revalidated"] == 1
+
+    # O 304 reinicia o TTL: a próxima leitura não chega ao servidor.
+    assert client.fetch_people() == RECORDS
+    assert len(server.requests) == 2
+    assert cache.stats["hit"] == 1
+
+
+def test_changed_resource_replaces_the_entry(server, client, cache):
+    server.etag = '"v1"'
+    client.fetch_people()
+    _expire(cache)
+    server.etag = '"v2"'
+
+    assert client.fetch_people() == RECORDS
+
+    assert cache.stats["revalidated"] == 0
+    (meta_path,) = cache.directory.glob("*.meta")
+    assert json.loads(meta_path.read_text(encoding="utf-8"))["etag"] == '"v2"'
+
+
+def test_no_store_responses_are_not_cached(server, client, cache):
+    server.cache_control = "no-store"
+
+    client.fetch_people()
+    client.fetch_people()
+
+    assert len(server.requests) == 2
+    assert list(cache.directory.glob("*.body")) == []
+
+
+def test_expired_entry_is_served_when_the_database_is_down(server, client, cache):
+    client.fetch_people()
+    _expire(cache)
+    server.scripted = [(503, {})]
+
+    assert client.fetch_people() == RECORDS
+    assert cache.stats["stale"] == 1
+
+
+@pytest.mark.parametrize("status", [401, 403, 404])
+def test_client_errors_are_raised_instead_of_serving_the_expired_entry(server, client, cache, status):
+    client.fetch_people()
+    _expire(cache)
+    server.scripted = [(status, {})]
+
+    with pytest.raises(AstroDatabaseError, match=str(status)) as excinfo:
+        client.fetch_people()
+
+    assert not isinstance(excinfo.value, AstroDatabaseUnavailable)
+    assert cache.stats["stale"] == 0
+
+
+def test_entries_are_keyed_by_query_and_credential():
+    base = ResponseCache.make_key("http://db/people", {"limit": 5})
+
+    assert base == ResponseCache.make_key("http://db/people", {"limit": "5"})
+    assert base != ResponseCache.make_key("http://db/people", {"limit": 6})
+    assert base != ResponseCache.make_key("http://db/people", {"limit": 5}, "token")
+
+
+# ----------------------------------------------------------------------
+# Limite de tamanho (LRU) e escrita atômica
+# ----------------------------------------------------------------------
+def test_least_recently_used_entries_are_evicted_first(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=250)
+    cache.put("a", b"a" * 100, url="a")
+    cache.put("b", b"b" * 100, url="b")
+    now = time.time()
+    os.utime(tmp_path / "a.body", (now - 100, now - 100))
+    os.utime(tmp_path / "b.body", (now - 50, now - 50))
+
+    # Ler "a" o torna o mais recente: "b" passa a ser o primeiro da fila.
+    assert cache.get("a").body == b"a" * 100
+    cache.put("c", b"c" * 100, url="c")
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.stats["evicted"] == 1
+    assert not (tmp_path / "b.meta").exists()
+
+
+def test_bodies_larger_than_the_cache_are_not_stored(tmp_path):
+    cache = ResponseCache(tmp_path, max_bytes=10)
+
+    cache.put("big", b"x" * 11, url="big")
+
+    assert cache.get("big") is None
+    assert cache.stats["stored"] == 0
+
+
+def test_writes_are_atomic(tmp_path, monkeypatch):
+    cache = ResponseCache(tmp_path)
+    cache.put("key", b"old body", url="u", etag='"v1"')
+
+    def fail(*args):
+        raise OSError("disco cheio")
+
+    monkeypatch.setattr(astro_database_cache.os, "replace", fail)
+    with pytest.raises(OSError):
+        cache.put("key", b"new body that never lands", url="u", etag='"v2"')
+    monkeypatch.undo()
+
+    entry = cache.get("key")
+    assert (entry.body, entry.etag) == (b"old body", '"v1"')
+    assert [path.name for path in tmp_path.iterdir() if path.name.startswith(".tmp-")] == []
+
+
+def test_truncated_body_is_treated_as_a_miss(tmp_path):
+    cache = ResponseCache(tmp_path)
+    cache.put("key", b"complete body", url="u")
+
+    (tmp_path / "key.body").write_bytes(b"compl")
+
+    assert cache.get("key") is None
@@ -0,0 +1,352 @@
+"""Tests of the database client against a local mock server.
+
+Run with ``python -m pytest test_astro_database_client.py``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import threading
+from datetime import date, datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+try:
+    import pandas as pd
+except ImportError:  # pragma: no cover - dependência opcional
+    pd = None
+
+from astro_database_async import AsyncAstroDatabaseClient
+from astro_database_client import AstroDatabaseClient, AstroDatabaseError, build_query
+from astro_database_resilience import RetryPolicy
+from astro_database_standin import PAGINATION_STYLES, RESPONSE_FORMATS, StandinConfig, StandinServer
+
+
+RECORDS = [{"name": f"Pessoa {index}", "occupation": "ACTOR", "birth_year": 1900 + index} for index in range(7)]
+
+FETCH_METHODS = [
+    "fetch_people",
+    "fetch_cleaned_people",
+    "fetch_reduced_people",
+    "fetch_astrological_features",
+    "fetch_prepared_ml_dataset",
+]
+ITER_METHODS = [name.replace("fetch_", "iter_", 1) for name in FETCH_METHODS]
+
+
+class MockServer:
+    """Offset-paginated server that records the path and query of every request.
+
+    Uploads are recorded in ``uploads``; a batch containing a name from
+    ``failing_batches`` gets a ``500`` and names in ``rejected_records`` are
+    reported back as per-record errors.  ``scripted`` holds ``(status,
+    headers)`` answers that the next ``GET`` requests get instead of a page.
+    Pages carry ``etag``/``last_modified``/``cache_control`` when set, and a
+    request whose validators match gets ``304 Not Modified``.  ``page_cap``
+    limits every page below the requested ``limit`` and ``send_total`` adds
+    the collection size to the envelope.
+    """
+
+    def __init__(self) -> None:
+        self.requests = []
+        self.request_headers = []
+        self.scripted = []
+        self.etag = None
+        self.last_modified = None
+        self.cache_control = None
+        self.page_cap = None
+        self.send_total = False
+        self.uploads = []
+        self.failing_batches = set()
+        self.rejected_records = set()
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def do_GET(self) -> None:
+                parsed = urlparse(self.path)
+                query = {key: values[0] for key, values in parse_qs(parsed.query).items()}
+                server.requests.append((parsed.path, query))
+                server.request_headers.append(dict(self.headers))
+                if server.scripted:
+                    status, headers = server.scripted.pop(0)
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                cache_headers = {
+                    name: value
+                    for name, value in (
+                        ("ETag", server.etag),
+                        ("Last-Modified", server.last_modified),
+                        ("Cache-Control", server.cache_control),
+                    )
+                    if value
+                }
+                if (server.etag and self.headers.get("If-None-Match") == server.etag) or (
+                    server.last_modified and self.headers.get("If-Modified-Since") == server.last_modified
+                ):
+                    self.send_response(304)
+                    for name, value in cache_headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                offset = int(query.get("offset", 0))
+                limit = int(query.get("limit", len(RECORDS)))
+                if server.page_cap is not None:
+                    limit = min(limit, server.page_cap)
+                fields = query.get("fields")
+                page = RECORDS[offset:offset + limit]
+                if fields:
+                    page = [{key: row[key] for key in fields.split(",") if key in row} for row in page]
+                envelope = {"results": page}
+                if server.send_total:
+                    envelope["total"] = len(RECORDS)
+                body = json.dumps(envelope).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                for name, value in cache_headers.items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                records = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["records"]
+                server.uploads.append((self.command, urlparse(self.path).path, dict(self.headers), records))
+                names = {row.get("name") for row in records}
+                if names & server.failing_batches:
+                    self.send_response(500)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                errors = [
+                    {"index": index, "error": "duplicado"}
+                    for index, row in enumerate(records)
+                    if row.get("name") in server.rejected_records
+                ]
+                body = json.dumps({"accepted": len(records) - len(errors), "errors": errors}).encode("utf-8")
+                self.send_response(207 if errors else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_PUT = do_POST
+
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._httpd.daemon_threads = True
+        self.base_url = f"http://127.0.0.1:{self._httpd.server_port}"
+        threading.Thread(target=self._httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True).start()
+
+    def close(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    @property
+    def queries(self):
+        return [query for _, query in self.requests]
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.delenv("ASTRO_DB_CACHE_DIR", raising=False)
+    mock = MockServer()
+    yield mock
+    mock.close()
+
+
+@pytest.fixture
+def client(server):
+    return AstroDatabaseClient(base_url=server.base_url, retry_policy=RetryPolicy(max_retries=0))
+
+
+def test_fields_and_typed_filters_become_query_parameters(server, client):
+    records = client.fetch_people(
+        limit=3,
+        fields=["name", "birth_year"],
+        occupation="ACTOR",
+        birth_year__gte=1900,
+        alive=False,
+        updated__gt=datetime(2024, 5, 1, 12, 30),
+        birthdate__lt=date(1950, 1, 1),
+        country__in=["BR", "PT"],
+        bplace_name=None,
+    )
+
+    assert server.queries == [
+        {
+            "limit": "3",
+            "fields": "name,birth_year",
+            "occupation": "ACTOR",
+            "birth_year__gte": "1900",
+            "alive": "false",
+            "updated__gt": "2024-05-01T12:30:00",
+            "birthdate__lt": "1950-01-01",
+            "country__in": "BR,PT",
+        }
+    ]
+    assert records == [{"name": row["name"], "birth_year": row["birth_year"]} for row in RECORDS[:3]]
+
+
+@pytest.mark.parametrize("method", FETCH_METHODS)
+def test_every_fetch_method_pushes_down_fields(server, client, method):
+    getattr(client, method)(fields="name, occupation", occupation="ACTOR")
+
+    assert server.queries == [{"fields": "name,occupation", "occupation": "ACTOR"}]
+
+
+@pytest.mark.parametrize("method", ITER_METHODS)
+def test_every_iter_method_keeps_the_projection_on_every_page(server, client, method):
+    records = list(getattr(client, method)(page_size=3, fields=["name", "name"], birth_year__lte=1905))
+
+    assert [row["name"] for row in records] == [row["name"] for row in RECORDS]
+    assert all(set(row) == {"name"} for row in records)
+    # Sem ``total`` no envelope, o fim só é confirmado por uma página vazia.
+    assert [query.get("offset") for query in server.queries] == [None, "3", "6", "7"]
+    for query in server.queries:
+        assert query["fields"] == "name"
+        assert query["birth_year__lte"] == "1905"
+
+
+def test_projection_applies_to_dataframe_chunks(server, client):
+    frames = list(client.iter_people(page_size=4, as_frames=True, fields=["name"]))
+
+    assert [list(frame.columns) for frame in frames] == [["name"], ["name"]]
+    assert sum(len(frame) for frame in frames) == len(RECORDS)
+
+
+def test_async_client_pushes_down_fields(server):
+    async def fetch():
+        async with AsyncAstroDatabaseClient(base_url=server.base_url, page_size=3, concurrency=2) as db:
+            return await db.fetch_cleaned_people(fields=("name",), occupation={"ACTOR", "ACTRESS"})
+
+    records = asyncio.run(fetch())
+
+    assert len(records) == len(RECORDS)
+    assert {query["fields"] for query in server.queries} == {"name"}
+    assert {query["occupation"] for query in server.queries} == {"ACTOR,ACTRESS"}
+
+
+@pytest.mark.parametrize("send_total", [False, True])
+@pytest.mark.parametrize("as_frames", [False, True])
+def test_offset_pagination_survives_a_server_that_caps_page_size(server, client, send_total, as_frames):
+    server.page_cap = 2
+    server.send_total = send_total
+
+    items = list(client.iter_people(page_size=5, as_frames=as_frames))
+
+    names = [name for frame in items for name in frame["name"]] if as_frames else [row["name"] for row in items]
+    assert names == [row["name"] for row in RECORDS]
+    assert [query.get("offset") for query in server.queries] == [None, "2", "4", "6"] + ([] if send_total else ["7"])
+
+
+@pytest.mark.parametrize("send_total", [False, True])
+def test_async_client_survives_a_server_that_caps_page_size(server, send_total):
+    server.page_cap = 2
+    server.send_total = send_total
+
+    async def fetch():
+        async with AsyncAstroDatabaseClient(base_url=server.base_url, page_size=5, concurrency=2) as db:
+            return await db.fetch_people()
+
+    assert asyncio.run(fetch()) == RECORDS
+
+
+def test_unknown_operator_is_rejected_before_any_request(server, client):
+    with pytest.raises(AstroDatabaseError, match="Operador de filtro desconhecido"):
+        client.fetch_people(birth_year__between=(1900, 1950))
+
+    assert server.requests == []
+
+
+def test_comparison_operator_rejects_lists():
+    with pytest.raises(AstroDatabaseError, match="único valor"):
+        build_query(filters={"birth_year__gte": [1900, 1950]})
+
+
+def test_empty_projection_is_rejected():
+    with pytest.raises(AstroDatabaseError, match="pelo menos uma coluna"):
+        build_query(fields=[])
+
+
+def test_upload_sends_idempotent_batches(server, client):
+    report = client.upload_astrological_features(RECORDS, batch_size=3, concurrency=2)
+    keys = sorted(headers["Idempotency-Key"] for _, _, headers, _ in server.uploads)
+
+    assert report.ok
+    assert (report.records, report.batches, report.uploaded) == (7, 3, 7)
+    assert sorted(row["name"] for *_, batch in server.uploads for row in batch) == sorted(
+        row["name"] for row in RECORDS
+    )
+    assert {(method, path) for method, path, _, _ in server.uploads} == {("POST", "/astro-features")}
+    assert all(headers["Content-Type"] == "application/json" for _, _, headers, _ in server.uploads)
+
+    # Reenviar os mesmos lotes repete as chaves: o servidor pode descartar duplicatas.
+    server.uploads.clear()
+    client.upload_astrological_features(RECORDS, batch_size=3, concurrency=2)
+    assert sorted(headers["Idempotency-Key"] for _, _, headers, _ in server.uploads) == keys
+    assert len(set(keys)) == 3
+
+
+def test_upload_reports_partial_failures(server, client):
+    server.failing_batches = {"Pessoa 3"}
+    server.rejected_records = {"Pessoa 6"}
+
+    report = client.upload_prepared_ml_dataset(RECORDS, method="put", batch_size=3)
+
+    assert not report.ok
+    assert report.uploaded == 3
+    assert report.failed == 4
+    assert [(failure.start, failure.size) for failure in report.batch_failures] == [(3, 3)]
+    assert [(failure.position, failure.error) for failure in report.record_failures] == [(6, "duplicado")]
+    assert report.record_failures[0].record["name"] == "Pessoa 6"
+    assert {method for method, *_ in server.uploads} == {"PUT"}
+
+
+@pytest.mark.skipif(pd is None, reason="pandas não instalado")
+def test_upload_dataframe_sends_missing_values_as_null(server, client):
+    frame = pd.DataFrame({"name": ["A", "B"], "sun_degree": [12.5, float("nan")], "sun_house": [1, 2]})
+
+    report = client.upload_astrological_features(frame)
+
+    assert report.ok
+    assert server.uploads[0][3] == [
+        {"name": "A", "sun_degree": 12.5, "sun_house": 1},
+        {"name": "B", "sun_degree": None, "sun_house": 2},
+    ]
+
+
+def test_upload_rejects_unknown_method(server, client):
+    with pytest.raises(AstroDatabaseError, match="Método de envio inválido"):
+        client.upload_astrological_features(RECORDS, method="PATCH")
+
+    assert server.uploads == []
+
+
+@pytest.mark.parametrize("response_format", RESPONSE_FORMATS)
+@pytest.mark.parametrize("pagination", PAGINATION_STYLES)
+@pytest.mark.parametrize("as_frames", [False, True])
+def test_iteration_walks_every_pagination_style_of_the_standin(monkeypatch, pagination, response_format, as_frames):
+    monkeypatch.delenv("ASTRO_DB_CACHE_DIR", raising=False)
+    config = StandinConfig(records=25, pagination=pagination, response_format=response_format)
+
+    with StandinServer(config) as standin:
+        client = AstroDatabaseClient(base_url=standin.base_url, page_size=5, retry_policy=RetryPolicy(max_retries=0))
+        items = list(client.iter_people(as_frames=as_frames, fields=["name"]))
+
+    names = [name for frame in items for name in frame["name"]] if as_frames else [row["name"] for row in items]
+    assert len(names) == 25
+    assert len(set(names)) == 25
+    # 5 páginas cheias; o offset em NDJSON (sem ``total``) confirma o fim com uma página vazia.
+    assert standin.requests == (6 if (pagination, response_format) == ("offset", "ndjson") else 5)
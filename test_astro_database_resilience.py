@@ -0,0 +1,236 @@
+"""Tests of retries, backoff, ``Retry-After`` and the circuit breaker.
+
+Run with ``python -m pytest test_astro_database_resilience.py``.
+"""
+
+from __future__ import annotations
+
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+import astro_database_client
+import astro_database_resilience
+from astro_database_client import AstroDatabaseClient, AstroDatabaseError
+from astro_database_resilience import CircuitBreaker, CircuitOpenError, RetryPolicy, breaker_for, parse_retry_after
+from test_astro_database_client import RECORDS, MockServer
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.delenv("ASTRO_DB_CACHE_DIR", raising=False)
+    mock = MockServer()
+    yield mock
+    mock.close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Delays the client would have slept, without sleeping."""
+
+    delays = []
+    monkeypatch.setattr(astro_database_client.time, "sleep", delays.append)
+    return delays
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(astro_database_resilience.time, "monotonic", lambda: now[0])
+    return now
+
+
+# ----------------------------------------------------------------------
+# Backoff e Retry-After
+# ----------------------------------------------------------------------
+def test_backoff_is_full_jitter_capped_at_backoff_max(monkeypatch):
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=3.0)
+    bounds = []
+    monkeypatch.setattr(astro_database_resilience.random, "uniform", lambda low, high: bounds.append((low, high)) or high)
+
+    delays = [policy.delay(attempt) for attempt in range(5)]
+
+    assert bounds == [(0, 0.5), (0, 1.0), (0, 2.0), (0, 3.0), (0, 3.0)]
+    assert delays == [0.5, 1.0, 2.0, 3.0, 3.0]
+
+
+def test_retry_after_overrides_backoff_and_is_clamped():
+    policy = RetryPolicy(backoff_base=0.5, backoff_max=10.0)
+
+    assert policy.delay(0, retry_after=4.0) == 4.0
+    assert policy.delay(3, retry_after=60.0) == 10.0
+    assert policy.delay(0, retry_after=-5.0) == 0.0
+
+
+def test_parse_retry_after_reads_seconds_and_http_dates():
+    later = datetime.now(timezone.utc) + timedelta(seconds=120)
+
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(format_datetime(later, usegmt=True)) == pytest.approx(120, abs=2)
+    assert parse_retry_after("soon") is None
+    assert parse_retry_after(None) is None
+
+
+def test_retry_policy_from_env(monkeypatch):
+    monkeypatch.setenv("ASTRO_DB_MAX_RETRIES", "7")
+    monkeypatch.setenv("ASTRO_DB_BACKOFF_BASE", "0.25")
+
+    policy = RetryPolicy.from_env()
+
+    assert (policy.max_retries, policy.backoff_base, policy.backoff_max) == (7, 0.25, 30.0)
+
+
+def test_client_retries_retryable_statuses_honouring_retry_after(server, sleeps):
+    server.scripted = [(503, {"Retry-After": "2"}), (429, {"Retry-After": "1"})]
+    client = AstroDatabaseClient(base_url=server.base_url, retry_policy=RetryPolicy(max_retries=3))
+
+    assert client.fetch_people() == RECORDS
+    assert sleeps == [2.0, 1.0]
+    (summary,) = client.metrics.summary()
+    assert (summary["requests"], summary["errors"], summary["retries"]) == (3, 2, 2)
+
+
+def test_retried_responses_are_closed_before_sleeping(server, monkeypatch):
+    events = []
+    close = requests.Response.close
+    monkeypatch.setattr(requests.Response, "close", lambda self: events.append(("close", self.status_code)) or close(self))
+    monkeypatch.setattr(astro_database_client.time, "sleep", lambda delay: events.append(("sleep", delay)))
+    monkeypatch.setattr(astro_database_resilience.random, "uniform", lambda low, high: high)
+    server.scripted = [(503, {}), (429, {"Retry-After": "1"})]
+    client = AstroDatabaseClient(base_url=server.base_url, retry_policy=RetryPolicy(max_retries=2, backoff_base=0.1))
+
+    assert list(client.iter_people(as_frames=True))
+
+    assert events[:4] == [("close", 503), ("sleep", 0.1), ("close", 429), ("sleep", 1.0)]
+
+
+def test_client_backs_off_exponentially_without_retry_after(server, sleeps, monkeypatch):
+    monkeypatch.setattr(astro_database_resilience.random, "uniform", lambda low, high: high)
+    server.scripted = [(502, {})] * 3
+    policy = RetryPolicy(max_retries=3, backoff_base=0.1, backoff_max=30.0)
+    client = AstroDatabaseClient(base_url=server.base_url, retry_policy=policy)
+
+    assert client.fetch_people() == RECORDS
+    assert sleeps == pytest.approx([0.1, 0.2, 0.4])
+
+
+def test_client_gives_up_after_max_retries(server, sleeps):
+    server.scripted = [(500, {})] * 3
+    client = AstroDatabaseClient(base_url=server.base_url, retry_policy=RetryPolicy(max_retries=2))
+
+    with pytest.raises(AstroDatabaseError, match="3 tentativas"):
+        client.fetch_people()
+    assert len(sleeps) == 2
+    assert len(server.requests) == 3
+
+
+# ----------------------------------------------------------------------
+# Circuit breaker
+# ----------------------------------------------------------------------
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("teste", failure_threshold=3, reset_timeout=30.0)
+
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.before_call()
+    breaker.record_success()
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+    # O sucesso no meio zerou a contagem: só a terceira falha seguida abre.
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_half_open_lets_one_trial_through(clock):
+    breaker = CircuitBreaker("teste", failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+
+    clock[0] += 29.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    clock[0] += 1.0
+    breaker.before_call()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.before_call()
+
+
+def test_failed_trial_reopens_the_circuit(clock):
+    breaker = CircuitBreaker("teste", failure_threshold=5, reset_timeout=30.0)
+    for _ in range(5):
+        breaker.record_failure()
+
+    clock[0] += 30.0
+    breaker.before_call()
+    breaker.record_failure()
+
+    # Uma única falha no meio-aberto reabre e reinicia a espera.
+    assert breaker.state == CircuitBreaker.OPEN
+    clock[0] += 29.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_released_trial_does_not_block_the_half_open_circuit(clock):
+    breaker = CircuitBreaker("teste", failure_threshold=1, reset_timeout=30.0)
+    breaker.record_failure()
+    clock[0] += 30.0
+
+    breaker.before_call()
+    breaker.release_trial()
+
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    breaker.before_call()
+
+
+def test_open_circuit_rejects_requests_without_reaching_the_server(server, monkeypatch):
+    monkeypatch.setenv("ASTRO_DB_BREAKER_THRESHOLD", "2")
+    server.scripted = [(503, {})] * 2
+    client = AstroDatabaseClient(base_url=server.base_url, retry_policy=RetryPolicy(max_retries=0))
+
+    for _ in range(2):
+        with pytest.raises(AstroDatabaseError):
+            client.fetch_people()
+    with pytest.raises(AstroDatabaseError, match="Circuito"):
+        client.fetch_people()
+
+    assert breaker_for(server.base_url).state == CircuitBreaker.OPEN
+    assert len(server.requests) == 2
+    assert client.metrics.summary()[0]["rejected"] == 1
+
+
+def test_client_errors_do_not_open_the_circuit(server, monkeypatch):
+    monkeypatch.setenv("ASTRO_DB_BREAKER_THRESHOLD", "1")
+    server.scripted = [(404, {})] * 3
+    client = AstroDatabaseClient(base_url=server.base_url, retry_policy=RetryPolicy(max_retries=0))
+
+    for _ in range(3):
+        with pytest.raises(AstroDatabaseError):
+            client.fetch_people()
+
+    assert breaker_for(server.base_url).state == CircuitBreaker.CLOSED
+
+
+@pytest.mark.parametrize("base_url", ["missing-schema.invalid", "http://", "http://bad host.invalid"])
+def test_invalid_urls_do_not_open_the_circuit(base_url, monkeypatch):
+    # Cada caso tem sua URL base e, portanto, seu próprio disjuntor.
+    monkeypatch.setenv("ASTRO_DB_BREAKER_THRESHOLD", "1")
+    client = AstroDatabaseClient(base_url=base_url, retry_policy=RetryPolicy(max_retries=3))
+
+    for _ in range(3):
+        with pytest.raises(AstroDatabaseError, match="Invalid URL|Failed to parse|No scheme"):
+            client.fetch_people()
+
+    assert breaker_for(base_url).state == CircuitBreaker.CLOSED
@@ -0,0 +1,240 @@
+"""Tests of the incremental JSON/NDJSON parsers and the column buffer.
+
+Run with ``python -m pytest test_astro_database_stream.py``.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+
+import numpy as np
+import pytest
+
+from astro_database_stream import (
+    ColumnBuffer,
+    JsonRecordParser,
+    NdjsonRecordParser,
+    StreamParseError,
+    iter_chunks,
+    parse_into_columns,
+)
+
+
+RECORDS = [
+    {"name": "Zoë \"Z\" Ångström", "year": 1879, "score": 1.5e-3, "alive": False, "tags": ["a", "b"]},
+    {"name": "back\\slash ☼ \U0001f52d", "year": -469, "score": 12345678901, "alive": True, "tags": []},
+    {"name": "tab\tnew\nline", "year": 2000, "score": None, "alive": None, "tags": None},
+]
+ENVELOPE = {"total": 3, "next": None, "meta": {"results": "not the records", "page": [1, 2]}}
+
+
+def _feed(parser, body: bytes, size: int):
+    records = []
+    for chunk in iter_chunks(body, size):
+        records.extend(parser.feed(chunk))
+    records.extend(parser.close())
+    return records
+
+
+def _enveloped_body(key: str = "results") -> bytes:
+    # Chaves do envelope antes e depois da lista de registros.
+    text = json.dumps({"total": 3, "next": None, key: RECORDS, "meta": ENVELOPE["meta"]}, ensure_ascii=False)
+    return text.encode("utf-8")
+
+
+# ----------------------------------------------------------------------
+# Parser JSON
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("size", [1, 2, 3, 7, 64, 1 << 20])
+def test_every_chunk_boundary_gives_the_same_records(size):
+    # Blocos de 1 byte cortam chaves, números, escapes (\", \\, \t) e caracteres UTF-8 multibyte.
+    parser = JsonRecordParser()
+
+    assert _feed(parser, _enveloped_body(), size) == RECORDS
+    assert parser.envelope == ENVELOPE
+    assert parser.found_records
+
+
+@pytest.mark.parametrize("body", [b'[1.5,-2e3,true]', b'[12345]', b'[ null , false ]'])
+def test_scalars_split_at_the_end_of_a_chunk_wait_for_the_next_one(body):
+    for split in range(1, len(body)):
+        parser = JsonRecordParser()
+        records = parser.feed(body[:split]) + parser.feed(body[split:]) + parser.close()
+
+        assert records == json.loads(body), split
+
+
+@pytest.mark.parametrize("key", ["results", "data", "items", "records"])
+def test_record_key_is_discovered_in_the_envelope(key):
+    parser = JsonRecordParser()
+
+    assert _feed(parser, _enveloped_body(key), 5) == RECORDS
+    assert key not in parser.envelope
+
+
+def test_bare_array_has_no_envelope():
+    parser = JsonRecordParser()
+
+    assert _feed(parser, json.dumps(RECORDS).encode(), 4) == RECORDS
+    assert parser.envelope is None and parser.found_records
+
+
+def test_envelope_without_records_is_reported():
+    parser = JsonRecordParser()
+
+    assert _feed(parser, b'{"detail": "not found", "code": 404}', 3) == []
+    assert parser.envelope == {"detail": "not found", "code": 404}
+    assert not parser.found_records
+
+
+def test_only_the_first_record_array_is_streamed():
+    parser = JsonRecordParser()
+
+    assert _feed(parser, b'{"data": [1], "results": [2]}', 1) == [1]
+    assert parser.envelope == {"results": [2]}
+
+
+def test_custom_record_keys():
+    parser = JsonRecordParser(record_keys=("people",))
+
+    assert _feed(parser, b'{"results": [0], "people": [1, 2]}', 2) == [1, 2]
+    assert parser.envelope == {"results": [0]}
+
+
+def test_empty_containers():
+    for body, envelope in [(b"[]", None), (b"{}", {}), (b'{"results": []}', {})]:
+        parser = JsonRecordParser()
+        assert _feed(parser, body, 1) == []
+        assert parser.envelope == envelope
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'[1,,2]',
+        b'[1 2]',
+        b'[,1]',
+        b'[1,]',
+        b'{"a": 1 "b": 2}',
+        b'{,"a": 1}',
+        b'{"a": 1,}',
+        b'{1: 2}',
+        b'{"a" 1}',
+        b'{"results": [1] "total": 1}',
+        b'"just a string"',
+        b'[1] [2]',
+        b'[1',
+        b'{"results": [1, 2',
+        b'{"total": 3',
+        b'{"a": tru}',
+        b'["unterminated \\u00e',
+        b'\xff[]',
+        b'["\xc3"]',
+    ],
+)
+@pytest.mark.parametrize("size", [1, 1 << 20])
+def test_malformed_json_raises_stream_parse_error(body, size):
+    with pytest.raises(StreamParseError):
+        _feed(JsonRecordParser(), body, size)
+
+
+# ----------------------------------------------------------------------
+# Parser NDJSON
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("size", [1, 5, 1 << 20])
+def test_ndjson_lines_split_across_chunks(size):
+    body = "\n".join(json.dumps(record, ensure_ascii=False) for record in RECORDS).encode("utf-8")
+    # Linhas em branco, CRLF e a falta de quebra de linha final são aceitas.
+    body = b"\r\n" + body.replace(b"\n", b"\r\n\n") + b"\n\n" + b'{"last": 1}'
+
+    assert _feed(NdjsonRecordParser(), body, size) == RECORDS + [{"last": 1}]
+
+
+@pytest.mark.parametrize("body", [b'{"a": 1}\n{"a": \n', b'{"a": 1}\n[1,\n', b"\xff\n", b'{"a": 1}\n{"a"'])
+def test_malformed_ndjson_raises_stream_parse_error(body):
+    with pytest.raises(StreamParseError):
+        _feed(NdjsonRecordParser(), body, 3)
+
+
+def test_parse_into_columns_picks_the_parser_from_the_content_type():
+    ndjson = b'{"a": 1}\n{"a": 2}\n'
+    buffer, envelope, found = parse_into_columns(iter_chunks(ndjson, 4), "application/x-ndjson; charset=utf-8")
+    assert (buffer.to_records(), envelope, found) == ([{"a": 1}, {"a": 2}], None, True)
+
+    buffer, envelope, found = parse_into_columns(iter_chunks(b'{"items": [{"a": 1}], "n": 1}', 4), "application/json")
+    assert (buffer.to_records(), envelope, found) == ([{"a": 1}], {"n": 1}, True)
+
+
+def test_non_object_records_are_rejected():
+    with pytest.raises(StreamParseError):
+        parse_into_columns([b"[1, 2]"])
+
+
+# ----------------------------------------------------------------------
+# ColumnBuffer
+# ----------------------------------------------------------------------
+def test_numeric_columns_use_typed_buffers():
+    buffer = ColumnBuffer()
+    for index in range(4):
+        buffer.append({"id": index, "score": index / 2, "flag": index % 2 == 0})
+
+    frame = buffer.to_frame()
+
+    assert [str(dtype) for dtype in frame.dtypes] == ["int64", "float64", "bool"]
+    assert buffer.memory_bytes() == 4 * (8 + 8 + 1)
+    assert frame["id"].tolist() == [0, 1, 2, 3]
+
+
+@pytest.mark.parametrize(
+    "values, dtype, expected",
+    [
+        ([1, 2.5], "float64", [1.0, 2.5]),
+        ([1, None], "float64", [1.0, math.nan]),
+        ([1, 2**63], "object", [1, 2**63]),
+        ([1, "x"], "object", [1, "x"]),
+        ([1.5, "x"], "object", [1.5, "x"]),
+        ([1.5, None, "x"], "object", [1.5, None, "x"]),
+        ([True, 1], "object", [True, 1]),
+        ([None, 3], "object", [None, 3]),
+    ],
+)
+def test_columns_are_promoted_without_losing_values(values, dtype, expected):
+    buffer = ColumnBuffer()
+    for value in values:
+        buffer.append({"value": value})
+
+    column = buffer.to_frame()["value"]
+
+    assert str(column.dtype) == dtype
+    assert [None if isinstance(value, float) and math.isnan(value) else value for value in column] == [
+        None if isinstance(value, float) and math.isnan(value) else value for value in expected
+    ]
+
+
+def test_missing_and_late_columns_are_backfilled():
+    buffer = ColumnBuffer()
+    buffer.append({"name": "a"})
+    buffer.append({"name": "b", "year": 1900, "place": "Rio"})
+    buffer.append({"year": 2000})
+
+    frame = buffer.to_frame()
+
+    assert buffer.columns == ["name", "year", "place"]
+    assert frame.isna().to_numpy().tolist() == [[False, True, True], [False, False, False], [True, False, True]]
+    assert frame["name"].tolist()[:2] == ["a", "b"]
+    assert frame["year"].tolist()[1:] == [1900.0, 2000.0]
+    assert frame["place"][1] == "Rio"
+
+
+def test_truncate_and_empty_buffer():
+    buffer = ColumnBuffer()
+    for index in range(5):
+        buffer.append({"id": index, "name": str(index)})
+
+    buffer.truncate(2)
+
+    assert len(buffer) == 2
+    assert buffer.to_records() == [{"id": 0, "name": "0"}, {"id": 1, "name": "1"}]
+    assert len(ColumnBuffer().to_frame()) == 0
+    assert buffer.truncate(0).to_frame()["id"].dtype == np.int64
@@ -0,0 +1,128 @@
+"""Tests of the single-pass samplers of the reduced dataset.
+
+Run with ``python -m pytest test_create_reduced_dataset.py``.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from create_reduced_dataset import draw_sample, head_sample, reservoir_sample, stratified_sample
+
+
+CHUNK_SIZES = [3, 7, 64, 250, 10_000]
+# Classes desbalanceadas: uma dominante, uma média, uma rara e linhas sem ocupação.
+CLASS_SIZES = {"ACTOR": 600, "POLITICIAN": 120, "ASTRONAUT": 6, None: 4}
+
+
+def _source() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    occupations = [label for label, count in CLASS_SIZES.items() for _ in range(count)]
+    rng.shuffle(occupations)
+    return pd.DataFrame({"name": [f"Pessoa {index}" for index in range(len(occupations))], "occupation": occupations})
+
+
+def _chunks(frame: pd.DataFrame, size: int):
+    for start in range(0, len(frame), size):
+        yield frame.iloc[start:start + size]
+
+
+@pytest.fixture(scope="module")
+def source():
+    return _source()
+
+
+# ----------------------------------------------------------------------
+# Reservatório
+# ----------------------------------------------------------------------
+def test_reservoir_sample_does_not_depend_on_chunksize(source):
+    samples = [reservoir_sample(_chunks(source, size), 50, seed=3) for size in CHUNK_SIZES]
+
+    for sample, read in samples:
+        assert read == len(source)
+        pd.testing.assert_frame_equal(sample, samples[0][0])
+
+
+def test_reservoir_sample_keeps_input_order_and_rows(source):
+    sample, _ = reservoir_sample(_chunks(source, 64), 50, seed=3)
+
+    positions = sample["name"].str.removeprefix("Pessoa ").astype(int)
+    assert len(sample) == 50
+    assert positions.is_monotonic_increasing and positions.is_unique
+    assert list(sample.columns) == ["name", "occupation"]
+    pd.testing.assert_frame_equal(sample, source.iloc[positions].reset_index(drop=True), check_index_type=False)
+
+
+def test_reservoir_sample_depends_on_the_seed(source):
+    first, _ = reservoir_sample(_chunks(source, 64), 50, seed=1)
+    second, _ = reservoir_sample(_chunks(source, 64), 50, seed=2)
+
+    assert not first.equals(second)
+
+
+def test_reservoir_smaller_than_the_sample_returns_everything(source):
+    sample, read = reservoir_sample(_chunks(source, 64), 10 * len(source))
+
+    assert read == len(sample) == len(source)
+    pd.testing.assert_frame_equal(sample, source)
+
+
+# ----------------------------------------------------------------------
+# Estratificada
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("per_class_cap", [None, 20])
+def test_stratified_sample_does_not_depend_on_chunksize(source, per_class_cap):
+    samples = [stratified_sample(_chunks(source, size), 60, seed=3, per_class_cap=per_class_cap) for size in CHUNK_SIZES]
+
+    for sample, read in samples:
+        assert read == len(source)
+        pd.testing.assert_frame_equal(sample, samples[0][0])
+
+
+def test_stratified_sample_splits_evenly_between_classes(source):
+    sample, _ = stratified_sample(_chunks(source, 64), 60, seed=3)
+
+    counts = sample["occupation"].fillna("-").value_counts().to_dict()
+    # As classes raras entram inteiras; o restante se divide igualmente entre as grandes.
+    assert counts["ASTRONAUT"] == 6 and counts["-"] == 4
+    assert (counts["ACTOR"], counts["POLITICIAN"]) == (25, 25)
+
+
+@pytest.mark.parametrize("per_class_cap", [1, 5, 20])
+def test_stratified_per_class_cap_holds(source, per_class_cap):
+    sample, _ = stratified_sample(_chunks(source, 7), 1000, seed=3, per_class_cap=per_class_cap)
+
+    counts = sample["occupation"].value_counts(dropna=False)
+    assert counts.max() == per_class_cap
+    expected = sum(min(per_class_cap, count) for count in CLASS_SIZES.values())
+    assert len(sample) == expected
+
+
+def test_stratified_sample_requires_the_column(source):
+    with pytest.raises(ValueError, match="estratificação"):
+        stratified_sample(_chunks(source.drop(columns="occupation"), 64), 10)
+
+
+# ----------------------------------------------------------------------
+# Primeiras linhas e validação
+# ----------------------------------------------------------------------
+def test_head_sample_stops_reading_early(source):
+    consumed = []
+
+    def chunks():
+        for chunk in _chunks(source, 10):
+            consumed.append(len(chunk))
+            yield chunk
+
+    sample, read = head_sample(chunks(), 25)
+
+    assert read == 25 and len(consumed) == 3
+    pd.testing.assert_frame_equal(sample, source.head(25))
+
+
+@pytest.mark.parametrize("mode, size", [("random", 10), ("reservoir", 0)])
+def test_draw_sample_validates_its_arguments(source, mode, size):
+    with pytest.raises(ValueError):
+        draw_sample(_chunks(source, 64), mode, size)
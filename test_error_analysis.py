@@ -0,0 +1,59 @@
+"""Tests of the streaming error analysis against scikit-learn.
+
+Run with ``python -m pytest test_error_analysis.py``.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.metrics import top_k_accuracy_score
+
+from error_analysis import analyze_predictions
+
+
+N_ROWS = 2000
+N_CLASSES = 50
+TOP_K = (1, 3, 5)
+
+
+def _sparse_proba(rng):
+    """Random-forest-like probabilities: a few classes with mass, the rest exactly zero."""
+
+    proba = np.zeros((N_ROWS, N_CLASSES), dtype=np.float32)
+    for row in proba:
+        votes = rng.choice(N_CLASSES, size=rng.integers(1, 4), replace=False)
+        row[votes] = rng.integers(1, 10, size=len(votes))
+    return proba / proba.sum(axis=1, keepdims=True)
+
+
+def _dense_proba(rng):
+    proba = rng.dirichlet(np.ones(N_CLASSES), size=N_ROWS).astype(np.float32)
+    # Empates entre probabilidades positivas também precisam seguir o scikit-learn.
+    return np.round(proba, 2)
+
+
+@pytest.mark.parametrize("make_proba", [_sparse_proba, _dense_proba])
+def test_topk_accuracy_matches_scikit_learn(make_proba):
+    rng = np.random.default_rng(0)
+    proba = make_proba(rng)
+    y_true = rng.integers(0, N_CLASSES, size=N_ROWS)
+    classes = np.arange(N_CLASSES)
+
+    # Blocos pequenos: o resultado não pode depender do tamanho do bloco.
+    analysis = analyze_predictions(y_true, proba, classes, N_CLASSES, top_k=TOP_K, memory_budget=64 * 1024)
+
+    accuracy = analysis.topk_accuracy()
+    for k in TOP_K:
+        expected = top_k_accuracy_score(y_true, proba, k=k, labels=classes)
+        assert accuracy[k] == pytest.approx(expected)
+    assert accuracy[5] < 0.5
+
+
+def test_true_class_without_mass_is_not_a_hit():
+    proba = np.array([[0.0, 0.7, 0.3, 0.0], [0.0, 0.0, 1.0, 0.0]], dtype=np.float32)
+    y_true = np.array([0, 0])
+
+    analysis = analyze_predictions(y_true, proba, np.arange(4), 4, top_k=(3,))
+
+    assert analysis.topk_accuracy()[3] == 0.0
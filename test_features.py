@@ -1,6 +1,8 @@
 import pandas as pd
 import json
 
+import feature_registry
+
 # Carregar dados preparados
 df_prepared = pd.read_csv('prepared_ml_data.csv')
 feature_names = df_prepared.drop(columns=['name', 'occupation', 'occupation_encoded']).columns.tolist()
@@ -14,16 +16,16 @@ print("\nÚltimas 20 features:")
 for i, feat in enumerate(feature_names[-20:]):
     print(f"{len(feature_names)-19+i}. {feat}")
 
-# Verificar quais colunas são categóricas
-categorical_cols = [col for col in df_prepared.columns if 'sign' in col or 'element' in col or 'modality' in col]
+# Verificar quais colunas são categóricas (declaradas no registro de features)
+categorical_cols = list(feature_registry.ONE_HOT_FEATURES)
 print(f"\nTotal de colunas categóricas originais: {len(categorical_cols)}")
 print("Colunas categóricas:")
 for col in categorical_cols:
     print(f"  - {col}")
 
-# Verificar quais colunas são numéricas
-numeric_cols = [col for col in df_prepared.columns if 'house' in col]
-print(f"\nTotal de colunas numéricas (casas): {len(numeric_cols)}")
+# Verificar quais colunas são numéricas (casas, graus e contagens do registro)
+numeric_cols = feature_registry.present(feature_registry.PREPARED_DTYPES, df_prepared.columns)
+print(f"\nTotal de colunas numéricas: {len(numeric_cols)}")
 print("Colunas numéricas:")
 for col in numeric_cols:
     print(f"  - {col}")
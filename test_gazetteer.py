@@ -0,0 +1,116 @@
+"""Tests of the offline place-name index.
+
+Run with ``python -m pytest test_gazetteer.py``.
+"""
+
+from __future__ import annotations
+
+import pytest
+
+from gazetteer import Gazetteer, load_gazetteer, normalize_name
+
+
+PLACES = [
+    ("Pisa, Italy", 43.7228, 10.4017, 3),
+    ("Vinci, Italy", 43.7870, 10.9270, 1),
+    ("Caprese Michelangelo, Italy", 43.6410, 11.9850, 2),
+    ("São Paulo, Brazil", -23.5505, -46.6333, 5),
+    ("Warsaw, Poland", 52.2297, 21.0122, 2),
+    ("Paris, France", 48.8566, 2.3522, 4),
+    ("Singapore, Singapore", 1.3521, 103.8198, 1),
+]
+
+
+@pytest.fixture(scope="module")
+def gazetteer():
+    return Gazetteer(PLACES)
+
+
+# ----------------------------------------------------------------------
+# Normalização e prefixos
+# ----------------------------------------------------------------------
+def test_normalize_name_folds_case_accents_and_punctuation():
+    assert normalize_name("  São Paulo, Brazil ") == "sao paulo brazil"
+    assert normalize_name("Zürich—Oerlikon_(ZH)!") == "zurich oerlikon zh"
+
+
+def test_places_with_the_same_normalized_name_are_merged():
+    gazetteer = Gazetteer(PLACES + [("Sao Paulo,  BRAZIL", 0.0, 0.0, 1), ("", 1.0, 1.0, 9)])
+
+    assert len(gazetteer) == len(PLACES)
+    match = gazetteer.geocode("sao paulo brazil")
+    # Fica a grafia e a coordenada mais frequentes; os pesos somam.
+    assert (match.name, match.latitude, match.weight) == ("São Paulo, Brazil", -23.5505, 6)
+
+
+@pytest.mark.parametrize(
+    "prefix, names",
+    [
+        ("sa", ["São Paulo, Brazil"]),
+        ("SÃO P", ["São Paulo, Brazil"]),
+        ("paulo", ["São Paulo, Brazil"]),
+        ("mich", ["Caprese Michelangelo, Italy"]),
+        # Nomes que começam com o prefixo vêm antes dos que só têm uma palavra com ele.
+        ("pa", ["Paris, France", "São Paulo, Brazil"]),
+        ("zz", []),
+        ("", []),
+    ],
+)
+def test_complete_matches_word_prefixes(gazetteer, prefix, names):
+    assert [match.name for match in gazetteer.complete(prefix)] == names
+
+
+def test_complete_scores_and_limit(gazetteer):
+    matches = gazetteer.complete("i", 2)
+
+    assert [match.name for match in matches] == ["Pisa, Italy", "Caprese Michelangelo, Italy"]
+    assert {match.score for match in matches} == {0.9}
+
+
+@pytest.mark.parametrize(
+    "query, name",
+    [("Sao Paolo", "São Paulo, Brazil"), ("warsaw polnd", "Warsaw, Poland"), ("Pisa Itly", "Pisa, Italy")],
+)
+def test_fuzzy_finds_misspelled_names(gazetteer, query, name):
+    assert gazetteer.fuzzy(query, 1, 0.5)[0].name == name
+
+
+def test_search_tops_up_prefix_matches_with_fuzzy_ones(gazetteer):
+    assert [match.name for match in gazetteer.search("Warsaw Polnd", 3)] == ["Warsaw, Poland"]
+    assert [match.name for match in gazetteer.search("sing", 3)] == ["Singapore, Singapore"]
+
+
+def test_bundled_gazetteer_is_loaded(tmp_path):
+    gazetteer = load_gazetteer([tmp_path / "missing.csv"])
+
+    assert gazetteer.geocode("São Paulo").name == "São Paulo, Brazil"
+
+
+# ----------------------------------------------------------------------
+# Geocodificação
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize(
+    "query, name",
+    [
+        ("pisa, italy", "Pisa, Italy"),
+        ("SAO PAULO brazil", "São Paulo, Brazil"),
+        ("Warsaw Polnd", "Warsaw, Poland"),
+        ("Paris", "Paris, France"),
+        ("Singapore", "Singapore, Singapore"),
+    ],
+)
+def test_geocode_accepts_exact_and_close_names(gazetteer, query, name):
+    assert gazetteer.geocode(query).name == name
+
+
+@pytest.mark.parametrize("query", ["ital", "Italy", "itály", "war", "xyz", ""])
+def test_geocode_rejects_prefixes_and_bare_countries(gazetteer, query):
+    assert gazetteer.geocode(query) is None
+
+
+def test_autocomplete_still_ranks_prefix_matches(gazetteer):
+    assert [match.name for match in gazetteer.search("ital", 3)] == [
+        "Pisa, Italy",
+        "Caprese Michelangelo, Italy",
+        "Vinci, Italy",
+    ]
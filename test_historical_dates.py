@@ -0,0 +1,125 @@
+"""Tests of the historical date parser (known Julian Day Numbers and eras).
+
+Run with ``python -m pytest test_historical_dates.py``.
+"""
+
+from __future__ import annotations
+
+from datetime import date
+
+import pytest
+
+from historical_dates import PATHS, gregorian_date, julian_day_number, parse_dates
+
+
+def _single(value, **kwargs):
+    parsed = parse_dates([value], **kwargs)
+    return parsed, (int(parsed.year[0]), int(parsed.month[0]), int(parsed.day[0])), int(parsed.jdn[0])
+
+
+@pytest.mark.parametrize(
+    "value, calendar, jdn",
+    [
+        ("2000-01-01", "gregorian", 2451545),
+        ("1582-10-04", "julian", 2299160),
+        ("1582-10-15", "gregorian", 2299161),
+        ("-4712-01-01", "julian", 0),
+        # ``auto`` troca de calendário na reforma: os dois lados ficam contíguos.
+        ("1582-10-04", "auto", 2299160),
+        ("1582-10-15", "auto", 2299161),
+    ],
+)
+def test_known_julian_day_numbers(value, calendar, jdn):
+    parsed, _, result = _single(value, calendar=calendar)
+
+    assert parsed.valid[0]
+    assert result == jdn
+
+
+def test_julian_day_number_matches_the_scalar_formula():
+    assert julian_day_number([2000, 1582], [1, 10], [1, 4], [False, True]).tolist() == [2451545, 2299160]
+
+
+def test_explicit_bce_era_is_historical():
+    parsed, components, _ = _single("470 BC")
+
+    assert parsed.valid[0]
+    assert components == (-469, 1, 1)
+    assert PATHS[parsed.path[0]] == "fallback"
+
+
+@pytest.mark.parametrize("negative_years, year", [("astronomical", -469), ("historical", -468)])
+def test_negative_year_conventions(negative_years, year):
+    parsed, components, _ = _single("-0469", negative_years=negative_years)
+
+    assert parsed.valid[0]
+    assert components == (year, 1, 1)
+    # 470 a.C. escrito como era explícita e como ano ISO dá o mesmo dia.
+    if negative_years == "astronomical":
+        assert parsed.jdn[0] == _single("470 BC")[2]
+
+
+def test_negative_full_dates_use_the_fast_path():
+    parsed = parse_dates(["-0469-03-01", "1066-10-14", "1066", None], negative_years="historical")
+
+    assert parsed.year.tolist()[:3] == [-468, 1066, 1066]
+    assert [PATHS[index] for index in parsed.path] == ["fast", "fast", "fallback", "missing"]
+    assert parsed.counts == {"fast": 2, "fallback": 1, "invalid": 0, "missing": 1}
+
+
+@pytest.mark.parametrize(
+    "value, path",
+    [
+        ("2000-01-01 12:30", "fast"),
+        ("2000-01-01T12:30:00", "fast"),
+        ("-0469-03-01 12:00", "fast"),
+        ("2000-01-01T12:30:00Z", "fallback"),
+        ("2000-01-01 12:30:00.5+01:00", "fallback"),
+        ("2000-01-01 garbage", "invalid"),
+        ("2000-01-01T", "invalid"),
+        ("2000-01-01 12:30:00x", "invalid"),
+        ("-0469-03-01 junk", "invalid"),
+    ],
+)
+def test_fast_path_only_accepts_a_time_after_the_date(value, path):
+    parsed = parse_dates([value])
+
+    assert PATHS[parsed.path[0]] == path
+    # O caminho rápido e a expressão regular concordam sobre o que é válido.
+    assert bool(parsed.valid[0]) is (path != "invalid")
+
+
+def test_reform_gap_only_exists_in_auto():
+    assert not parse_dates(["1582-10-10"], calendar="auto").valid[0]
+    assert parse_dates(["1582-10-10"], calendar="gregorian").valid[0]
+    assert parse_dates(["1582-10-10"], calendar="julian").valid[0]
+
+
+@pytest.mark.parametrize(
+    "value, calendar, valid",
+    [
+        ("1900-02-29", "gregorian", False),
+        ("1900-02-29", "julian", True),
+        ("2000-02-29", "gregorian", True),
+        ("1879-13-01", "gregorian", False),
+        ("-470 BC", "gregorian", False),
+        ("not a date", "gregorian", False),
+    ],
+)
+def test_invalid_dates_are_rejected(value, calendar, valid):
+    assert bool(parse_dates([value], calendar=calendar).valid[0]) is valid
+
+
+def test_iso_output_keeps_astronomical_years():
+    parsed = parse_dates(["470 BC", "1879-03-14", "garbage"])
+
+    assert parsed.iso().tolist() == ["-0469-01-01", "1879-03-14", None]
+
+
+def test_gregorian_date_converts_julian_calendar_days():
+    parsed = parse_dates(["1582-10-04"], calendar="julian")
+
+    assert gregorian_date(parsed.jdn[0]) == date(1582, 10, 14)
+    assert gregorian_date(parse_dates(["0001-01-01"]).jdn[0]) == date(1, 1, 1)
+    with pytest.raises(ValueError):
+        gregorian_date(_single("470 BC")[2])
@@ -0,0 +1,59 @@
+"""Tests of the warm-start update of the random forest.
+
+Run with ``python -m pytest test_incremental_training.py``.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+
+from incremental_training import warm_start_update
+
+
+LABELS = np.array([10, 20, 30])
+
+
+def _blobs(labels, rows_per_label, seed):
+    rng = np.random.default_rng(seed)
+    X = np.concatenate([rng.normal(index * 4.0, 0.5, size=(rows_per_label, 2)) for index in range(len(LABELS))])
+    y = np.repeat(LABELS, rows_per_label)
+    keep = np.isin(y, labels)
+    return X[keep], y[keep]
+
+
+@pytest.fixture
+def model():
+    X, y = _blobs(LABELS, 50, seed=0)
+    return RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+
+
+def test_update_with_a_missing_class_keeps_predictions_in_the_right_slots(model):
+    X_new, y_new = _blobs([20, 30], 50, seed=1)
+
+    warm_start_update(model, X_new, y_new, n_new_trees=20)
+
+    assert len(model.estimators_) == 40
+    for estimator in model.estimators_[20:]:
+        assert estimator.classes_.tolist() == [0.0, 1.0, 2.0]
+        # A classe 10 não estava no lote: nenhuma folha das árvores novas vota nela.
+        assert not estimator.tree_.value[:, 0, 0].any()
+
+    X_fresh, y_fresh = _blobs(LABELS, 200, seed=2)
+    predictions = model.predict(X_fresh)
+    assert set(predictions) <= set(LABELS)
+    assert (predictions == y_fresh).mean() > 0.95
+    # Linhas das classes do lote não podem ser empurradas para a classe ausente.
+    assert not (predictions[y_fresh != 10] == 10).any()
+
+
+def test_update_with_an_unseen_class_is_refused(model):
+    X_new, y_new = _blobs(LABELS, 20, seed=3)
+    y_new = np.where(y_new == 30, 40, y_new)
+
+    with pytest.raises(ValueError):
+        warm_start_update(model, X_new, y_new)
+
+    assert len(model.estimators_) == 20
+    assert model.classes_.tolist() == LABELS.tolist()
@@ -0,0 +1,131 @@
+"""Tests of the birthplace registry and the spatial grid index.
+
+Run with ``python -m pytest test_places.py``.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from places import GridIndex, PlaceRegistry, PlaceTable, haversine_km
+
+
+def _points(count: int = 4000):
+    # Uniformes na esfera, mais pontos colados nos polos e no antimeridiano.
+    rng = np.random.default_rng(11)
+    lat = np.degrees(np.arcsin(rng.uniform(-1.0, 1.0, count)))
+    lon = rng.uniform(-180.0, 180.0, count)
+    edge_lat = np.array([90.0, -90.0, 89.99, -89.99, 89.5, 0.0, 0.0, 45.0, -45.0, -44.0])
+    edge_lon = np.array([0.0, 0.0, 179.99, -179.99, 90.0, 180.0, -180.0, 179.5, -179.5, 177.0])
+    return np.concatenate([lat, edge_lat]), np.concatenate([lon, edge_lon])
+
+
+LAT, LON = _points()
+QUERIES = [
+    (0.0, 0.0),
+    (51.5, -0.1),
+    (89.9, 10.0),
+    (-89.5, -170.0),
+    (90.0, 0.0),
+    (10.0, 179.9),
+    (10.0, -179.9),
+    (60.0, 180.0),
+    (-45.0, -180.0),
+]
+
+
+# ----------------------------------------------------------------------
+# Índice em grade contra força bruta
+# ----------------------------------------------------------------------
+@pytest.mark.parametrize("cell_deg", [0.5, 1.0, 5.0, 7.0])
+@pytest.mark.parametrize("lat, lon", QUERIES)
+def test_within_matches_brute_force(cell_deg, lat, lon):
+    index = GridIndex(LAT, LON, cell_deg)
+    distances = haversine_km(lat, lon, LAT, LON)
+
+    for radius_km in (1.0, 50.0, 500.0, 3000.0, 25000.0):
+        positions, found = index.within(lat, lon, radius_km)
+        expected = np.flatnonzero(distances <= radius_km)
+
+        assert sorted(positions.tolist()) == expected.tolist(), radius_km
+        assert np.all(np.diff(found) >= 0)
+        np.testing.assert_allclose(found, distances[positions])
+
+
+@pytest.mark.parametrize("cell_deg", [1.0, 7.0])
+@pytest.mark.parametrize("lat, lon", QUERIES)
+def test_nearest_matches_brute_force(cell_deg, lat, lon):
+    index = GridIndex(LAT, LON, cell_deg)
+    distances = np.sort(haversine_km(lat, lon, LAT, LON))
+
+    for k in (1, 5, 50):
+        _, found = index.nearest(lat, lon, k)
+        np.testing.assert_allclose(found, distances[:k])
+
+
+def test_nearest_with_fewer_places_than_k():
+    index = GridIndex(np.array([0.0, 10.0]), np.array([0.0, 170.0]))
+
+    positions, _ = index.nearest(-5.0, -10.0, k=5)
+
+    assert positions.tolist() == [0, 1]
+
+
+def test_grid_rejects_non_positive_cells():
+    with pytest.raises(ValueError):
+        GridIndex(LAT, LON, 0.0)
+
+
+# ----------------------------------------------------------------------
+# Registro de lugares
+# ----------------------------------------------------------------------
+def _frame(rows):
+    return pd.DataFrame(rows, columns=["bplace_name", "bplace_lat", "bplace_lon"])
+
+
+ROWS = [
+    ("Pisa, Italy", 43.72, 10.40),
+    ("Vinci, Italy", 43.79, 10.93),
+    ("Pisa, Italy", 43.72, 10.40),
+    (None, np.nan, np.nan),
+    ("Pisa, Italy", 43.70, 10.40),
+    ("Vinci, Italy", 43.79, 10.93),
+    (None, np.nan, np.nan),
+]
+
+
+@pytest.mark.parametrize("chunk", [1, 2, 3, len(ROWS)])
+def test_place_ids_are_stable_across_chunks(chunk):
+    registry = PlaceRegistry()
+    frame = _frame(ROWS)
+
+    ids = np.concatenate([registry.assign(frame.iloc[start:start + chunk]) for start in range(0, len(frame), chunk)])
+
+    # IDs na ordem de primeira aparição, iguais para o mesmo trio (inclusive ausente).
+    assert ids.tolist() == [0, 1, 0, 2, 3, 1, 2]
+    table = registry.table()
+    assert len(registry) == len(table) == 4
+    assert table.rows.tolist() == [2, 2, 2, 1]
+    assert table.lat[3] == 43.70
+
+
+def test_place_table_round_trips_through_csv(tmp_path):
+    registry = PlaceRegistry()
+    registry.assign(_frame(ROWS[:3]))
+    path = tmp_path / "places.csv"
+
+    registry.table().save(path)
+    table = PlaceTable.load(path)
+
+    assert table.name.tolist() == ["Pisa, Italy", "Vinci, Italy"]
+    assert table.nearest(43.8, 10.9)["bplace_name"].tolist() == ["Vinci, Italy"]
+    assert table.within(43.72, 10.40, 50.0)["place_id"].tolist() == [0, 1]
+
+
+def test_place_table_requires_contiguous_ids():
+    frame = pd.DataFrame({"place_id": [0, 2], "bplace_name": ["a", "b"], "bplace_lat": [0, 1], "bplace_lon": [0, 1]})
+
+    with pytest.raises(ValueError):
+        PlaceTable.from_frame(frame)